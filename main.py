@@ -7,6 +7,10 @@ from src.agents.random_agent import RandomAgent, ZeroAgent
 from typing import Dict, List
 from src.models.card import Card
 from src.utils.data_loader import load_cards_from_json
+from src.core.events import event_bus, print_event
+from src.core.simulator import Simulator
+from src.core.tournament import Tournament
+from src.core.evolution import SequentialFitnessEvaluator, GeneticAlgorithm
 import os, sys, traceback
 import multiprocessing as mp
 from itertools import repeat
@@ -28,6 +32,7 @@ def run_pvp_game():
 
     game_engine = GameEngine(all_cards=all_cards_list, deck_size=deck_size, hand_size=hand_size, agents=agents)
 
+    event_bus.subscribe(print_event) # Show what happens in the game
     print("--- Starting Mindbug Game ---")
     
     logs = game_engine.play_game(
@@ -50,6 +55,7 @@ def run_pvai_game():
 
     game_engine = GameEngine(all_cards=all_cards_list, deck_size=10, hand_size=5, agents=agents)
 
+    event_bus.subscribe(print_event) # Show what happens in the game
     print("--- Starting Mindbug Game ---")
     
     logs = game_engine.play_game(
@@ -61,7 +67,7 @@ def run_pvai_game():
     
     return logs
 
-def run_aivai_game(deck_size: int = 5, hand_size: int = 2):
+def run_aivai_game(deck_size: int = 5, hand_size: int = 2, seed: int | None = None):
     # Suppress prints for AI vs AI games
     sys.stdout = open(os.devnull, 'w')
     sys.stderr = open(os.devnull, 'w')
@@ -78,11 +84,21 @@ def run_aivai_game(deck_size: int = 5, hand_size: int = 2):
     
     logs = game_engine.play_game(
         p1_forced_card_ids=[],
-        p2_forced_card_ids=[]
+        p2_forced_card_ids=[],
+        seed=seed
     )
 
     return logs
 
+def run_evolution(n_generations: int = 200, checkpoint_path: str = "evolution_checkpoint.pkl"):
+    # Train the genomes of EvolutionaryAgents on all CPUs, resuming from the checkpoint if there is one
+    with SequentialFitnessEvaluator(hidden_size=0, opponents=(RandomAgent, ZeroAgent)) as evaluator:
+        if os.path.exists(checkpoint_path):
+            algorithm = GeneticAlgorithm.load(checkpoint_path, evaluator)
+        else:
+            algorithm = GeneticAlgorithm(evaluator, population_size=50, n_games=100, seed=0)
+        return algorithm.run(n_generations, checkpoint_path=checkpoint_path, verbose=True)
+
 if __name__ == "__main__":
     # ----------------------
     # Uncomment the following lines to run a Player vs Player game
@@ -108,6 +124,11 @@ if __name__ == "__main__":
 
     # print(f"Game log saved to {filepath}")
 
+    # ----------------------
+    # Uncomment the following line to train EvolutionaryAgents (it can be stopped and resumed)
+    # ----------------------
+    # best_genome = run_evolution()
+
     # ----------------------
     # Uncomment the following lines to run AI vs AI games in parallel
     # ----------------------
@@ -115,35 +136,28 @@ if __name__ == "__main__":
     num_games = 100
     deck_size = 10
     hand_size = 5
-    args_list = [(deck_size, hand_size) for _ in range(num_games)]
-
-    # Run the games in parallel using multiprocessing
-    with mp.Pool() as pool:
-        results_log = pool.starmap(run_aivai_game, args_list)
 
-    # # Run the games sequentially for debugging
-    # results = [run_aivai_game(deck_size, hand_size) for _ in range(num_games)]
+    # Run the games in parallel on all CPUs, keeping only the totals
+    # Each game has its own seed, so that any of them can be replayed with
+    # run_aivai_game(deck_size, hand_size, Simulator.game_seed(0, index))
+    # (use processes=1 to run the games sequentially for debugging)
+    tournament = Tournament({"AI1": RandomAgent, "AI2": ZeroAgent}, deck_size=deck_size, hand_size=hand_size,
+                            chunk_size=100)
+    stats = tournament.run(num_games, seed=0, progress_interval=1.0)
 
-    # Re-enable prints
-    sys.stdout = sys.__stdout__
-    sys.stderr = sys.__stderr__
-    print(f"--- Completed {num_games} AI vs AI games ---")
+    print(f"--- Completed {stats.n_games} AI vs AI games in {stats.elapsed:.1f}s "
+          f"({stats.games_per_second():.0f} games/s) ---")
 
-    # import pprint
-    # pprint.pp(results_log, width=120)
-    
     # Count wins for each player
-    winners = [log["final_state"]["winner_id"] for log in results_log]
-    player1_wins = winners.count("AI1")
-    player2_wins = winners.count("AI2")
+    player1_wins = stats.wins.get("AI1", 0)
+    player2_wins = stats.wins.get("AI2", 0)
 
     print(f"Random Agent wins: {player1_wins} ({player1_wins/num_games:.1%})")
     print(f"Zero Agent wins: {player2_wins} ({player2_wins/num_games:.1%})")
 
     # Count win conditions
-    win_conditions = [log["final_state"]["win_condition"] for log in results_log]
-    run_out_of_actions_wins = win_conditions.count("run_out_of_actions")
-    life_below_zero_wins = win_conditions.count("life_below_zero")
+    run_out_of_actions_wins = stats.win_conditions.get("run_out_of_actions", 0)
+    life_below_zero_wins = stats.win_conditions.get("life_below_zero", 0)
 
     print(f"Run out of actions wins: {run_out_of_actions_wins} ({run_out_of_actions_wins/num_games:.1%})")
     print(f"Life below zero wins: {life_below_zero_wins} ({life_below_zero_wins/num_games:.1%})")
@@ -151,7 +165,9 @@ if __name__ == "__main__":
     # import math
     # digits = math.ceil(math.log10(num_games))
 
-    # for index, logs in enumerate(results_log):
+    # # Replay the games to record their full logs
+    # for index in range(num_games):
+    #     logs = run_aivai_game(deck_size, hand_size, Simulator.game_seed(0, index))
     #     # Create a timestamp for the filename
     #     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     #     filename = f"game_log_{index:0{digits}d}.json"
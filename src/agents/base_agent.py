@@ -2,11 +2,20 @@ from abc import ABC, abstractmethod
 from src.models.game_state import GameState
 from src.models.action import Action, CardChoiceRequest
 from src.models.card import Card
-from typing import List, Dict, Any
+from typing import Callable, Optional, Sequence, List, Dict, Any
+import random
 
 class BaseAgent(ABC):
-    def __init__(self, player_id: str):
+    def __init__(self, player_id: str, seed: Optional[int] = None):
         self.player_id = player_id
+        self.rng = random.Random(seed) # Agents must only use this for their random choices
+
+    def seed(self, seed: Optional[int]) -> None:
+        """
+        Reseeds the random number generator of the agent. The game engine does it at the
+        start of every game, so that games can be replayed from their seed.
+        """
+        self.rng.seed(seed)
 
     @abstractmethod
     def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
@@ -15,6 +24,17 @@ class BaseAgent(ABC):
         """
         pass
 
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Chooses an action from the valid actions, a lazy sequence (see ValidActions in the game engine)
+        whose actions are only generated when they are accessed.
+        describe_action gives the display data of an action (the dicts passed to choose_action).
+        By default all actions are described and passed to choose_action; agents that do not
+        need the full list can override this to avoid building it.
+        """
+        return self.choose_action(game_state, [describe_action(action) for action in valid_actions])
+
     @abstractmethod
     def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
         """
@@ -0,0 +1,153 @@
+from itertools import permutations
+from typing import Callable, Dict, List, Optional, Sequence, Any
+import numpy as np
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import ZeroAgent
+from src.agents.ismcts_agent import determinize
+from src.core.game_engine import GameEngine
+from src.core.events import event_bus
+from src.core.features import FeatureExtractor
+import src.core.game_rules as GameRules
+from src.models.game_state import GameState
+from src.models.action import Action, CardChoiceRequest
+from src.models.card import Card
+from src.utils.data_loader import load_cards_from_json
+
+def genome_size(n_features: int, hidden_size: int = 0) -> int:
+    """
+    Number of genes of an EvolutionaryAgent: one weight per feature for a linear scorer, or the
+    weights and biases of the hidden layer followed by the output weights for an MLP.
+    """
+    if hidden_size == 0:
+        return n_features
+    return n_features * hidden_size + 2 * hidden_size
+
+class EvolutionaryAgent(BaseAgent):
+    """
+    Agent whose decisions are made by a genome, as in plan_outlines/evolution_outline.txt: every
+    valid action is applied to the state and undone, the successors are turned into features (see
+    FeatureExtractor.extract_successors), and they are all scored at once by a linear function or a one-hidden-layer
+    MLP whose weights are the genome. The agent plays the action with the best score, ties being
+    broken at random.
+
+    Unless perfect_information is set, the hidden cards are sampled once per decision (see
+    determinize), so the successors don't show the cards that will be drawn.
+    """
+    def __init__(self, player_id: str, genome: Sequence[float], all_cards: Optional[List[Card]] = None,
+                 deck_size: int = 10, hand_size: int = 5, hidden_size: int = 0,
+                 perfect_information: bool = False, extractor: Optional[FeatureExtractor] = None,
+                 seed: Optional[int] = None) -> None:
+        """
+        Args:
+            player_id: ID of the player of the agent
+            genome: Weights of the scoring function, of length genome_size(extractor.size, hidden_size)
+            all_cards: The card pool the decks were dealt from. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            hidden_size: Number of hidden units of the MLP (0 for a linear scorer)
+            perfect_information: Whether the agent sees the hidden cards
+            extractor: Feature extractor over all_cards, which can be shared between agents
+            seed: Seed of the random number generator of the agent
+        """
+        super().__init__(player_id, seed)
+        self.all_cards: List[Card] = all_cards if all_cards is not None else load_cards_from_json()
+        self.extractor = extractor if extractor is not None else FeatureExtractor(self.all_cards)
+        self.hidden_size = hidden_size
+        self.perfect_information = perfect_information
+        self.genome = np.asarray(genome, dtype=np.float32)
+        n_features = self.extractor.size
+        if self.genome.shape != (genome_size(n_features, hidden_size),):
+            raise ValueError(f"Expected a genome of {genome_size(n_features, hidden_size)} genes, "
+                             f"got shape {self.genome.shape}.")
+        if hidden_size == 0:
+            self.weights = self.genome
+        else:
+            hidden_weights = n_features * hidden_size
+            self.weights = self.genome[:hidden_weights].reshape(n_features, hidden_size)
+            self.hidden_bias = self.genome[hidden_weights:hidden_weights + hidden_size]
+            self.output_weights = self.genome[hidden_weights + hidden_size:]
+
+        self.game_engine = GameEngine(all_cards=self.all_cards, deck_size=deck_size, hand_size=hand_size)
+        self._features = np.zeros((32, n_features), dtype=np.float32) # Reused between decisions
+        self._card_choice_handlers: Dict[str, Callable[[GameState, CardChoiceRequest], List[Card]]] = {
+            "defeat_order": self._choose_defeat_order,
+        }
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Scores the rows of an (N, F) feature array with the genome. Higher is better."""
+        if self.hidden_size == 0:
+            return features @ self.weights
+        return np.tanh(features @ self.weights + self.hidden_bias) @ self.output_weights
+
+    def score_states(self, game_states: Sequence[GameState]) -> np.ndarray:
+        """Scores game states from the perspective of the agent, with one matrix product."""
+        if len(game_states) > len(self._features):
+            self._features = np.zeros((2 * len(game_states), self.extractor.size), dtype=np.float32)
+        return self.score(self.extractor.extract_batch(game_states, self.player_id, self._features))
+
+    def _best_index(self, scores: np.ndarray) -> int:
+        best = np.flatnonzero(scores == scores.max())
+        return int(best[0]) if len(best) == 1 else int(best[self.rng.randrange(len(best))])
+
+    # --- Decisions ---
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        """
+        Evolutionary agent chooses the action whose successor state scores best.
+        """
+        return self.choose_from_valid_actions(game_state, [action['action'] for action in possible_actions],
+                                              lambda action: {'action': action})
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Evolutionary agent applies every valid action to the state (in place, then undone) and chooses
+        the one whose successor scores best.
+        """
+        valid_actions = list(valid_actions)
+        if len(valid_actions) == 1:
+            return valid_actions[0]
+        if self.perfect_information:
+            root = game_state.clone()
+        else:
+            root = determinize(game_state, self.player_id, self.all_cards, self.rng)
+        self._set_engine_agents(root)
+
+        if len(valid_actions) > len(self._features):
+            self._features = np.zeros((2 * len(valid_actions), self.extractor.size), dtype=np.float32)
+        with event_bus.muted():
+            features = self.extractor.extract_successors(root, self.player_id, valid_actions, self.game_engine,
+                                                         self._features)
+        return valid_actions[self._best_index(self.score(features))]
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        """
+        Evolutionary agent makes card choices with the handler of their purpose.
+        """
+        handler = self._card_choice_handlers.get(choice_request.purpose)
+        if handler is None:
+            raise ValueError(f"Evolutionary agent can't choose cards to {choice_request.purpose}.")
+        return handler(game_state, choice_request)
+
+    def _choose_defeat_order(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        """
+        Tries every order of the Defeated abilities on a copy of the state, and chooses the order
+        whose outcome scores best. Choices within the abilities are made as ZeroAgent would.
+        """
+        orders = list(permutations(choice_request.options))
+        if len(orders) == 1:
+            return list(orders[0])
+        self._set_engine_agents(game_state)
+        outcomes = []
+        with event_bus.muted():
+            for order in orders:
+                outcome = game_state.clone()
+                for card in order:
+                    outcome = GameRules.activate_defeated_ability(outcome, card.handle, self.game_engine.agents)
+                outcomes.append(outcome)
+        return list(orders[self._best_index(self.score_states(outcomes))])
+
+    def _set_engine_agents(self, game_state: GameState) -> None:
+        # The choices asked while a successor is made are answered by ZeroAgents
+        if self.game_engine.agents.keys() != game_state.players.keys():
+            self.game_engine.agents = {player_id: ZeroAgent(player_id) for player_id in game_state.players}
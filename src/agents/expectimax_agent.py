@@ -0,0 +1,273 @@
+import math
+import time
+from collections import Counter
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Any
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import ZeroAgent
+from src.agents.ismcts_agent import action_key, determinize
+from src.core.game_engine import GameEngine
+from src.core.events import event_bus
+import src.core.game_rules as GameRules
+from src.models.game_state import GameState, UndoRecord
+from src.models.action import *
+from src.models.card import Card
+from src.utils.data_loader import load_cards_from_json
+
+# Value of a won game. Every action discounts the values after it by DISCOUNT, so a win k actions
+# ahead is worth about WIN_VALUE - k: wins found sooner (and losses found later) are worth a bit more.
+# The discount only depends on the distance from the position searched, so the values in the
+# transposition table don't depend on where the search started or how deep it went.
+WIN_VALUE = 1_000_000.0
+DISCOUNT = 1 - 1 / WIN_VALUE
+
+# Kinds of values in the transposition table
+EXACT, LOWER_BOUND, UPPER_BOUND = range(3)
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time limit is reached."""
+
+def material_evaluation(game_state: GameState, player_id: str) -> float:
+    """
+    Simple evaluation of a position for a player: life points, effective power in play,
+    cards in hand and mindbugs, each compared with the opponent's.
+    """
+    def score(player) -> float:
+        power = sum(GameRules.get_effective_power(game_state, card.handle) for card in player.play_area)
+        return 10 * player.life_points + power + 2 * len(player.hand) + 3 * player.mindbugs
+
+    return score(game_state.get_player(player_id)) - score(game_state.get_opponent_of(player_id))
+
+class ExpectimaxAgent(BaseAgent):
+    """
+    Depth-limited expectiminimax search with alpha-beta pruning. The agent's decisions are max nodes,
+    the opponent's are min nodes, and the cards drawn after playing a card are chance nodes: every
+    set of cards that can be drawn from the deck is tried, weighted by its probability.
+    Positions are stored in a transposition table keyed by GameState.zobrist_key(), which also
+    gives the best action of the previous iteration to try first. The search deepens one ply at
+    a time until max_depth or the time limit, and leaves are scored by a pluggable evaluation.
+
+    Unless perfect_information is set, the hidden cards are sampled once per decision (see
+    determinize), and the search is played on that deal. Other draws (e.g. after a discard) take
+    the top card of the sampled deck. Without a time limit, decisions are reproducible from the seed.
+    """
+    def __init__(self, player_id: str, all_cards: Optional[List[Card]] = None, deck_size: int = 10,
+                 hand_size: int = 5, max_depth: int = 4, time_limit: Optional[float] = None,
+                 evaluate: Callable[[GameState, str], float] = material_evaluation,
+                 perfect_information: bool = False, table_size: int = 1_000_000, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            player_id: ID of the player of the agent
+            all_cards: The card pool the decks were dealt from. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            max_depth: Maximum number of decisions searched ahead
+            time_limit: Maximum search time per decision, in seconds (no limit if None). The deepest
+                finished iteration is used.
+            evaluate: Scores a position for a player (higher is better), at the leaves of the search
+            perfect_information: Whether the agent sees the hidden cards, e.g. to benchmark the search itself
+            table_size: Maximum number of positions in the transposition table. It is cleared when a new position
+                would exceed it.
+            seed: Seed of the random number generator of the agent
+        """
+        super().__init__(player_id, seed)
+        if max_depth < 1:
+            raise ValueError(f"Maximum depth must be positive, got {max_depth}.")
+        self.all_cards: List[Card] = all_cards if all_cards is not None else load_cards_from_json()
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.evaluate = evaluate
+        self.perfect_information = perfect_information
+        self.table_size = table_size
+        self.table: Dict[int, Tuple[int, float, int, Any]] = {} # Key: (depth, value, kind of value, best action key)
+        self.game_engine = GameEngine(all_cards=self.all_cards, deck_size=deck_size, hand_size=hand_size)
+        self._deadline = math.inf
+        # Search statistics: of the last decision, and totals
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.total_nodes = 0
+        self.total_search_time = 0.0
+
+    def nodes_per_second(self) -> float:
+        """Average number of positions searched per second over all the searches so far."""
+        return self.total_nodes / self.total_search_time if self.total_search_time > 0 else 0.0
+
+    # --- Decisions ---
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        """
+        Expectimax agent chooses the action with the best searched value.
+        """
+        return self.choose_from_valid_actions(game_state, [action['action'] for action in possible_actions],
+                                              lambda action: {'action': action})
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Expectimax agent searches from the current state, and chooses the valid action with the best value.
+        """
+        actions = {action_key(game_state, action): action for action in valid_actions}
+        if len(actions) == 1:
+            return next(iter(actions.values()))
+        best_key = self.search(game_state)
+        return actions.get(best_key, next(iter(actions.values())))
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        """
+        Expectimax agent can't search these choices, since they are asked in the middle of an action.
+        It chooses the maximum number of cards in the given order, as ZeroAgent does in the search.
+        """
+        return choice_request.options[:choice_request.max_choices]
+
+    # --- Search ---
+
+    def search(self, game_state: GameState) -> Optional[Tuple]:
+        """
+        Searches from the given state, where the agent is the active player, deepening until
+        max_depth or the time limit. Returns the key (see action_key) of the best action found.
+        """
+        if self.perfect_information:
+            root = game_state.clone()
+        else:
+            root = determinize(game_state, self.player_id, self.all_cards, self.rng)
+        self.game_engine.agents = {player_id: ZeroAgent(player_id) for player_id in root.players}
+
+        start_time = time.perf_counter()
+        self._deadline = start_time + self.time_limit if self.time_limit is not None else math.inf
+        self.last_nodes = 0
+        self.last_depth = 0
+        best_key = None
+        with event_bus.muted():
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    value, key = self._search_node(root, depth, -math.inf, math.inf)
+                except _SearchTimeout:
+                    break
+                best_key, self.last_depth = key, depth
+                if abs(value) >= WIN_VALUE * DISCOUNT ** depth:
+                    break # The result of the game is already known
+
+        self.total_nodes += self.last_nodes
+        self.total_search_time += time.perf_counter() - start_time
+        return best_key
+
+    def _search_node(self, game_state: GameState, depth: int, alpha: float, beta: float) -> Tuple[float, Any]:
+        """
+        Returns the value of a position for the agent, searched depth decisions ahead,
+        and the key of the best action. Values outside (alpha, beta) are only bounds.
+        """
+        self.last_nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+        if game_state.game_over:
+            return (WIN_VALUE if game_state.winner_id == self.player_id else -WIN_VALUE), None
+        if depth == 0:
+            return self.evaluate(game_state, self.player_id), None
+
+        # The kind of value to store depends on the window the node was asked for, not the one narrowed by the table
+        original_alpha, original_beta = alpha, beta
+        table_key = game_state.zobrist_key()
+        entry = self.table.get(table_key)
+        first_key = None
+        if entry is not None:
+            entry_depth, entry_value, kind, first_key = entry
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return entry_value, first_key
+                elif kind == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value, first_key
+
+        actions = {action_key(game_state, action): action
+                   for action in self.game_engine.iter_valid_actions(game_state)}
+        if not actions:
+            # The active player can't do anything and loses, as in GameEngine.choose_next_action
+            won = game_state.active_player_id != self.player_id
+            return (WIN_VALUE if won else -WIN_VALUE), None
+
+        keys = list(actions)
+        if first_key in actions:
+            keys.remove(first_key)
+            keys.insert(0, first_key)
+        maximizing = game_state.active_player_id == self.player_id
+        best_value, best_key = (-math.inf if maximizing else math.inf), keys[0]
+        for key in keys:
+            value = self._action_value(game_state, actions[key], depth - 1, alpha, beta)
+            if maximizing and value > best_value:
+                best_value, best_key = value, key
+                alpha = max(alpha, value)
+            elif not maximizing and value < best_value:
+                best_value, best_key = value, key
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        kind = UPPER_BOUND if best_value <= original_alpha else LOWER_BOUND if best_value >= original_beta else EXACT
+        if len(self.table) >= self.table_size and table_key not in self.table:
+            self.table.clear()
+        self.table[table_key] = (depth, best_value, kind, best_key)
+        return best_value, best_key
+
+    def _action_value(self, game_state: GameState, action: Action, depth: int, alpha: float, beta: float) -> float:
+        """
+        Value of an action: of the next position, or the expected value over the cards that can be drawn,
+        discounted by DISCOUNT.
+        """
+        outcomes = self.draw_outcomes(game_state, action)
+        if not outcomes:
+            return DISCOUNT * self._child_value(game_state, action, [], depth, alpha / DISCOUNT, beta / DISCOUNT)
+        # Chance node: its children are searched with the full window, so that their values are exact
+        return DISCOUNT * sum(probability * self._child_value(game_state, action, drawn, depth, -math.inf, math.inf)
+                              for probability, drawn in outcomes)
+
+    def _child_value(self, game_state: GameState, action: Action, drawn: List[Card],
+                     depth: int, alpha: float, beta: float) -> float:
+        """Searched value of the position after the action, the given cards being the next ones drawn."""
+        records = self._apply(game_state, action, drawn)
+        try:
+            return self._search_node(game_state, depth, alpha, beta)[0]
+        finally:
+            self._undo(game_state, records)
+
+    def draw_outcomes(self, game_state: GameState, action: Action) -> List[Tuple[float, List[Card]]]:
+        """
+        Returns the sets of cards that can be drawn when playing a card, with their probabilities,
+        treating the deck as unordered. Sets with the same card IDs are merged. Returns an empty list
+        when there is no draw or when the whole deck is drawn, which needs no chance node.
+        """
+        if not isinstance(action, PlayCardAction):
+            return []
+        player = game_state.get_active_player()
+        n_draws = min(self.game_engine.hand_size - (len(player.hand) - 1), len(player.deck))
+        if n_draws <= 0 or n_draws == len(player.deck):
+            return []
+        counts: Counter = Counter()
+        representatives: Dict[Tuple[str, ...], List[Card]] = {}
+        for drawn in combinations(player.deck, n_draws):
+            card_ids = tuple(sorted(card.id for card in drawn))
+            counts[card_ids] += 1
+            representatives.setdefault(card_ids, list(drawn))
+        total = sum(counts.values())
+        return [(count / total, representatives[card_ids]) for card_ids, count in counts.items()]
+
+    def _apply(self, game_state: GameState, action: Action, drawn: List[Card]) -> List[UndoRecord]:
+        """
+        Applies an action to the state in place, the given cards being the next ones drawn.
+        Returns the records that _undo takes to get the state back.
+        """
+        records = []
+        if drawn:
+            records.append(game_state.start_undo_record())
+            try:
+                game_state.put_on_top_of_deck(game_state.get_active_player(), drawn)
+            finally:
+                game_state.stop_undo_record()
+        records.append(self.game_engine.apply_in_place(game_state, action))
+        return records
+
+    def _undo(self, game_state: GameState, records: List[UndoRecord]) -> None:
+        for record in reversed(records):
+            self.game_engine.undo(game_state, record)
@@ -0,0 +1,353 @@
+import math
+import random
+import time
+from collections import Counter
+from itertools import combinations, permutations
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Any
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import RandomAgent
+from src.core.game_engine import GameEngine
+from src.core.events import event_bus
+from src.models.game_state import GameState
+from src.models.player import Player
+from src.models.action import *
+from src.models.card import Card
+from src.utils.data_loader import load_cards_from_json
+
+# Fields of a GameState, besides its players, that are copied into its determinizations
+_PENDING_FIELDS = ("game_over", "winner_id", "_pending_action", "_pending_mindbug_card_handle",
+                   "_pending_attack_card_handle", "_pending_block_card_handle", "_frenzy_active",
+                   "_amount_of_targets", "_switch_active_player_back", "_already_hunted", "_return_to_attack")
+
+def _card_key(game_state: GameState, card_handle: Optional[int]) -> Optional[Tuple[str, str, str]]:
+    """Refers to a card by its ID and where it is, which don't depend on the determinization."""
+    if card_handle is None:
+        return None
+    player_id, zone, _ = game_state.get_card_location(card_handle)
+    return (game_state.get_card(card_handle).id, player_id, zone)
+
+def action_key(game_state: GameState, action: Action) -> Tuple:
+    """
+    Identifies an action across determinizations. Cards are referred to by their ID and
+    where they are instead of by handle, so that the same action in different determinizations
+    (e.g. playing an Axolotl Healer, whichever of the two copies it is) has the same key.
+    """
+    def card_key(card_handle: Optional[int]) -> Optional[Tuple[str, str, str]]:
+        return _card_key(game_state, card_handle)
+
+    if isinstance(action, PlayCardAction):
+        return ("play", card_key(action.card_handle))
+    elif isinstance(action, AttackAction):
+        return ("attack", card_key(action.attacking_card_handle))
+    elif isinstance(action, BlockAction):
+        return ("block", card_key(action.blocking_card_handle))
+    elif isinstance(action, (HuntAction, PlayFromDiscardAction)):
+        return (type(action).__name__, card_key(action.card_handle))
+    elif isinstance(action, (StealAction, DiscardAction, DefeatAction)):
+        return (type(action).__name__, tuple(sorted(card_key(handle) for handle in action.card_handles)))
+    elif isinstance(action, MindbugAction):
+        return ("mindbug", action.use_mindbug)
+    elif isinstance(action, FrenzyAction):
+        return ("frenzy", action.go_again)
+    raise ValueError(f"Unknown action type: {type(action)}.")
+
+def choice_key(game_state: GameState, choice_request: CardChoiceRequest, cards: Sequence[Card]) -> Tuple:
+    """
+    Identifies a choice of cards across determinizations, as action_key does for actions.
+    The cards are kept in the order they were chosen, which is the answer when ordering them.
+    """
+    return ("cards", choice_request.purpose, tuple(_card_key(game_state, card.handle) for card in cards))
+
+def card_choices(choice_request: CardChoiceRequest) -> List[List[Card]]:
+    """
+    Every answer to a request: all the orders of the options when they must all be chosen,
+    and otherwise every subset of an allowed size, in the order of the options.
+    """
+    options = choice_request.options
+    if choice_request.min_choices == len(options):
+        return [list(cards) for cards in permutations(options)]
+    return [list(cards) for size in range(choice_request.min_choices, choice_request.max_choices + 1)
+            for cards in combinations(options, size)]
+
+def determinize(game_state: GameState, observer_id: str, all_cards: List[Card], rng: random.Random) -> GameState:
+    """
+    Returns a copy of the state in which the cards the observer can't see (the opponent's hand
+    and both decks) are replaced by cards drawn at random from the rest of the card pool.
+    Cards the observer has seen before (e.g. stolen ones) are not remembered.
+    """
+    observer = game_state.get_player(observer_id)
+    opponent = game_state.get_opponent_of(observer_id)
+    visible = {zone_name: {player.id: [card.copy() for card in getattr(player, zone_name)]
+                           for player in (observer, opponent)}
+               for zone_name in ("play_area", "discard_pile")}
+    visible["hand"] = {observer.id: [card.copy() for card in observer.hand]}
+    visible_handles = {card.handle for zone in visible.values() for cards in zone.values() for card in cards}
+
+    unseen = [card for card in all_cards if card.handle not in visible_handles]
+    rng.shuffle(unseen)
+    hidden_sizes = ((observer.id, "deck", len(observer.deck)), (opponent.id, "hand", len(opponent.hand)),
+                    (opponent.id, "deck", len(opponent.deck)))
+    hidden: Dict[str, Dict[str, List[Card]]] = {"deck": {}, "hand": {}}
+    for player_id, zone_name, size in hidden_sizes:
+        hidden[zone_name][player_id] = [card.copy() for card in unseen[:size]]
+        del unseen[:size]
+
+    zones = {**visible, "deck": hidden["deck"], "hand": {**visible["hand"], **hidden["hand"]}}
+    players = {player.id: Player(player.id, deck=zones["deck"][player.id], hand=zones["hand"][player.id],
+                                 discard_pile=zones["discard_pile"][player.id],
+                                 play_area=zones["play_area"][player.id],
+                                 life_points=player.life_points, mindbugs=player.mindbugs)
+               for player in game_state.players.values()}
+    determinization = GameState(game_state.active_player_id, game_state.inactive_player_id, players,
+                                game_state.turn_count, seed=rng.getrandbits(64))
+    for field in _PENDING_FIELDS:
+        setattr(determinization, field, getattr(game_state, field))
+    if game_state._valid_targets is not None:
+        determinization._valid_targets = list(game_state._valid_targets)
+    return determinization
+
+class SearchNode:
+    """
+    Node of an information set search tree: it stands for an action (its key) taken after the
+    actions of its ancestors, whatever the hidden cards. Its statistics are shared by all
+    the determinizations in which the action was available.
+    """
+    __slots__ = ('player_id', 'children', 'visits', 'wins', 'availability')
+
+    def __init__(self, player_id: Optional[str] = None) -> None:
+        self.player_id = player_id # The player who takes the action of this node (None for the root)
+        self.children: Dict[Hashable, 'SearchNode'] = {}
+        self.visits = 0
+        self.wins = 0 # Playouts through this node won by player_id
+        self.availability = 1 # Number of times the action was available when its parent was visited
+
+    def ucb(self, exploration: float) -> float:
+        return self.wins / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+class _TreeChooser(BaseAgent):
+    """
+    Plays a player in the tree part of a playout. The engine only asks it for cards in the middle
+    of the actions chosen by the tree, and those choices are made by the tree too.
+    """
+    def __init__(self, search_agent: 'ISMCTSAgent', rollout_agent: BaseAgent) -> None:
+        super().__init__(rollout_agent.player_id)
+        self.search_agent = search_agent
+        self.rollout_agent = rollout_agent
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        return self.rollout_agent.choose_action(game_state, possible_actions)
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        return self.search_agent._tree_choice(game_state, choice_request, self.rollout_agent)
+
+class ISMCTSAgent(BaseAgent):
+    """
+    Information Set Monte Carlo Tree Search (single observer). At every decision, the hidden
+    cards (the opponent's hand and both decks) are sampled again for each playout, consistently
+    with what the agent can see, and the playout is played on that determinization with
+    GameEngine: down the tree by UCB, then to the end of the game with the rollout agents.
+    All determinizations share one tree, whose nodes are actions keyed by action_key, and the
+    choices of cards asked in the middle of those actions, keyed by choice_key.
+
+    The search stops after a number of playouts or a time limit, whichever comes first. The
+    number of playouts per second is kept, to tune these budgets.
+    """
+    def __init__(self, player_id: str, all_cards: Optional[List[Card]] = None, deck_size: int = 10,
+                 hand_size: int = 5, iterations: Optional[int] = 1000, time_limit: Optional[float] = None,
+                 exploration: float = 0.7, rollout_agent: Callable[[str], BaseAgent] = RandomAgent,
+                 seed: Optional[int] = None) -> None:
+        """
+        Args:
+            player_id: ID of the player of the agent
+            all_cards: The card pool the decks were dealt from. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            iterations: Maximum number of playouts per decision (no limit if None)
+            time_limit: Maximum search time per decision, in seconds (no limit if None)
+            exploration: Exploration constant of UCB
+            rollout_agent: Makes the agent that plays each player after leaving the tree, given its ID
+            seed: Seed of the random number generator of the agent
+        """
+        super().__init__(player_id, seed)
+        if iterations is None and time_limit is None:
+            raise ValueError("Either a number of iterations or a time limit is needed.")
+        self.all_cards: List[Card] = all_cards if all_cards is not None else load_cards_from_json()
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rollout_agent = rollout_agent
+        self.game_engine = GameEngine(all_cards=self.all_cards, deck_size=deck_size, hand_size=hand_size)
+        # Search statistics: of the last decision, and totals
+        self.last_iterations = 0
+        self.last_search_time = 0.0
+        self.total_iterations = 0
+        self.total_search_time = 0.0
+        # The last decision (the state, the root of its search and the key of the action taken),
+        # whose tree answers the choices of cards asked while the action is applied
+        self._last_decision: Optional[Tuple[GameState, SearchNode, Hashable]] = None
+        # Path of the current playout, and whether it has added a node to the tree yet
+        self._path: List[SearchNode] = []
+        self._expanded = False
+
+    def iterations_per_second(self) -> float:
+        """Average number of playouts per second over all the searches so far."""
+        return self.total_iterations / self.total_search_time if self.total_search_time > 0 else 0.0
+
+    # --- Decisions ---
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        """
+        ISMCTS agent chooses the action with the most playouts.
+        """
+        return self.choose_from_valid_actions(game_state, [action['action'] for action in possible_actions],
+                                              lambda action: {'action': action})
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        ISMCTS agent searches from the current state, and chooses the valid action with the most playouts.
+        """
+        actions = {action_key(game_state, action): action for action in valid_actions}
+        if len(actions) == 1:
+            root, best_key = SearchNode(), next(iter(actions))
+        else:
+            root = self.search(game_state)
+            best_key = max(actions, key=lambda key: root.children[key].visits if key in root.children else -1)
+        self._last_decision = (game_state.clone(), root, best_key)
+        return actions[best_key]
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        """
+        ISMCTS agent chooses the cards (or their order) with the most playouts. These choices are asked
+        in the middle of an action, so they are taken from the tree of the last decision, where they
+        were made by the tree below the action taken. If the search didn't get to them, more playouts
+        are run from that decision, following the action taken. Without a last decision, the cards
+        are chosen in the given order.
+        """
+        choices = {choice_key(game_state, choice_request, cards): cards for cards in card_choices(choice_request)}
+        if len(choices) == 1 or self._last_decision is None:
+            return next(iter(choices.values()))
+        last_state, root, taken_key = self._last_decision
+        visits = self._choice_visits(root.children.get(taken_key), choices)
+        if not visits:
+            self._run_playouts(root, last_state, taken_key)
+            visits = self._choice_visits(root.children.get(taken_key), choices)
+        if not visits:
+            return next(iter(choices.values()))
+        return choices[max(visits, key=visits.get)]
+
+    def _choice_visits(self, node: Optional[SearchNode], choices: Dict[Hashable, List[Card]]) -> Counter:
+        """
+        Playouts of each of the given choices below a node, until the agent's next decision
+        (the choice is asked before it), whatever the other player did in between.
+        """
+        visits: Counter = Counter()
+        stack = list(node.children.items()) if node is not None else []
+        while stack:
+            key, child = stack.pop()
+            if key in choices:
+                visits[key] += child.visits
+            if child.player_id != self.player_id or key[0] == "cards":
+                stack.extend(child.children.items())
+        return visits
+
+    # --- Search ---
+
+    def search(self, game_state: GameState) -> SearchNode:
+        """
+        Runs playouts from the given state, where the agent is the active player,
+        and returns the root of the search tree.
+        """
+        root = SearchNode()
+        self._run_playouts(root, game_state)
+        return root
+
+    def _run_playouts(self, root: SearchNode, game_state: GameState, first_key: Optional[Hashable] = None) -> None:
+        """
+        Runs playouts from the given state into the tree of the given root, within the budget of
+        the agent. If first_key is given, every playout starts with that action.
+        """
+        rollout_agents = {player_id: self.rollout_agent(player_id) for player_id in game_state.players}
+        for agent in rollout_agents.values():
+            agent.seed(self.rng.getrandbits(64))
+        tree_agents = {player_id: _TreeChooser(self, agent) for player_id, agent in rollout_agents.items()}
+
+        start_time = time.perf_counter()
+        iterations = 0
+        with event_bus.muted():
+            while self.iterations is None or iterations < self.iterations:
+                if self.time_limit is not None and time.perf_counter() - start_time >= self.time_limit:
+                    break
+                self._playout(root, self.determinize(game_state), tree_agents, rollout_agents, first_key)
+                iterations += 1
+
+        self.last_iterations = iterations
+        self.last_search_time = time.perf_counter() - start_time
+        self.total_iterations += iterations
+        self.total_search_time += self.last_search_time
+
+    def _playout(self, root: SearchNode, game_state: GameState, tree_agents: Dict[str, BaseAgent],
+                 rollout_agents: Dict[str, BaseAgent], first_key: Optional[Hashable] = None) -> None:
+        """
+        Plays one determinization to the end: down the tree while all the available actions (or
+        choices of cards) have been tried, then one new node is added to the tree and the rollout
+        agents take over.
+        """
+        engine = self.game_engine
+        engine.agents = tree_agents
+        self._path = [root]
+        self._expanded = False
+        while not game_state.game_over and not self._expanded:
+            actions = {action_key(game_state, action): action for action in engine.iter_valid_actions(game_state)}
+            if not actions:
+                # The active player can't do anything and loses, as in GameEngine.choose_next_action
+                game_state.game_over = True
+                game_state.winner_id = game_state.inactive_player_id
+                break
+            if first_key in actions and len(self._path) == 1:
+                actions = {first_key: actions[first_key]}
+
+            key = self._select(actions, game_state.active_player_id)
+            engine._dispatch_action(game_state, actions[key])
+            engine.resolve_automatic_steps(game_state)
+
+        engine.agents = rollout_agents
+        engine.play_until_over(game_state)
+        for node in self._path:
+            node.visits += 1
+            if node.player_id == game_state.winner_id:
+                node.wins += 1
+
+    def _select(self, keys: Sequence[Hashable], player_id: str) -> Hashable:
+        """
+        Chooses a child of the last node of the playout: one that was never tried, which is added
+        to the tree, or else the one with the best UCB. Returns its key.
+        """
+        node = self._path[-1]
+        untried = []
+        for key in keys:
+            child = node.children.get(key)
+            if child is None:
+                untried.append(key)
+            else:
+                child.availability += 1
+        if untried:
+            key = self.rng.choice(untried)
+            node.children[key] = SearchNode(player_id)
+            self._expanded = True
+        else:
+            key = max(keys, key=lambda key: node.children[key].ucb(self.exploration))
+        self._path.append(node.children[key])
+        return key
+
+    def _tree_choice(self, game_state: GameState, choice_request: CardChoiceRequest,
+                     rollout_agent: BaseAgent) -> List[Card]:
+        """Chooses cards in the tree part of a playout, or with the rollout agent once a node has been added."""
+        if self._expanded:
+            return rollout_agent.choose_cards(game_state, choice_request)
+        choices = {choice_key(game_state, choice_request, cards): cards for cards in card_choices(choice_request)}
+        return choices[self._select(list(choices), choice_request.player_id)]
+
+    def determinize(self, game_state: GameState) -> GameState:
+        """Samples the cards the agent can't see (see the module-level determinize)."""
+        return determinize(game_state, self.player_id, self.all_cards, self.rng)
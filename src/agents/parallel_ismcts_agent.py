@@ -0,0 +1,120 @@
+import multiprocessing as mp
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import RandomAgent
+from src.agents.ismcts_agent import ISMCTSAgent, SearchNode
+from src.models.game_state import GameState
+from src.models.card import Card
+
+# Search agent of each worker process, made once by _init_worker
+_worker_agent: Optional[ISMCTSAgent] = None
+
+def _init_worker(all_cards: List[Card], deck_size: int, hand_size: int, exploration: float,
+                 rollout_agent: Callable[[str], BaseAgent]) -> None:
+    """Makes the search agent (with its card pool and engine) once per worker process."""
+    global _worker_agent
+    _worker_agent = ISMCTSAgent("", all_cards, deck_size=deck_size, hand_size=hand_size,
+                                exploration=exploration, rollout_agent=rollout_agent)
+
+def _search_root(task: Tuple[GameState, str, Optional[int], Optional[float], int]) -> Tuple[Dict[Hashable, Tuple[int, int]], int]:
+    """
+    Runs an independent search from a state, and returns the visits and wins
+    of the children of its root, by action key, and the number of playouts.
+    """
+    game_state, player_id, iterations, time_limit, seed = task
+    agent = _worker_agent
+    agent.player_id = player_id
+    agent.iterations = iterations
+    agent.time_limit = time_limit
+    agent.seed(seed)
+    root = agent.search(game_state)
+    return {key: (child.visits, child.wins) for key, child in root.children.items()}, agent.last_iterations
+
+class RootParallelISMCTSAgent(ISMCTSAgent):
+    """
+    ISMCTS with root parallelization: every worker process grows its own tree from the current
+    state, with its own determinizations, and the statistics of the root actions are added up.
+    The action with the most playouts over all trees is chosen.
+
+    The worker processes are started at the first decision and kept until close() is called, so
+    the card pool and the engine are only sent to them once; for every decision only the state is.
+    The budget (iterations and time_limit) applies to each worker, which search at the same time,
+    so with a time limit the number of playouts grows with the number of processes.
+
+    Worker processes can't start processes of their own, so this agent can't be used inside a
+    Tournament with more than one process.
+    """
+    def __init__(self, player_id: str, all_cards: Optional[List[Card]] = None, deck_size: int = 10,
+                 hand_size: int = 5, iterations: Optional[int] = None, time_limit: Optional[float] = 1.0,
+                 exploration: float = 0.7, rollout_agent: Callable[[str], BaseAgent] = RandomAgent,
+                 processes: Optional[int] = None, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            player_id: ID of the player of the agent
+            all_cards: The card pool the decks were dealt from. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            iterations: Maximum number of playouts per decision of each worker (no limit if None)
+            time_limit: Maximum search time per decision, in seconds (no limit if None)
+            exploration: Exploration constant of UCB
+            rollout_agent: Makes the agent that plays each player after leaving the tree, given its ID.
+                It must be picklable, e.g. an agent class or a module-level function.
+            processes: Number of worker processes. All the CPUs if not given. With 1, the search is
+                run in this process.
+            seed: Seed of the random number generator of the agent
+        """
+        super().__init__(player_id, all_cards, deck_size=deck_size, hand_size=hand_size, iterations=iterations,
+                         time_limit=time_limit, exploration=exploration, rollout_agent=rollout_agent, seed=seed)
+        self.processes = processes if processes is not None else mp.cpu_count()
+        self._pool = None
+
+    def search(self, game_state: GameState) -> SearchNode:
+        """
+        Runs one search per worker from the given state, where the agent is the active player,
+        and returns a root whose children have the visits and wins of all the searches.
+        """
+        if self.processes == 1:
+            return super().search(game_state)
+        if self._pool is None:
+            self._pool = mp.Pool(self.processes, initializer=_init_worker,
+                                 initargs=(self.all_cards, self.game_engine.deck_size, self.game_engine.hand_size,
+                                           self.exploration, self.rollout_agent))
+
+        start_time = time.perf_counter()
+        tasks = [(game_state, self.player_id, self.iterations, self.time_limit, self.rng.getrandbits(64))
+                 for _ in range(self.processes)]
+        root = SearchNode()
+        iterations = 0
+        for children, worker_iterations in self._pool.map(_search_root, tasks, chunksize=1):
+            iterations += worker_iterations
+            for key, (visits, wins) in children.items():
+                child = root.children.get(key)
+                if child is None:
+                    child = root.children[key] = SearchNode(self.player_id)
+                child.visits += visits
+                child.wins += wins
+        root.visits = iterations
+
+        self.last_iterations = iterations
+        self.last_search_time = time.perf_counter() - start_time
+        self.total_iterations += iterations
+        self.total_search_time += self.last_search_time
+        return root
+
+    def close(self) -> None:
+        """Stops the worker processes. They are started again if the agent makes another decision."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'RootParallelISMCTSAgent':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_pool", None) is not None:
+            self._pool.terminate()
@@ -0,0 +1,42 @@
+from abc import abstractmethod
+from src.agents.base_agent import BaseAgent
+from src.core.action_space import ActionSpace
+from src.models.game_state import GameState
+from src.models.action import Action
+from typing import Callable, Sequence, List, Dict, Any, Optional
+
+class PolicyAgent(BaseAgent):
+    """
+    Base class for agents that choose actions by their index in an ActionSpace,
+    given a NumPy boolean mask of the legal actions (e.g. to feed a neural policy).
+    """
+    def __init__(self, player_id: str, action_space: ActionSpace | None = None, seed: Optional[int] = None):
+        super().__init__(player_id, seed)
+        self.action_space = action_space if action_space is not None else ActionSpace()
+
+    @abstractmethod
+    def choose_action_index(self, game_state: GameState, legal_mask) -> int:
+        """
+        Chooses the index of a legal action, given the legality mask (a NumPy boolean array).
+        """
+        pass
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Policy agent chooses the index of an action, which is decoded into the action.
+        """
+        legal_mask = self.action_space.legal_mask(game_state, valid_actions)
+        if not legal_mask.any():
+            raise ValueError("None of the valid actions can be represented in the action space.")
+        index = self.choose_action_index(game_state, legal_mask)
+        if not legal_mask[index]:
+            raise ValueError(f"Chosen action index {index} is not legal.")
+        return self.action_space.decode(game_state, index)
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        """
+        Policy agent chooses an action from a list of possible actions, by their indices.
+        """
+        return self.choose_from_valid_actions(game_state, [action['action'] for action in possible_actions],
+                                              lambda action: {'action': action})
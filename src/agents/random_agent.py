@@ -2,32 +2,43 @@ from src.agents.base_agent import BaseAgent
 from src.models.game_state import GameState
 from src.models.action import Action, CardChoiceRequest
 from src.models.card import Card
-from typing import List, Dict, Any
-import random
+from typing import Callable, Optional, Sequence, List, Dict, Any
 
 class RandomAgent(BaseAgent):
-    def __init__(self, player_id: str):
-        super().__init__(player_id)
+    def __init__(self, player_id: str, seed: Optional[int] = None):
+        super().__init__(player_id, seed)
 
     def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Action | str]]) -> Action:
         """
         Random agent chooses an action at random.
         """
         possible_action_list = [action['action'] for action in possible_actions]
-        chosen_action = random.choice(possible_action_list)
+        chosen_action = self.rng.choice(possible_action_list)
         if not isinstance(chosen_action, Action):
             raise ValueError("Chosen action is not a valid Action object.")
         
         return chosen_action
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Random agent chooses an action at random. Only the chosen action is generated, even
+        when there are many subsets of targets to choose from.
+        """
+        chosen_action = self.rng.choice(valid_actions)
+        if not isinstance(chosen_action, Action):
+            raise ValueError("Chosen action is not a valid Action object.")
+
+        return chosen_action
     
     def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
         """
         Random agent chooses a card at random.
         """
-        number_of_cards = random.randint(choice_request.min_choices, choice_request.max_choices)
+        number_of_cards = self.rng.randint(choice_request.min_choices, choice_request.max_choices)
         # if number_of_cards > len(choice_request.options):
         #     print(f"Warning: Requested {number_of_cards} cards, but only {len(choice_request.options)} available.")
-        chosen_cards = random.sample(choice_request.options, k=number_of_cards)
+        chosen_cards = self.rng.sample(choice_request.options, k=number_of_cards)
         if not all(isinstance(card, Card) for card in chosen_cards):
             raise ValueError("Chosen cards are not all valid Card objects.")
 
@@ -47,6 +58,17 @@ class ZeroAgent(BaseAgent):
             raise ValueError("Chosen action is not a valid Action object.")
         
         return chosen_action
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Zero agent always chooses the first option, so no other action is ever generated.
+        """
+        chosen_action = next(iter(valid_actions), None)
+        if not isinstance(chosen_action, Action):
+            raise ValueError("Chosen action is not a valid Action object.")
+
+        return chosen_action
     
     def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
         """
@@ -0,0 +1,62 @@
+from typing import Callable, Dict, List, Optional, Sequence, Any
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import RandomAgent
+from src.core.solver import ExactSolver, Tablebase, canonical_key, cards_remaining
+from src.models.game_state import GameState
+from src.models.action import Action, CardChoiceRequest
+from src.models.card import Card
+
+class SolverAgent(BaseAgent):
+    """
+    Plays perfectly once few cards are left in decks and hands, with an ExactSolver (and its tablebase,
+    if any); before that, another agent plays. The solver sees every card, so this agent is meant for
+    fully known deals and as ground truth to test other agents against, not for fair play.
+    """
+    def __init__(self, player_id: str, solver: ExactSolver, max_cards: int = 8,
+                 fallback_agent: Optional[Callable[[str], BaseAgent]] = None, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            player_id: ID of the player of the agent
+            solver: The solver, with the deck and hand sizes of the games played
+            max_cards: The solver plays when at most this many cards are left in decks and hands
+            fallback_agent: Makes the agent that plays before that, given the player ID. RandomAgent if not given.
+            seed: Seed of the random number generator of the agent
+        """
+        super().__init__(player_id, seed)
+        self.solver = solver
+        self.max_cards = max_cards
+        self.fallback_agent = (fallback_agent or RandomAgent)(player_id)
+
+    @classmethod
+    def with_tablebase(cls, player_id: str, tablebase_path: str, deck_size: int = 4, hand_size: int = 2,
+                       all_cards: Optional[List[Card]] = None, **kwargs) -> 'SolverAgent':
+        """Makes a SolverAgent whose solver looks positions up in the tablebase at the given path."""
+        solver = ExactSolver(all_cards, deck_size=deck_size, hand_size=hand_size, tablebase=Tablebase(tablebase_path))
+        return cls(player_id, solver, **kwargs)
+
+    def seed(self, seed: Optional[int]) -> None:
+        super().seed(seed)
+        self.fallback_agent.seed(self.rng.getrandbits(64))
+
+    def choose_action(self, game_state: GameState, possible_actions: List[Dict[str, Any]]) -> Action:
+        """
+        Solver agent plays the best action once few cards are left, and lets the fallback agent choose before.
+        """
+        return self.choose_from_valid_actions(game_state, [action['action'] for action in possible_actions],
+                                              lambda action: {'action': action})
+
+    def choose_from_valid_actions(self, game_state: GameState, valid_actions: Sequence[Action],
+                                  describe_action: Callable[[Action], Dict[str, Any]]) -> Action:
+        """
+        Solver agent plays the best action once few cards are left, and lets the fallback agent choose before.
+        """
+        if cards_remaining(canonical_key(game_state)) > self.max_cards:
+            return self.fallback_agent.choose_from_valid_actions(game_state, valid_actions, describe_action)
+        best_action, _ = self.solver.best_action(game_state)
+        return best_action
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest) -> List[Card]:
+        """
+        Solver agent chooses the maximum number of cards in the given order, as the solver assumes.
+        """
+        return choice_request.options[:choice_request.max_choices]
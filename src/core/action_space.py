@@ -0,0 +1,186 @@
+from typing import Iterable, List, Optional
+from src.models.game_state import GameState
+from src.models.action import *
+from src.core.game_engine import GameEngine, TARGET_SUBSET_PHASES
+
+class ActionSpace:
+    """
+    Maps every action a player can take to a fixed integer, so that learning agents can work
+    with legality masks and action indices instead of lists of Action objects.
+
+    Actions refer to cards by their position, so the same index always has the same meaning:
+        - Play the card in hand slot i
+        - Attack with the card in play area slot j
+        - Block with the card in play area slot k, or don't block
+        - Use a mindbug or not
+        - Go again with Frenzy or not
+        - Hunt the card in the opponent's play area slot j
+        - Play the i-th valid target from a discard pile
+        - Choose a subset of the valid targets (to steal, discard or defeat), as a bitmask of their positions
+    Actions beyond the size limits (e.g. a hand with more than max_hand_size cards) can't be represented,
+    and are left out of the legality masks.
+    """
+    def __init__(self, max_hand_size: int = 10, max_play_area_size: int = 10, max_targets: int = 8) -> None:
+        """
+        Args:
+            max_hand_size: Number of hand slots
+            max_play_area_size: Number of play area slots
+            max_targets: Number of valid targets that can be chosen from
+        """
+        self.max_hand_size = max_hand_size
+        self.max_play_area_size = max_play_area_size
+        self.max_targets = max_targets
+
+        self.play_offset = 0
+        self.attack_offset = self.play_offset + max_hand_size
+        self.block_offset = self.attack_offset + max_play_area_size
+        self.no_block_index = self.block_offset + max_play_area_size
+        self.mindbug_offset = self.no_block_index + 1 # Use mindbug, then don't
+        self.frenzy_offset = self.mindbug_offset + 2 # Go again, then don't
+        self.hunt_offset = self.frenzy_offset + 2
+        self.play_from_discard_offset = self.hunt_offset + max_play_area_size
+        self.target_subset_offset = self.play_from_discard_offset + max_targets
+        self.size = self.target_subset_offset + (1 << max_targets)
+
+    # --- From actions to indices ---
+
+    def encode(self, game_state: GameState, action: Action) -> int:
+        """
+        Returns the index of an action in the current game state.
+        Raises ValueError if the action can't be represented.
+        """
+        index = self._encode(game_state, action)
+        if index is None:
+            raise ValueError(f"{action} can't be represented in the action space.")
+        return index
+
+    def _encode(self, game_state: GameState, action: Action) -> Optional[int]:
+        if isinstance(action, PlayCardAction):
+            return self._slot_index(game_state, action.card_handle, "hand", self.play_offset, self.max_hand_size)
+        elif isinstance(action, AttackAction):
+            return self._slot_index(game_state, action.attacking_card_handle, "play_area",
+                                    self.attack_offset, self.max_play_area_size)
+        elif isinstance(action, BlockAction):
+            if action.blocking_card_handle is None:
+                return self.no_block_index
+            return self._slot_index(game_state, action.blocking_card_handle, "play_area",
+                                    self.block_offset, self.max_play_area_size)
+        elif isinstance(action, MindbugAction):
+            return self.mindbug_offset + (0 if action.use_mindbug else 1)
+        elif isinstance(action, FrenzyAction):
+            return self.frenzy_offset + (0 if action.go_again else 1)
+        elif isinstance(action, HuntAction):
+            if action.card_handle is None:
+                return None
+            return self._slot_index(game_state, action.card_handle, "play_area",
+                                    self.hunt_offset, self.max_play_area_size)
+        elif isinstance(action, PlayFromDiscardAction):
+            position = self._target_position(game_state, action.card_handle)
+            return None if position is None else self.play_from_discard_offset + position
+        elif isinstance(action, (StealAction, DiscardAction, DefeatAction)):
+            subset_mask = 0
+            for card_handle in action.card_handles:
+                position = self._target_position(game_state, card_handle)
+                if position is None:
+                    return None
+                subset_mask |= 1 << position
+            return self.target_subset_offset + subset_mask
+        raise ValueError(f"Unknown action type: {type(action).__name__}")
+
+    def _slot_index(self, game_state: GameState, card_handle: int, zone: str,
+                    offset: int, max_slots: int) -> Optional[int]:
+        """Index of an action on the card in a slot of a zone, or None if the slot doesn't fit."""
+        _, card_zone, position = game_state.get_card_location(card_handle)
+        if card_zone != zone:
+            raise ValueError(f"Card with handle {card_handle} is not in a {zone}.")
+        return offset + position if position < max_slots else None
+
+    def _target_position(self, game_state: GameState, card_handle: int) -> Optional[int]:
+        """Position of a card in the valid targets, or None if it doesn't fit."""
+        if not game_state._valid_targets or card_handle not in game_state._valid_targets:
+            raise ValueError(f"Card with handle {card_handle} is not a valid target.")
+        position = game_state._valid_targets.index(card_handle)
+        return position if position < self.max_targets else None
+
+    # --- From indices to actions ---
+
+    def decode(self, game_state: GameState, index: int) -> Action:
+        """
+        Returns the action with the given index in the current game state.
+        The action is not checked to be legal; use the legality masks for that.
+        """
+        player = game_state.get_active_player()
+        opponent = game_state.get_inactive_player()
+        if not 0 <= index < self.size:
+            raise ValueError(f"Action index {index} out of range (size {self.size}).")
+
+        if index < self.attack_offset:
+            return PlayCardAction(player.id, self._card_in_slot(player.hand, index - self.play_offset))
+        elif index < self.block_offset:
+            return AttackAction(player.id, self._card_in_slot(player.play_area, index - self.attack_offset))
+        elif index < self.no_block_index:
+            return BlockAction(player.id, self._card_in_slot(player.play_area, index - self.block_offset))
+        elif index == self.no_block_index:
+            return BlockAction(player.id, None)
+        elif index < self.frenzy_offset:
+            return MindbugAction(player.id, use_mindbug=(index == self.mindbug_offset))
+        elif index < self.hunt_offset:
+            return FrenzyAction(player.id, go_again=(index == self.frenzy_offset))
+        elif index < self.play_from_discard_offset:
+            return HuntAction(player.id, self._card_in_slot(opponent.play_area, index - self.hunt_offset))
+        elif index < self.target_subset_offset:
+            return PlayFromDiscardAction(player.id, self._valid_target(game_state, index - self.play_from_discard_offset))
+        else:
+            if game_state._pending_action not in TARGET_SUBSET_PHASES:
+                raise ValueError(f"Action index {index} chooses targets, but the pending action is {game_state._pending_action}.")
+            subset_mask = index - self.target_subset_offset
+            card_handles = [self._valid_target(game_state, position)
+                            for position in range(self.max_targets) if subset_mask >> position & 1]
+            return TARGET_SUBSET_PHASES[game_state._pending_action](player.id, card_handles)
+
+    @staticmethod
+    def _card_in_slot(zone: List, slot: int) -> int:
+        if slot >= len(zone):
+            raise ValueError(f"There is no card in slot {slot}.")
+        return zone[slot].handle
+
+    @staticmethod
+    def _valid_target(game_state: GameState, position: int) -> int:
+        if not game_state._valid_targets or position >= len(game_state._valid_targets):
+            raise ValueError(f"There is no valid target in position {position}.")
+        return game_state._valid_targets[position]
+
+    # --- Legality masks ---
+
+    def legal_indices(self, game_state: GameState, valid_actions: Iterable[Action]) -> List[int]:
+        """
+        Returns the sorted indices of the valid actions of a game state.
+
+        Args:
+            game_state: The current game state
+            valid_actions: Its valid actions, e.g. a ValidActions sequence or GameEngine.iter_valid_actions.
+                They are not used when choosing a subset of targets, which are found from the game state.
+        """
+        if game_state.game_over:
+            return []
+        if game_state._pending_action in TARGET_SUBSET_PHASES:
+            _, valid_targets, min_size, max_size = GameEngine._target_subsets(game_state)
+            n = min(len(valid_targets), self.max_targets)
+            return [self.target_subset_offset + subset_mask for subset_mask in range(1 << n)
+                    if min_size <= subset_mask.bit_count() <= max_size]
+        indices = (self._encode(game_state, action) for action in valid_actions)
+        return sorted(index for index in indices if index is not None)
+
+    def legal_bitmask(self, game_state: GameState, valid_actions: Iterable[Action]) -> int:
+        """Returns the legal actions as the bits of an integer (bit i set if action i is legal)."""
+        bitmask = 0
+        for index in self.legal_indices(game_state, valid_actions):
+            bitmask |= 1 << index
+        return bitmask
+
+    def legal_mask(self, game_state: GameState, valid_actions: Iterable[Action]):
+        """Returns the legal actions as a NumPy boolean array of length size."""
+        import numpy as np # Only needed by agents that work with arrays
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.legal_indices(game_state, valid_actions)] = True
+        return mask
@@ -0,0 +1,781 @@
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+from src.core.game_engine import GameEngine
+import src.core.game_rules as GameRules
+from src.models.game_state import GameState, ZONES, PHASES, DECISION_PHASES
+from src.models.player import Player
+from src.models.card import Card, Keyword
+from src.models.action import *
+from src.agents.random_agent import RandomAgent
+
+# Zones of a card, as stored in BatchEngine.loc: player index * 4 + zone (-1 if the card is not in the game)
+DECK, HAND, PLAY_AREA, DISCARD_PILE = range(4)
+
+# Pending actions of a game, as indices in PHASES
+(PLAY_OR_ATTACK, MINDBUG, BLOCK, HUNT, FRENZY,
+ CONTINUE_ATTACK, RESOLVE_ATTACK, FRENZY_ATTACK, FINISH_ACTION) = range(len(PHASES))
+
+# Abilities that are applied to whole batches. Cards with any other ability are handled one game
+# at a time by the handlers of game_rules (see BatchEngine._fallback).
+_NO_ABILITY, _OTHER_ABILITY = 0, 1
+_PLAY_ABILITIES = {"axolotl_healer": 2, "killer_bee": 3, "mysterious_mermaid": 4, "giraffodile": 5,
+                   "brain_fly": 6, "ferret_bomber": 7, "kangasaurus_rex": 8, "tiger_squirrel": 9,
+                   "compost_dragon": 10, "grave_robber": 11}
+(_AXOLOTL_HEALER, _KILLER_BEE, _MYSTERIOUS_MERMAID, _GIRAFFODILE, _BRAIN_FLY,
+ _FERRET_BOMBER, _KANGASAURUS_REX, _TIGER_SQUIRREL, _COMPOST_DRAGON, _GRAVE_ROBBER) = range(2, 12)
+_ATTACK_ABILITIES = {"chameleon_sniper": 2, "turbo_bug": 3, "shark_dog": 4, "snail_hydra": 5, "tusked_extorter": 6}
+_CHAMELEON_SNIPER, _TURBO_BUG, _SHARK_DOG, _SNAIL_HYDRA, _TUSKED_EXTORTER = range(2, 7)
+
+# Keywords that Sharky Crab-Dog-Mummypus copies from the enemy creatures
+_SHARKY_KEYWORDS = int(Keyword.HUNTER | Keyword.SNEAKY | Keyword.FRENZY | Keyword.POISONOUS)
+
+class BatchEngine:
+    """
+    Plays many games in lockstep, holding all of them in NumPy arrays: every call to step
+    advances each unfinished game by one decision. It follows the rules of GameEngine, but
+    every card of the base set (playing, attacking, blocking, hunting, combat, mindbugs, Frenzy,
+    the keywords and all the abilities) is applied to all games at once. The choices of the
+    abilities are made uniformly at random, as the fallback agents would. Only a card with an
+    ability the batch doesn't know sends its game to the fallback: that game alone is turned
+    into a GameState, the action is applied with the handlers of game_rules, the choices are
+    made by random fallback agents, and the game is loaded back into the arrays once it waits
+    for a decision the batch can handle.
+
+    The batch pays a fixed cost per step, so it only pays off with thousands of games. Playing
+    random games on one core, it is about 4 times as fast as GameEngine with 4096 games and
+    about 9 times as fast with 65536 games (around 560 against 2200 and 4900 games per second).
+    Most of the time goes to recomputing the passive layer over the whole card pool of every game.
+
+    Actions are integers that refer to cards by handle (index in the card pool), C being the number of cards:
+        - [0, C): play card c from hand
+        - [C, 2C): attack with card c
+        - [2C, 3C): block with card c
+        - [3C, 4C): hunt card c
+        - 4C: don't block
+        - 4C + 1, 4C + 2: use a mindbug, then don't
+        - 4C + 3, 4C + 4: go again with Frenzy, then don't
+
+    The games are dealt with the batch's own random generator, so they are not the games
+    that GameEngine.play_game would play from the same seed.
+    """
+    def __init__(self, all_cards: List[Card], n_games: int, deck_size: int = 10, hand_size: int = 5,
+                 player_ids: Sequence[str] = ("player1", "player2"), seed: Optional[int] = None) -> None:
+        """
+        Args:
+            all_cards: The card pool, whose handles must be their indices (as loaded by load_cards_from_json)
+            n_games: Number of games played at once
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            player_ids: IDs of the two players. The first one starts every game.
+            seed: Seed of the random generator, used for dealing, the random policy and the fallback agents
+        """
+        if any(card.handle != index for index, card in enumerate(all_cards)):
+            raise ValueError("The handles of the cards must be their indices in the card pool.")
+        if len(all_cards) < deck_size * 2:
+            raise ValueError(f"Not enough creature cards to form decks. Need at least {deck_size * 2}, but found {len(all_cards)}.")
+        self.all_cards = all_cards
+        self.n_games = n_games
+        self.n_cards = len(all_cards)
+        self.deck_size = deck_size
+        self.hand_size = hand_size
+        self.player_ids = tuple(player_ids)
+
+        C = self.n_cards
+        self.no_block_action = 4 * C
+        self.use_mindbug_action = 4 * C + 1
+        self.pass_mindbug_action = 4 * C + 2
+        self.go_again_action = 4 * C + 3
+        self.stop_frenzy_action = 4 * C + 4
+        self.n_actions = 4 * C + 5
+
+        # Card data, indexed by handle
+        self._power = np.array([card.power for card in all_cards], dtype=np.int16)
+        self._keywords = np.array([int(card.keyword_mask) for card in all_cards], dtype=np.uint8)
+        self._card_ids = np.array([card.id for card in all_cards])
+        self._is = {card_id: self._card_ids == card_id for card_id in
+                    ("goblin_werewolf", "lone_yeti", "shield_bugs", "urchin_hurler", "sharky_crab-dog-mummypus",
+                     "snail_thrower", "deathweaver", "bee_bear", "elephantopus", "strange_barrel")}
+        self._handles = {card_id: np.flatnonzero(is_card) for card_id, is_card in self._is.items()}
+        self._play_ability = np.array([
+            _PLAY_ABILITIES.get(card.id, _OTHER_ABILITY) if card.ability_type == "play" else _NO_ABILITY
+            for card in all_cards], dtype=np.int8)
+        self._attack_ability = np.array([
+            _ATTACK_ABILITIES.get(card.id, _OTHER_ABILITY) if card.ability_type == "attack" else _NO_ABILITY
+            for card in all_cards], dtype=np.int8)
+
+        self.fallback_agents = {player_id: RandomAgent(player_id) for player_id in self.player_ids}
+        self._fallback_engine = GameEngine(all_cards=all_cards, deck_size=deck_size, hand_size=hand_size,
+                                           agents=self.fallback_agents)
+        self.n_fallbacks = 0
+        self.reset(seed)
+
+    # --- Setup ---
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Deals a new set of games."""
+        N, C = self.n_games, self.n_cards
+        self.rng = np.random.default_rng(seed)
+        for agent in self.fallback_agents.values():
+            agent.seed(int(self.rng.integers(2**63)))
+
+        # Shuffle the card pool of every game: the first cards go to player 1's hand and deck,
+        # the next ones to player 2's. stamp orders the cards within each zone.
+        position = self.rng.random((N, C)).argsort(axis=1).argsort(axis=1)
+        self.loc = np.full((N, C), -1, dtype=np.int8)
+        self.loc[position < 2 * self.deck_size] = 4 + DECK
+        self.loc[position < self.deck_size + self.hand_size] = 4 + HAND
+        self.loc[position < self.deck_size] = DECK
+        self.loc[position < self.hand_size] = HAND
+        self.stamp = position.astype(np.int32)
+        self.counter = np.full(N, C, dtype=np.int32) # Next stamp of each game
+        self.exhausted = np.zeros((N, C), dtype=bool)
+        self.targets = np.zeros((N, C), dtype=bool) # Valid blockers or hunting targets
+
+        self.life = np.full((N, 2), 3, dtype=np.int16)
+        self.mindbugs = np.full((N, 2), 2, dtype=np.int8)
+        self.active = np.zeros(N, dtype=np.int8)
+        self.turn_count = np.ones(N, dtype=np.int32)
+        self.phase = np.full(N, PLAY_OR_ATTACK, dtype=np.int8)
+        self.mindbug_card = np.full(N, -1, dtype=np.int16)
+        self.attack_card = np.full(N, -1, dtype=np.int16)
+        self.block_card = np.full(N, -1, dtype=np.int16)
+        self.frenzy_active = np.zeros(N, dtype=bool)
+        self.already_hunted = np.zeros(N, dtype=bool)
+        self.switch_back = np.zeros(N, dtype=bool)
+        self.game_over = np.zeros(N, dtype=bool)
+        self.winner = np.full(N, -1, dtype=np.int8)
+        self.actions_taken = np.zeros(N, dtype=np.int32)
+        self._legal_mask: Optional[np.ndarray] = None
+
+    # --- Passive layer ---
+
+    @staticmethod
+    def _own(values: np.ndarray, controller: np.ndarray) -> np.ndarray:
+        """Picks, for every card, the value of its controller from an (n, 2) array."""
+        return np.where(controller == 1, values[:, 1:2], values[:, 0:1])
+
+    def _in_play_counts(self, loc: np.ndarray, card_id: Optional[str] = None) -> np.ndarray:
+        """Number of cards (or of copies of the given card) in the play area of each player, as an (n, 2) array."""
+        if card_id is not None:
+            loc = loc[:, self._handles[card_id]]
+        return np.stack([(loc == PLAY_AREA).sum(axis=1), (loc == 4 + PLAY_AREA).sum(axis=1)], axis=1)
+
+    def _effective_power(self, idx: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """
+        Effective power of every card of the given games (meaningful for cards in play),
+        while the given players are active. Follows game_rules.get_effective_power.
+        """
+        loc = self.loc[idx]
+        controller = loc >> 2
+        in_play = (loc & 3) == PLAY_AREA
+        controller_active = controller == active[:, None]
+
+        # Shield Bugs and Urchin Hurler give every other creature of their controller the same bonus
+        player_bonus = (self._in_play_counts(loc, "shield_bugs")
+                        + 2 * self._in_play_counts(loc, "urchin_hurler") * (np.arange(2) == active[:, None]))
+        bonus = (self._own(player_bonus, controller) - self._is["shield_bugs"]
+                 - 2 * (self._is["urchin_hurler"] & controller_active))
+        bonus += 6 * (self._is["goblin_werewolf"] & controller_active)
+        yetis = self._handles["lone_yeti"]
+        bonus[:, yetis] += 5 * (self._own(self._in_play_counts(loc), controller[:, yetis]) == 1)
+        return self._power + in_play * bonus
+
+    def _effective_keywords(self, idx: np.ndarray, power: np.ndarray) -> np.ndarray:
+        """
+        Effective keyword masks of every card of the given games (meaningful for cards in play),
+        given their effective power. Follows game_rules.get_effective_keywords.
+        """
+        loc = self.loc[idx]
+        controller = loc >> 2
+        in_play = (loc & 3) == PLAY_AREA
+        keywords = np.broadcast_to(self._keywords, loc.shape).copy()
+
+        yetis = self._handles["lone_yeti"]
+        alone = self._own(self._in_play_counts(loc), controller[:, yetis]) == 1
+        keywords[:, yetis] |= np.where(alone, int(Keyword.FRENZY), 0).astype(np.uint8)
+
+        sharkies = self._handles["sharky_crab-dog-mummypus"]
+        if len(sharkies):
+            enemy_keywords = np.stack([np.bitwise_or.reduce(np.where(loc == 4 * player + PLAY_AREA, self._keywords, 0), axis=1)
+                                       for player in (1, 0)], axis=1) & _SHARKY_KEYWORDS
+            keywords[:, sharkies] |= self._own(enemy_keywords, controller[:, sharkies]).astype(np.uint8)
+
+        other_throwers = (self._own(self._in_play_counts(loc, "snail_thrower"), controller)
+                          - (self._is["snail_thrower"] & in_play))
+        keywords[(other_throwers > 0) & (power <= 4)] |= int(Keyword.HUNTER | Keyword.POISONOUS)
+        return keywords
+
+    # --- Legal actions and random policy ---
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        Returns the legal actions of every game as an (n_games, n_actions) boolean array.
+        Finished games have no legal actions.
+        """
+        if self._legal_mask is not None:
+            return self._legal_mask
+        C = self.n_cards
+        mask = np.zeros((self.n_games, self.n_actions), dtype=bool)
+        live = ~self.game_over
+
+        rows = np.flatnonzero(live & (self.phase == PLAY_OR_ATTACK))
+        owner = (4 * self.active[rows])[:, None]
+        mask[rows, :C] = self.loc[rows] == owner + HAND
+        mask[rows, C:2 * C] = self.loc[rows] == owner + PLAY_AREA
+
+        rows = np.flatnonzero(live & (self.phase == BLOCK))
+        mask[rows, 2 * C:3 * C] = self.targets[rows]
+        mask[rows, self.no_block_action] = True
+
+        rows = np.flatnonzero(live & (self.phase == HUNT))
+        mask[rows, 3 * C:4 * C] = self.targets[rows]
+
+        rows = np.flatnonzero(live & (self.phase == MINDBUG))
+        mask[rows, self.use_mindbug_action] = mask[rows, self.pass_mindbug_action] = True
+
+        rows = np.flatnonzero(live & (self.phase == FRENZY))
+        mask[rows, self.go_again_action] = mask[rows, self.stop_frenzy_action] = True
+
+        self._legal_mask = mask
+        return mask
+
+    def random_actions(self) -> np.ndarray:
+        """
+        Chooses a legal action uniformly at random in every game (-1 for finished games).
+        """
+        actions = np.full(self.n_games, -1)
+        idx = np.flatnonzero(~self.game_over)
+        games, legal_actions = np.nonzero(self.legal_mask()[idx])
+        counts = np.bincount(games, minlength=len(idx))
+        choice = (self.rng.random(len(idx)) * counts).astype(np.int64)
+        actions[idx] = legal_actions[np.cumsum(counts) - counts + choice]
+        return actions
+
+    # --- Advancing the games ---
+
+    def step(self, actions: np.ndarray) -> None:
+        """
+        Applies one action to every unfinished game (actions of finished games are ignored),
+        and resolves the steps that follow automatically.
+        """
+        actions = np.asarray(actions)
+        idx = np.flatnonzero(~self.game_over)
+        chosen = actions[idx]
+        if not self.legal_mask()[idx, chosen].all():
+            raise ValueError(f"Illegal actions for games {idx[~self.legal_mask()[idx, chosen]].tolist()}.")
+        self._legal_mask = None
+        self.actions_taken[idx] += 1
+
+        C = self.n_cards
+        kind = np.where(chosen < 4 * C, chosen // C, chosen - 4 * C + 4)
+        cards = chosen % C
+        self._play_card(idx[kind == 0], cards[kind == 0])
+        self._declare_attack(idx[kind == 1], cards[kind == 1])
+        self._block(idx[kind == 2], cards[kind == 2])
+        self._hunt(idx[kind == 3], cards[kind == 3])
+        self._block(idx[kind == 4], np.full((kind == 4).sum(), -1))
+        self._mindbug(idx[kind == 5], True)
+        self._mindbug(idx[kind == 6], False)
+        self._frenzy(idx[kind == 7], True)
+        self._frenzy(idx[kind == 8], False)
+
+        self.resolve_automatic_steps()
+
+    def play_random(self, max_steps: int = 10000) -> None:
+        """Plays all the games to the end with the random policy."""
+        for _ in range(max_steps):
+            if self.game_over.all():
+                return
+            self.step(self.random_actions())
+        raise RuntimeError(f"Games not finished after {max_steps} steps.")
+
+    # --- Rules applied to batches (each function takes the indices of the games it applies to) ---
+
+    def _move(self, idx: np.ndarray, cards: np.ndarray, new_loc: np.ndarray) -> None:
+        """Moves one card of each game to the end of a zone."""
+        self.loc[idx, cards] = new_loc
+        self.stamp[idx, cards] = self.counter[idx]
+        self.counter[idx] += 1
+
+    def _draw(self, idx: np.ndarray, player: np.ndarray) -> np.ndarray:
+        """Players draw the top card of their deck, if any. Returns whether each of them drew a card."""
+        in_deck = self.loc[idx] == (4 * player + DECK)[:, None]
+        drew = in_deck.any(axis=1)
+        top_card = np.where(in_deck, self.stamp[idx], np.iinfo(np.int32).max).argmin(axis=1)
+        self._move(idx[drew], top_card[drew], 4 * player[drew] + HAND)
+        return drew
+
+    def _draw_up(self, idx: np.ndarray, player: np.ndarray) -> None:
+        """Players draw cards until they have hand_size cards in hand or their deck is empty."""
+        while len(idx):
+            drawing = (self.loc[idx] == (4 * player + HAND)[:, None]).sum(axis=1) < self.hand_size
+            idx, player = idx[drawing], player[drawing]
+            drew = self._draw(idx, player)
+            idx, player = idx[drew], player[drew]
+
+    def _end_game(self, idx: np.ndarray, winner: np.ndarray) -> None:
+        self.game_over[idx] = True
+        self.winner[idx] = winner
+
+    def _lose_life(self, idx: np.ndarray, player: np.ndarray) -> None:
+        self.life[idx, player] -= 1
+        dead = self.life[idx, player] <= 0
+        self._end_game(idx[dead], 1 - player[dead])
+
+    def _end_turn(self, idx: np.ndarray) -> None:
+        idx = idx[~self.game_over[idx]]
+        self.active[idx] ^= 1
+        self.turn_count[idx] += 1
+        self.phase[idx] = PLAY_OR_ATTACK
+
+    def _finish_action(self, idx: np.ndarray) -> None:
+        idx = idx[~self.game_over[idx]]
+        back = idx[self.switch_back[idx]]
+        self.active[back] ^= 1
+        self.switch_back[back] = False
+        self._end_turn(idx)
+
+    def _play_card(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        player = self.active[idx]
+        self._move(idx, cards, 4 * player + PLAY_AREA)
+        self._draw_up(idx, player)
+
+        offered = self.mindbugs[idx, 1 - player] > 0
+        self.mindbug_card[idx[offered]] = cards[offered]
+        self.phase[idx[offered]] = MINDBUG
+        self.active[idx[offered]] ^= 1
+        self._activate_play_ability(idx[~offered], cards[~offered])
+
+    def _mindbug(self, idx: np.ndarray, use_mindbug: bool) -> None:
+        cards = self.mindbug_card[idx]
+        if use_mindbug:
+            player = self.active[idx]
+            self.mindbugs[idx, player] -= 1
+            self._move(idx, cards, 4 * player + PLAY_AREA)
+            # The active player is not switched back, so the player who played the card goes again
+        else:
+            self.active[idx] ^= 1
+        self.mindbug_card[idx] = -1
+        self._activate_play_ability(idx, cards)
+
+    def _activate_play_ability(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        """Play abilities of cards controlled by the active player, followed by the end of the turn."""
+        player = self.active[idx]
+        ability = self._play_ability[cards]
+        deathweaver = (self._is["deathweaver"] & (self.loc[idx] == (4 * (1 - player) + PLAY_AREA)[:, None])).any(axis=1)
+        ability[deathweaver] = _NO_ABILITY
+
+        games, owner = idx[ability == _AXOLOTL_HEALER], player[ability == _AXOLOTL_HEALER]
+        self.life[games, owner] += 2
+        games, owner = idx[ability == _KILLER_BEE], player[ability == _KILLER_BEE]
+        self._lose_life(games, 1 - owner)
+        games, owner = idx[ability == _MYSTERIOUS_MERMAID], player[ability == _MYSTERIOUS_MERMAID]
+        self.life[games, owner] = self.life[games, 1 - owner]
+        self._draw_discard_pile(idx[ability == _GIRAFFODILE], player[ability == _GIRAFFODILE])
+        games, owner = idx[ability == _BRAIN_FLY], player[ability == _BRAIN_FLY]
+        self._steal_creature(games, owner, self._enemies(games, owner) & (self._effective_power(games, owner) >= 6))
+        # The discard for Ferret Bomber switches the active player there and back, which uses up the flag
+        # that Tusked Extorter may have left (see _declare_attack)
+        games, owner = idx[ability == _FERRET_BOMBER], player[ability == _FERRET_BOMBER]
+        discarded = self._discard(games, 1 - owner, 2)
+        self.switch_back[games[discarded]] = False
+        self._defeat_weak_enemies(idx[ability == _KANGASAURUS_REX], player[ability == _KANGASAURUS_REX])
+        games, owner = idx[ability == _TIGER_SQUIRREL], player[ability == _TIGER_SQUIRREL]
+        self._defeat_chosen(games, self._enemies(games, owner) & (self._effective_power(games, owner) >= 7))
+
+        # Compost Dragon and Grave Robber play a card from a discard pile, whose own Play ability follows
+        from_discard = np.flatnonzero((ability == _COMPOST_DRAGON) | (ability == _GRAVE_ROBBER))
+        games, owner = idx[from_discard], player[from_discard]
+        pile_owner = np.where(ability[from_discard] == _COMPOST_DRAGON, owner, 1 - owner)
+        chosen = self._choose_targets(games, self.loc[games] == (4 * pile_owner + DISCARD_PILE)[:, None], 1)[:, 0]
+        playing = chosen >= 0
+        if playing.any():
+            self._move(games[playing], chosen[playing], 4 * owner[playing] + PLAY_AREA)
+            self._activate_play_ability(games[playing], chosen[playing])
+            ability[from_discard[playing]] = -1
+
+        fallback = np.flatnonzero(ability == _OTHER_ABILITY)
+        for game_index, card in zip(idx[fallback].tolist(), cards[fallback].tolist()):
+            self._fallback(game_index, lambda engine, game_state, card=card:
+                           GameRules.activate_play_ability(game_state, card, engine.agents))
+        ability[fallback] = -1
+        self.phase[idx[ability >= 0]] = FINISH_ACTION
+
+    def _draw_discard_pile(self, idx: np.ndarray, player: np.ndarray) -> None:
+        """Players take their whole discard pile into their hand, keeping its order."""
+        in_pile = self.loc[idx] == (4 * player + DISCARD_PILE)[:, None]
+        stamp = np.where(in_pile, self.stamp[idx], np.iinfo(np.int32).max)
+        rank = (stamp[:, None, :] < stamp[:, :, None]).sum(axis=2)
+        games, cards = np.nonzero(in_pile)
+        self.loc[idx[games], cards] = (4 * player + HAND)[games]
+        self.stamp[idx[games], cards] = self.counter[idx[games]] + rank[games, cards]
+        self.counter[idx] += in_pile.sum(axis=1)
+
+    def _declare_attack(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        """The active player attacks with a card, whose Attack ability is activated."""
+        self.attack_card[idx] = cards
+        player = self.active[idx]
+        ability = self._attack_ability[cards]
+        games, owner = idx[ability == _CHAMELEON_SNIPER], player[ability == _CHAMELEON_SNIPER]
+        self._lose_life(games, 1 - owner)
+        games, owner = idx[ability == _TURBO_BUG], player[ability == _TURBO_BUG]
+        self.life[games, 1 - owner] = np.minimum(self.life[games, 1 - owner], 1)
+        games, owner = idx[ability == _SHARK_DOG], player[ability == _SHARK_DOG]
+        self._defeat_chosen(games, self._enemies(games, owner) & (self._effective_power(games, owner) >= 6))
+
+        # Snail Hydra defeats any other creature if its controller has fewer creatures than the opponent
+        rows = ability == _SNAIL_HYDRA
+        games, owner, hydra = idx[rows], player[rows], cards[rows]
+        allies = self.loc[games] == (4 * owner + PLAY_AREA)[:, None]
+        enemies = self._enemies(games, owner)
+        outnumbered = allies.sum(axis=1) < enemies.sum(axis=1)
+        targets = (allies | enemies) & outnumbered[:, None]
+        targets[np.arange(len(games)), hydra] = False
+        self._defeat_chosen(games, targets)
+
+        # As in GameEngine, the player who discarded for Tusked Extorter is left with the flag that
+        # switches the active player back at the end of the next action that finishes normally
+        games, owner = idx[ability == _TUSKED_EXTORTER], player[ability == _TUSKED_EXTORTER]
+        discarded = self._discard(games, 1 - owner, 1)
+        self.switch_back[games[discarded]] = True
+
+        fallback = np.flatnonzero(ability == _OTHER_ABILITY)
+        for game_index, card in zip(idx[fallback].tolist(), cards[fallback].tolist()):
+            self._fallback(game_index, lambda engine, game_state, card=card:
+                           GameRules.activate_attack_ability(game_state, card, engine.agents))
+        ability[fallback] = -1
+        self.phase[idx[ability >= 0]] = CONTINUE_ATTACK
+
+    def _enemies(self, idx: np.ndarray, player: np.ndarray) -> np.ndarray:
+        """The creatures in play of the opponents of the given players, as an (n, n_cards) boolean array."""
+        return self.loc[idx] == (4 * (1 - player) + PLAY_AREA)[:, None]
+
+    def _choose_targets(self, idx: np.ndarray, targets: np.ndarray, n_choices: int) -> np.ndarray:
+        """
+        Chooses n_choices of the target cards of every game (all of them if there are fewer), each set
+        being equally likely, as the fallback agents choose. Returns them as an (n, n_choices) array of
+        handles in the order of their zones, with -1 after the chosen cards when there are fewer.
+        """
+        rows = np.arange(len(idx))[:, None]
+        chosen = np.argsort(np.where(targets, self.rng.random(targets.shape), 2.0), axis=1)[:, :n_choices]
+        valid = targets[rows, chosen]
+        order = np.argsort(np.where(valid, self.stamp[idx[:, None], chosen], np.iinfo(np.int32).max), axis=1)
+        return np.where(valid, chosen, -1)[rows, order]
+
+    def _discard(self, idx: np.ndarray, player: np.ndarray, n_cards: int) -> np.ndarray:
+        """
+        Players discard n_cards cards of their choice from their hand (all of them if they have fewer),
+        drawing a card after each one. Returns whether each of them discarded any card.
+        """
+        chosen = self._choose_targets(idx, self.loc[idx] == (4 * player + HAND)[:, None], n_cards)
+        for cards in chosen.T:
+            rows = cards >= 0
+            self._move(idx[rows], cards[rows], 4 * player[rows] + DISCARD_PILE)
+            self._draw(idx[rows], player[rows])
+        return chosen[:, 0] >= 0
+
+    def _steal_creature(self, idx: np.ndarray, player: np.ndarray, targets: np.ndarray) -> None:
+        """The given (active) players take control of one of the target creatures of their choice."""
+        cards = self._choose_targets(idx, targets, 1)[:, 0]
+        rows = cards >= 0
+        self._move(idx[rows], cards[rows], 4 * player[rows] + PLAY_AREA)
+
+    def _defeat(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        """
+        Defeats one creature in each game, as game_rules.defeat: Tough creatures that are not exhausted
+        are exhausted instead, and the others go to their controller's discard pile, activating their
+        Defeated ability. As in _resolve_attack, only Strange Barrel's has an effect.
+        """
+        rows = np.arange(len(idx))
+        keywords = self._effective_keywords(idx, self._effective_power(idx, self.active[idx]))[rows, cards]
+        saved = ((keywords & int(Keyword.TOUGH)) > 0) & ~self.exhausted[idx, cards]
+        self.exhausted[idx, cards] = saved
+        games, cards = idx[~saved], cards[~saved]
+        owner = self.loc[games, cards] >> 2
+        self._move(games, cards, 4 * owner + DISCARD_PILE)
+        barrel = self._is["strange_barrel"][cards]
+        self._steal_from_hand(games[barrel], owner[barrel])
+
+    def _defeat_chosen(self, idx: np.ndarray, targets: np.ndarray) -> None:
+        """The active players defeat one of the target creatures of their choice, if there is any."""
+        cards = self._choose_targets(idx, targets, 1)[:, 0]
+        rows = cards >= 0
+        self._defeat(idx[rows], cards[rows])
+
+    def _defeat_weak_enemies(self, idx: np.ndarray, player: np.ndarray) -> None:
+        """
+        Kangasaurus Rex: the given (active) players defeat the enemy creatures with power 4 or less.
+        As in game_rules, the creatures are taken in the order of the play area, and the power of
+        each one is checked when its turn comes, after the previous ones were defeated.
+        """
+        enemies = self._enemies(idx, player)
+        order = np.argsort(np.where(enemies, self.stamp[idx], np.iinfo(np.int32).max), axis=1)
+        for position in range(enemies.sum(axis=1).max(initial=0)):
+            cards = order[:, position]
+            rows = enemies[np.arange(len(idx)), cards]
+            games, owner, cards = idx[rows], player[rows], cards[rows]
+            weak = self._effective_power(games, owner)[np.arange(len(games)), cards] <= 4
+            self._defeat(games[weak], cards[weak])
+
+    def _continue_attack(self, idx: np.ndarray) -> None:
+        """After the Attack ability: the attacker hunts, or the defending player may block."""
+        player = self.active[idx]
+        attacker = self.attack_card[idx]
+        rows = np.arange(len(idx))
+        power = self._effective_power(idx, player)
+        keywords = self._effective_keywords(idx, power)
+        enemies = self.loc[idx] == (4 * (1 - player) + PLAY_AREA)[:, None]
+
+        hunting = ((keywords[rows, attacker] & int(Keyword.HUNTER)) > 0) & ~self.already_hunted[idx]
+        attacker_keywords = keywords[rows, attacker][:, None]
+        sneaky_blocked = ((attacker_keywords & ~keywords & int(Keyword.SNEAKY)) > 0)
+        bee_bear_blocked = self._is["bee_bear"][attacker][:, None] & (power <= 6)
+        elephantopus = (self._is["elephantopus"] & (self.loc[idx] == (4 * player + PLAY_AREA)[:, None])).any(axis=1)
+        elephantopus_blocked = elephantopus[:, None] & (power <= 4)
+        targets = np.where(hunting[:, None], enemies, enemies & ~sneaky_blocked & ~bee_bear_blocked & ~elephantopus_blocked)
+
+        has_targets = targets.any(axis=1)
+        self.targets[idx] = targets
+        self.phase[idx] = RESOLVE_ATTACK
+        self.phase[idx[has_targets & hunting]] = HUNT
+        blocking = idx[has_targets & ~hunting]
+        self.phase[blocking] = BLOCK
+        self.active[blocking] ^= 1
+
+    def _block(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        self.block_card[idx] = cards
+        self.phase[idx] = RESOLVE_ATTACK
+        self.active[idx] ^= 1
+
+    def _hunt(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        self.block_card[idx] = cards
+        self.already_hunted[idx] = True
+        self.phase[idx] = RESOLVE_ATTACK
+
+    def _combat_defeats(self, idx: np.ndarray, attacker_player: np.ndarray,
+                        attacker: np.ndarray, blocker: np.ndarray) -> List:
+        """
+        Returns, for the attacker and the blocker, their handles, whether they are defeated
+        in the combat and whether they are sent to the discard pile (i.e. not saved by Tough).
+        """
+        rows = np.arange(len(idx))
+        power = self._effective_power(idx, attacker_player)
+        keywords = self._effective_keywords(idx, power)
+        attacker_power, blocker_power = power[rows, attacker], power[rows, blocker]
+        attacker_keywords, blocker_keywords = keywords[rows, attacker], keywords[rows, blocker]
+        attacker_defeated = ((blocker_keywords & int(Keyword.POISONOUS)) > 0) | (blocker_power >= attacker_power)
+        blocker_defeated = ((attacker_keywords & int(Keyword.POISONOUS)) > 0) | (attacker_power >= blocker_power)
+        result = []
+        for card, card_keywords, defeated in ((attacker, attacker_keywords, attacker_defeated),
+                                              (blocker, blocker_keywords, blocker_defeated)):
+            saved = ((card_keywords & int(Keyword.TOUGH)) > 0) & ~self.exhausted[idx, card]
+            result.append((card, defeated, defeated & ~saved))
+        return result
+
+    def _resolve_attack(self, idx: np.ndarray) -> None:
+        player = self.active[idx]
+        attacker = self.attack_card[idx]
+        blocked = self.block_card[idx] >= 0
+
+        self._lose_life(idx[~blocked], 1 - player[~blocked])
+
+        games = idx[blocked]
+        barrel_games, barrel_owners = [], []
+        for card, defeated, discarded in self._combat_defeats(games, player[blocked], attacker[blocked],
+                                                               self.block_card[games]):
+            self.exhausted[games[defeated & ~discarded], card[defeated & ~discarded]] = True
+            self.exhausted[games[discarded], card[discarded]] = False
+            owner = self.loc[games[discarded], card[discarded]] >> 2
+            self._move(games[discarded], card[discarded], 4 * owner + DISCARD_PILE)
+            barrel = self._is["strange_barrel"][card[discarded]]
+            barrel_games.append(games[discarded][barrel])
+            barrel_owners.append(owner[barrel])
+        # Defeated abilities. Only Strange Barrel's has an effect here: the abilities that ask for
+        # a choice (Explosive Toad, Harpy Mother) are overridden when the turn ends, as in GameEngine.
+        self._steal_from_hand(np.concatenate(barrel_games), np.concatenate(barrel_owners))
+        self.block_card[games] = -1
+        self.already_hunted[games] = False
+
+        # Frenzy: the attacker may attack again once, if it survived
+        rows = np.arange(len(idx))
+        keywords = self._effective_keywords(idx, self._effective_power(idx, player))
+        frenzy = (((keywords[rows, attacker] & int(Keyword.FRENZY)) > 0) & ~self.frenzy_active[idx]
+                  & (self.loc[idx, attacker] == 4 * player + PLAY_AREA))
+        self.phase[idx[frenzy]] = FRENZY
+        self.frenzy_active[idx[frenzy]] = True
+        done = idx[~frenzy]
+        self.frenzy_active[done] = False
+        self.attack_card[done] = -1
+        self.block_card[done] = -1
+        self.already_hunted[done] = False
+        self._end_turn(done)
+
+    def _steal_from_hand(self, idx: np.ndarray, player: np.ndarray) -> None:
+        """Players take two random cards (or as many as there are) from their opponent's hand."""
+        in_hand = self.loc[idx] == (4 * (1 - player) + HAND)[:, None]
+        order = np.argsort(np.where(in_hand, self.rng.random(in_hand.shape), 2.0), axis=1)
+        rows = np.arange(len(idx))
+        for cards in order[:, :2].T:
+            stolen = in_hand[rows, cards]
+            self._move(idx[stolen], cards[stolen], 4 * player[stolen] + HAND)
+
+    def _frenzy(self, idx: np.ndarray, go_again: bool) -> None:
+        if go_again:
+            self.phase[idx] = FRENZY_ATTACK
+            self.frenzy_active[idx] = True
+        else:
+            self._end_turn(idx)
+
+    def resolve_automatic_steps(self) -> None:
+        """
+        Resolves the steps that need no decision in all games, until every game waits for a decision
+        or is over. A player who has to play or attack but has neither cards in hand nor creatures loses.
+        """
+        handlers = {FINISH_ACTION: self._finish_action, CONTINUE_ATTACK: self._continue_attack,
+                    RESOLVE_ATTACK: self._resolve_attack,
+                    FRENZY_ATTACK: lambda idx: self._declare_attack(idx, self.attack_card[idx])}
+        while True:
+            pending = ~self.game_over & (self.phase >= CONTINUE_ATTACK)
+            if not pending.any():
+                break
+            for phase, handler in handlers.items():
+                idx = np.flatnonzero(pending & (self.phase == phase))
+                if len(idx):
+                    handler(idx)
+
+        idx = np.flatnonzero(~self.game_over & (self.phase == PLAY_OR_ATTACK))
+        owner = (4 * self.active[idx])[:, None]
+        loc = self.loc[idx]
+        stuck = ~((loc == owner + HAND) | (loc == owner + PLAY_AREA)).any(axis=1)
+        self._end_game(idx[stuck], 1 - self.active[idx[stuck]])
+        self._legal_mask = None
+
+    # --- Games one at a time ---
+
+    def _fallback(self, game_index: int, activate_ability: Callable[[GameEngine, GameState], GameState]) -> None:
+        """
+        Resolves an ability in one game with the handlers of game_rules: the game is turned into a
+        GameState, the ability is activated, and the game is played on with GameEngine (the fallback
+        agents making the choices) until it waits for a decision the batch can handle, or is over.
+        """
+        self.n_fallbacks += 1
+        engine = self._fallback_engine
+        game_state = activate_ability(engine, self.to_game_state(game_index))
+        engine.resolve_automatic_steps(game_state)
+        while not game_state.game_over and game_state._pending_action not in DECISION_PHASES:
+            action = engine.choose_next_action(game_state)
+            if action is None:
+                break
+            engine._dispatch_action(game_state, action)
+            engine.resolve_automatic_steps(game_state)
+        self.load_game_state(game_index, game_state)
+
+    def to_action(self, game_index: int, action_index: int) -> Action:
+        """Returns the Action object of an action index in one of the games."""
+        C = self.n_cards
+        player_id = self.player_ids[self.active[game_index]]
+        card = action_index % C
+        if action_index < C:
+            return PlayCardAction(player_id, card)
+        elif action_index < 2 * C:
+            return AttackAction(player_id, card)
+        elif action_index < 3 * C:
+            return BlockAction(player_id, card)
+        elif action_index < 4 * C:
+            return HuntAction(player_id, card)
+        elif action_index == self.no_block_action:
+            return BlockAction(player_id, None)
+        elif action_index in (self.use_mindbug_action, self.pass_mindbug_action):
+            return MindbugAction(player_id, use_mindbug=(action_index == self.use_mindbug_action))
+        return FrenzyAction(player_id, go_again=(action_index == self.go_again_action))
+
+    def to_game_state(self, game_index: int) -> GameState:
+        """Returns one of the games as a GameState, e.g. to inspect it or to play it on with GameEngine."""
+        i = game_index
+        zones: List[List] = [[] for _ in range(8)]
+        for handle, (loc, stamp, exhausted) in enumerate(zip(self.loc[i].tolist(), self.stamp[i].tolist(),
+                                                             self.exhausted[i].tolist())):
+            if loc >= 0:
+                card = self.all_cards[handle].copy()
+                card.is_exhausted = exhausted
+                zones[loc].append((stamp, card))
+        zones = [[card for _, card in sorted(zone, key=lambda item: item[0])] for zone in zones]
+
+        players = {}
+        life, mindbugs = self.life[i].tolist(), self.mindbugs[i].tolist()
+        for player, player_id in enumerate(self.player_ids):
+            players[player_id] = Player(player_id, deck=zones[4 * player + DECK], hand=zones[4 * player + HAND],
+                                        play_area=zones[4 * player + PLAY_AREA],
+                                        discard_pile=zones[4 * player + DISCARD_PILE],
+                                        life_points=life[player], mindbugs=mindbugs[player])
+        active = int(self.active[i])
+        game_state = GameState(self.player_ids[active], self.player_ids[1 - active], players,
+                               int(self.turn_count[i]), seed=int(self.rng.integers(2**63)))
+        game_state.game_over = bool(self.game_over[i])
+        game_state.winner_id = self.player_ids[self.winner[i]] if self.winner[i] >= 0 else None
+        game_state._pending_action = PHASES[self.phase[i]]
+        mindbug_card, attack_card, block_card = int(self.mindbug_card[i]), int(self.attack_card[i]), int(self.block_card[i])
+        game_state._pending_mindbug_card_handle = mindbug_card if mindbug_card >= 0 else None
+        game_state._pending_attack_card_handle = attack_card if attack_card >= 0 else None
+        game_state._pending_block_card_handle = block_card if block_card >= 0 else None
+        game_state._frenzy_active = bool(self.frenzy_active[i])
+        game_state._already_hunted = bool(self.already_hunted[i])
+        game_state._switch_active_player_back = bool(self.switch_back[i])
+        if self.phase[i] in (BLOCK, HUNT):
+            targets = self.targets[i].tolist()
+            game_state._valid_targets = [card.handle for zone in zones for card in zone if targets[card.handle]]
+        return game_state
+
+    def load_game_state(self, game_index: int, game_state: GameState) -> None:
+        """
+        Replaces one of the games by a GameState of the same card pool and players,
+        which must be waiting for one of the decisions in DECISION_PHASES (or be over).
+        """
+        if not game_state.game_over and game_state._pending_action not in DECISION_PHASES:
+            raise ValueError(f"Cannot load a game waiting for {game_state._pending_action}.")
+        i = game_index
+        handles, locs, stamps, exhausted = [], [], [], []
+        for player, player_id in enumerate(self.player_ids):
+            player_object = game_state.get_player(player_id)
+            for zone, zone_name in enumerate(ZONES):
+                for position, card in enumerate(getattr(player_object, zone_name)):
+                    handles.append(card.handle)
+                    locs.append(4 * player + zone)
+                    stamps.append(position)
+                    exhausted.append(card.is_exhausted)
+            self.life[i, player] = player_object.life_points
+            self.mindbugs[i, player] = player_object.mindbugs
+        self.loc[i] = -1
+        self.loc[i, handles] = locs
+        self.stamp[i, handles] = stamps
+        self.exhausted[i, handles] = exhausted
+        self.counter[i] = self.n_cards
+
+        self.active[i] = self.player_ids.index(game_state.active_player_id)
+        self.turn_count[i] = game_state.turn_count
+        # Finished games may have been left in the middle of an ability
+        self.phase[i] = PHASES.index(game_state._pending_action) if game_state._pending_action in PHASES else FINISH_ACTION
+        self.mindbug_card[i] = -1 if game_state._pending_mindbug_card_handle is None else game_state._pending_mindbug_card_handle
+        self.attack_card[i] = -1 if game_state._pending_attack_card_handle is None else game_state._pending_attack_card_handle
+        self.block_card[i] = -1 if game_state._pending_block_card_handle is None else game_state._pending_block_card_handle
+        self.frenzy_active[i] = game_state._frenzy_active
+        self.already_hunted[i] = game_state._already_hunted
+        self.switch_back[i] = game_state._switch_active_player_back
+        self.targets[i] = False
+        if game_state._pending_action in ("block", "hunt") and game_state._valid_targets:
+            self.targets[i, game_state._valid_targets] = True
+        self.game_over[i] = game_state.game_over
+        self.winner[i] = -1 if game_state.winner_id is None else self.player_ids.index(game_state.winner_id)
+        self._legal_mask = None
+
+    # --- Results ---
+
+    def winner_ids(self) -> List[Optional[str]]:
+        """The winner of every game (None if it is not over)."""
+        return [self.player_ids[winner] if winner >= 0 else None for winner in self.winner]
+
+    def win_conditions(self) -> List[Optional[str]]:
+        """How every game was won: "life_below_zero" or "run_out_of_actions" (None if it is not over)."""
+        below_zero = (self.life <= 0).any(axis=1)
+        return [None if not over else "life_below_zero" if dead else "run_out_of_actions"
+                for over, dead in zip(self.game_over, below_zero)]
@@ -0,0 +1,389 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Game events are published to the event bus by the game engine and the rules, instead of being printed.
+# Publishing is always guarded by `if event_bus.active:`, so when nobody is listening (e.g. in
+# headless simulations) events are neither created nor formatted.
+
+class EventLevel(IntEnum):
+    DEBUG = 10 # Inner workings of the rules
+    INFO = 20 # What happens in the game
+    WARNING = 30 # Something unexpected, which does not stop the game
+
+class Event(ABC):
+    """
+    Base class for game events. Their text is only built when message() is called.
+    """
+    __slots__ = ()
+    level: EventLevel = EventLevel.INFO
+
+    @abstractmethod
+    def message(self) -> str:
+        """Returns the description of the event, as shown in the CLI."""
+        pass
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{attribute}={getattr(self, attribute)!r}" for attribute in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class EventBus:
+    """
+    Delivers events to the subscribed callbacks whose level is at most the level of the event.
+    """
+    def __init__(self) -> None:
+        self._subscribers: List[Tuple[Callable[[Event], None], EventLevel]] = []
+        self.active: bool = False # Whether there is any subscriber; checked before creating events
+
+    def subscribe(self, callback: Callable[[Event], None], level: EventLevel = EventLevel.INFO) -> None:
+        """Subscribes a callback to all events of the given level or higher."""
+        self._subscribers.append((callback, level))
+        self.active = True
+
+    def unsubscribe(self, callback: Callable[[Event], None]) -> None:
+        """Removes all the subscriptions of a callback."""
+        self._subscribers = [(subscriber, level) for subscriber, level in self._subscribers if subscriber != callback]
+        self.active = bool(self._subscribers)
+
+    @contextmanager
+    def muted(self) -> Iterator[None]:
+        """Publishes no events within the block, e.g. while an agent simulates games to choose its action."""
+        active = self.active
+        self.active = False
+        try:
+            yield
+        finally:
+            self.active = active
+
+    def publish(self, event: Event) -> None:
+        """Sends an event to the subscribers interested in it."""
+        for callback, level in self._subscribers:
+            if event.level >= level:
+                callback(event)
+
+# The event bus used by the game engine and the rules
+event_bus = EventBus()
+
+def print_event(event: Event) -> None:
+    """Subscriber that prints the events, as the CLI shows them."""
+    print(event.message())
+
+# --- Game flow ---
+
+class GameAlreadyOver(Event):
+    __slots__ = ()
+    level = EventLevel.WARNING
+
+    def message(self) -> str:
+        return "Game is already over. Cannot apply more actions."
+
+class TurnEnded(Event):
+    __slots__ = ('turn_count',)
+
+    def __init__(self, turn_count: int) -> None:
+        self.turn_count = turn_count
+
+    def message(self) -> str:
+        return f"Turn {self.turn_count} ended.\n"
+
+class NoValidActions(Event):
+    __slots__ = ('player_id',)
+
+    def __init__(self, player_id: str) -> None:
+        self.player_id = player_id
+
+    def message(self) -> str:
+        return f"No valid actions for {self.player_id}. They lose by inability to act."
+
+class DeckEmpty(Event):
+    __slots__ = ('player_id',)
+
+    def __init__(self, player_id: str) -> None:
+        self.player_id = player_id
+
+    def message(self) -> str:
+        return f"{self.player_id} has no cards left in the deck to draw."
+
+# --- Life points ---
+
+class LifeLost(Event):
+    __slots__ = ('player_id', 'amount', 'life_points')
+
+    def __init__(self, player_id: str, amount: int, life_points: int) -> None:
+        self.player_id = player_id
+        self.amount = amount
+        self.life_points = life_points
+
+    def message(self) -> str:
+        return (f"{self.player_id} loses {self.amount} life point{'s' if self.amount != 1 else ''}, "
+                f"now they have {self.life_points} life points left.")
+
+class LifeGained(Event):
+    __slots__ = ('player_id', 'amount', 'life_points')
+
+    def __init__(self, player_id: str, amount: int, life_points: int) -> None:
+        self.player_id = player_id
+        self.amount = amount
+        self.life_points = life_points
+
+    def message(self) -> str:
+        return f"{self.player_id} gains {self.amount} life points. New life: {self.life_points}"
+
+class LifeSet(Event):
+    __slots__ = ('player_id', 'life_points', 'card_name')
+
+    def __init__(self, player_id: str, life_points: int, card_name: str) -> None:
+        self.player_id = player_id
+        self.life_points = life_points
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id}'s life points are now set to {self.life_points} by {self.card_name}."
+
+class PlayerDefeated(Event):
+    __slots__ = ('player_id', 'winner_id')
+
+    def __init__(self, player_id: str, winner_id: Optional[str]) -> None:
+        self.player_id = player_id
+        self.winner_id = winner_id
+
+    def message(self) -> str:
+        return f"{self.player_id} has no life points left! {self.winner_id} wins!"
+
+# --- Cards moving around ---
+
+class CardPlayed(Event):
+    __slots__ = ('player_id', 'card_name', 'from_discard_of')
+
+    def __init__(self, player_id: str, card_name: str, from_discard_of: Optional[str] = None) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+        self.from_discard_of = from_discard_of # Owner of the discard pile the card was played from, if any
+
+    def message(self) -> str:
+        if self.from_discard_of is not None:
+            return f"{self.player_id} plays {self.card_name} from {self.from_discard_of}'s discard pile."
+        return f"{self.player_id} plays {self.card_name}."
+
+class CardStolen(Event):
+    __slots__ = ('player_id', 'card_name', 'from_player_id', 'from_zone')
+
+    def __init__(self, player_id: str, card_name: str, from_player_id: str, from_zone: str = "play_area") -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+        self.from_player_id = from_player_id
+        self.from_zone = from_zone
+
+    def message(self) -> str:
+        if self.from_zone == "hand":
+            return f"{self.player_id} steals {self.card_name} from {self.from_player_id}'s hand."
+        return f"{self.player_id} steals {self.card_name} from {self.from_player_id}."
+
+class CardDiscarded(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id} discards {self.card_name}."
+
+class CardDrawn(Event):
+    __slots__ = ('player_id', 'card_name', 'from_zone')
+
+    def __init__(self, player_id: str, card_name: str, from_zone: str = "deck") -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+        self.from_zone = from_zone
+
+    def message(self) -> str:
+        if self.from_zone == "discard_pile":
+            return f"{self.player_id} draws {self.card_name} from their discard pile."
+        return f"{self.player_id} draws {self.card_name}."
+
+# --- Mindbugs ---
+
+class MindbugOffered(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id}, do you want to Mindbug {self.card_name}?"
+
+class NoMindbugsLeft(Event):
+    __slots__ = ('player_id',)
+
+    def __init__(self, player_id: str) -> None:
+        self.player_id = player_id
+
+    def message(self) -> str:
+        return f"{self.player_id} has no Mindbugs left."
+
+class MindbugUsed(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id} uses a Mindbug on {self.card_name}!"
+
+class MindbugPassed(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id} passes on Mindbugging {self.card_name}."
+
+# --- Attacks and combat ---
+
+class AttackDeclared(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id}'s {self.card_name} attacks!"
+
+class AttackBlocked(Event):
+    __slots__ = ('player_id', 'attacking_card_name', 'blocking_card_name')
+
+    def __init__(self, player_id: str, attacking_card_name: str, blocking_card_name: str) -> None:
+        self.player_id = player_id # The blocking player
+        self.attacking_card_name = attacking_card_name
+        self.blocking_card_name = blocking_card_name
+
+    def message(self) -> str:
+        return f"{self.player_id} blocks {self.attacking_card_name} with {self.blocking_card_name}."
+
+class AttackUnblocked(Event):
+    __slots__ = ('player_id', 'attacking_player_id')
+
+    def __init__(self, player_id: str, attacking_player_id: str) -> None:
+        self.player_id = player_id # The player who does not block
+        self.attacking_player_id = attacking_player_id
+
+    def message(self) -> str:
+        return f"{self.player_id} does not block. {self.attacking_player_id} deals damage directly!"
+
+class CardsFaceOff(Event):
+    __slots__ = ('blocking_card_name', 'attacking_card_name')
+
+    def __init__(self, blocking_card_name: str, attacking_card_name: str) -> None:
+        self.blocking_card_name = blocking_card_name
+        self.attacking_card_name = attacking_card_name
+
+    def message(self) -> str:
+        return f"{self.blocking_card_name} and {self.attacking_card_name} face each other."
+
+class FrenzyActivated(Event):
+    __slots__ = ('player_id', 'card_name')
+
+    def __init__(self, player_id: str, card_name: str) -> None:
+        self.player_id = player_id
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.player_id} activates Frenzy on {self.card_name}!"
+
+class CombatResolved(Event):
+    __slots__ = ('attacker_name', 'attacker_power', 'blocker_name', 'blocker_power')
+
+    def __init__(self, attacker_name: str, attacker_power: int, blocker_name: str, blocker_power: int) -> None:
+        self.attacker_name = attacker_name
+        self.attacker_power = attacker_power
+        self.blocker_name = blocker_name
+        self.blocker_power = blocker_power
+
+    def message(self) -> str:
+        return (f"Resolving combat: {self.attacker_name} (P={self.attacker_power}) "
+                f"vs {self.blocker_name} (P={self.blocker_power})")
+
+class CombatDefeat(Event):
+    __slots__ = ('card_name', 'defeated_card_name', 'poisonous')
+
+    def __init__(self, card_name: str, defeated_card_name: str, poisonous: bool = False) -> None:
+        self.card_name = card_name
+        self.defeated_card_name = defeated_card_name
+        self.poisonous = poisonous # Whether it was defeated by Poisonous rather than by power
+
+    def message(self) -> str:
+        if self.poisonous:
+            return f"{self.card_name} is Poisonous. {self.defeated_card_name} is defeated."
+        return f"{self.card_name} defeats {self.defeated_card_name}."
+
+class CombatMutualDefeat(Event):
+    __slots__ = ('attacker_name', 'blocker_name')
+
+    def __init__(self, attacker_name: str, blocker_name: str) -> None:
+        self.attacker_name = attacker_name
+        self.blocker_name = blocker_name
+
+    def message(self) -> str:
+        return f"{self.attacker_name} and {self.blocker_name} defeat each other."
+
+class ToughSaved(Event):
+    __slots__ = ('card_name',)
+
+    def __init__(self, card_name: str) -> None:
+        self.card_name = card_name
+
+    def message(self) -> str:
+        return f"{self.card_name} is Tough. It becomes exhausted instead of defeated."
+
+# --- Abilities ---
+
+class AbilityActivated(Event):
+    __slots__ = ('card_name', 'ability_type', 'player_id')
+    level = EventLevel.DEBUG
+
+    def __init__(self, card_name: str, ability_type: str, player_id: Optional[str]) -> None:
+        self.card_name = card_name
+        self.ability_type = ability_type
+        self.player_id = player_id
+
+    def message(self) -> str:
+        return f"Activating {self.ability_type.capitalize()} ability of {self.card_name} for {self.player_id}."
+
+class AbilityPrevented(Event):
+    __slots__ = ('card_name', 'preventing_card_name')
+
+    def __init__(self, card_name: str, preventing_card_name: str) -> None:
+        self.card_name = card_name
+        self.preventing_card_name = preventing_card_name
+
+    def message(self) -> str:
+        return (f"{self.card_name} cannot activate its play ability because "
+                f"{self.preventing_card_name} is in play.")
+
+class NoValidTargets(Event):
+    __slots__ = ('card_name', 'description')
+
+    def __init__(self, card_name: str, description: str) -> None:
+        self.card_name = card_name # The card whose ability has nothing to act on
+        self.description = description
+
+    def message(self) -> str:
+        return self.description
+
+class CardDefeatedByAbility(Event):
+    __slots__ = ('card_name', 'power', 'source_name')
+
+    def __init__(self, card_name: str, power: int, source_name: str) -> None:
+        self.card_name = card_name
+        self.power = power
+        self.source_name = source_name
+
+    def message(self) -> str:
+        return f"{self.card_name} (P={self.power}) is defeated by {self.source_name}."
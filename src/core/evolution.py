@@ -0,0 +1,460 @@
+import multiprocessing as mp
+import os
+import pickle
+import sys
+import time
+from statistics import NormalDist
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Any
+import numpy as np
+from src.core.simulator import Simulator
+from src.core.features import FeatureExtractor
+from src.agents.base_agent import BaseAgent
+from src.models.card import Card
+from src.agents.random_agent import RandomAgent, ZeroAgent
+from src.agents.evolutionary_agent import EvolutionaryAgent, genome_size
+from src.utils.data_loader import load_cards_from_json
+
+# Player ID of the genome being evaluated, and of its opponent
+EVOLVED_ID, OPPONENT_ID = "evolved", "opponent"
+
+# Made once per worker process by _init_worker
+_worker_simulator: Optional[Simulator] = None
+_worker_extractor: Optional[FeatureExtractor] = None
+_worker_hidden_size = 0
+_worker_opponents: Sequence[Callable[[str], BaseAgent]] = ()
+
+def _init_worker(cards_path: Optional[str], deck_size: int, hand_size: int, hidden_size: int,
+                 opponents: Sequence[Callable[[str], BaseAgent]]) -> None:
+    """Loads the card pool and makes the simulator and feature extractor once per worker process."""
+    global _worker_simulator, _worker_extractor, _worker_hidden_size, _worker_opponents
+    _worker_simulator = Simulator(all_cards=load_cards_from_json(cards_path), deck_size=deck_size, hand_size=hand_size)
+    _worker_extractor = FeatureExtractor(_worker_simulator.all_cards)
+    _worker_hidden_size = hidden_size
+    _worker_opponents = opponents
+
+def _play_genome(task: Tuple[int, np.ndarray, int, int, int]) -> Tuple[int, int, int]:
+    """
+    Plays the games first_index, ..., first_index + n_games - 1 of a genome in the evaluation with
+    the given seed. Returns the index of the genome, its number of wins and the number of games.
+    """
+    genome_index, genome, seed, first_index, n_games = task
+    simulator = _worker_simulator
+    evolved = EvolutionaryAgent(EVOLVED_ID, genome, simulator.all_cards, deck_size=simulator.game_engine.deck_size,
+                                hand_size=simulator.game_engine.hand_size, hidden_size=_worker_hidden_size,
+                                extractor=_worker_extractor)
+    opponents = [factory(OPPONENT_ID) for factory in _worker_opponents]
+    wins = 0
+    for game_index in range(first_index, first_index + n_games):
+        deal_seed, opponent = FitnessEvaluator.game_setup(seed, game_index, len(opponents))
+        if game_index % 2 == 0:
+            simulator.game_engine.agents = {EVOLVED_ID: evolved, OPPONENT_ID: opponents[opponent]}
+        else:
+            simulator.game_engine.agents = {OPPONENT_ID: opponents[opponent], EVOLVED_ID: evolved}
+        wins += simulator.play(deal_seed).winner_id == EVOLVED_ID
+    return genome_index, wins, n_games
+
+class GenomeOpponent:
+    """
+    Picklable factory of EvolutionaryAgents with a fixed genome, to use a genome (e.g. from a hall
+    of fame) as an opponent of a FitnessEvaluator. The card pool and feature extractor are made at
+    the first call in each process and reused.
+    """
+    def __init__(self, genome: np.ndarray, hidden_size: int = 0, deck_size: int = 10, hand_size: int = 5,
+                 cards_path: Optional[str] = None) -> None:
+        self.genome = np.asarray(genome, dtype=np.float32)
+        self.hidden_size = hidden_size
+        self.deck_size = deck_size
+        self.hand_size = hand_size
+        self.cards_path = cards_path
+        self._cards: Optional[List[Card]] = None
+        self._extractor: Optional[FeatureExtractor] = None
+
+    def __call__(self, player_id: str) -> EvolutionaryAgent:
+        if self._extractor is None:
+            self._cards = load_cards_from_json(self.cards_path)
+            self._extractor = FeatureExtractor(self._cards)
+        return EvolutionaryAgent(player_id, self.genome, self._cards, deck_size=self.deck_size,
+                                 hand_size=self.hand_size, hidden_size=self.hidden_size, extractor=self._extractor)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The cards and extractor are made again in the process the factory is sent to
+        return {**self.__dict__, "_cards": None, "_extractor": None}
+
+class FitnessEvaluator:
+    """
+    Plays the games that measure the fitness (win rate) of genomes against fixed opponents, on a pool
+    of worker processes that is started once and kept for the whole training run.
+
+    All the genomes evaluated with the same seed play the same games: game 2k and game 2k + 1 are the
+    same deal, with the genome starting in the first one and the opponent in the second, and the
+    opponents take turns deal by deal. Comparing genomes on identical deals and agent seeds removes
+    most of the luck from their differences. Games are sent to the workers in chunks, so a generation
+    keeps all the processes busy even when it has fewer genomes than processes.
+    """
+    def __init__(self, hidden_size: int = 0, opponents: Sequence[Callable[[str], BaseAgent]] = (RandomAgent, ZeroAgent),
+                 deck_size: int = 10, hand_size: int = 5, cards_path: Optional[str] = None,
+                 processes: Optional[int] = None, chunk_size: int = 20) -> None:
+        """
+        Args:
+            hidden_size: Number of hidden units of the agents' MLP (0 for linear agents)
+            opponents: Callables that make the opponents given the player ID. They must be picklable,
+                e.g. agent classes or module-level functions.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            cards_path: Path to the cards JSON file. data/cards.json if not given.
+            processes: Number of worker processes. All the CPUs if not given. With 1, games are
+                played in this process.
+            chunk_size: Number of games of a genome sent to a worker at a time
+        """
+        if not opponents:
+            raise ValueError("At least one opponent is needed.")
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+        self.hidden_size = hidden_size
+        self.opponents = tuple(opponents)
+        self.deck_size = deck_size
+        self.hand_size = hand_size
+        self.cards_path = cards_path
+        self.processes = processes if processes is not None else mp.cpu_count()
+        self.chunk_size = chunk_size
+        self.genome_size = genome_size(FeatureExtractor(load_cards_from_json(cards_path)).size, hidden_size)
+        self.total_games = 0
+        self._pool = None
+
+    def set_opponents(self, opponents: Sequence[Callable[[str], BaseAgent]]) -> None:
+        """Replaces the opponents of the following evaluations. The worker processes are restarted with them."""
+        if not opponents:
+            raise ValueError("At least one opponent is needed.")
+        self.opponents = tuple(opponents)
+        self.close()
+
+    @staticmethod
+    def game_setup(seed: int, game_index: int, n_opponents: int) -> Tuple[int, int]:
+        """Returns the seed of the deal of a game of an evaluation, and the index of its opponent."""
+        deal_index = game_index // 2
+        return Simulator.game_seed(seed, deal_index), deal_index % n_opponents
+
+    def play(self, tasks: Sequence[Tuple[int, np.ndarray, int, int, int]]) -> Iterator[Tuple[int, int, int]]:
+        """
+        Plays games of several genomes, and yields (genome index, wins, games) for every chunk as it finishes,
+        in no particular order.
+        Args:
+            tasks: (genome index, genome, seed, first game index, number of games) for each batch of games
+        """
+        chunks = []
+        for genome_index, genome, seed, first_index, n_games in tasks:
+            for start in range(first_index, first_index + n_games, self.chunk_size):
+                chunks.append((genome_index, genome, seed, start, min(self.chunk_size, first_index + n_games - start)))
+        init_args = (self.cards_path, self.deck_size, self.hand_size, self.hidden_size, self.opponents)
+        if self.processes == 1:
+            _init_worker(*init_args)
+            results = map(_play_genome, chunks)
+        else:
+            if self._pool is None:
+                self._pool = mp.Pool(self.processes, initializer=_init_worker, initargs=init_args)
+            results = self._pool.imap_unordered(_play_genome, chunks)
+        for genome_index, wins, n_games in results:
+            self.total_games += n_games
+            yield genome_index, wins, n_games
+
+    def evaluate(self, population: np.ndarray, seed: int, n_games: int, n_selected: Optional[int] = None) -> np.ndarray:
+        """
+        Plays n_games games for each genome (row) of the population, all on the same deals, and returns their win rates.
+        n_selected (the number of genomes the selection keeps) is only used by adaptive evaluators.
+        """
+        wins = np.zeros(len(population))
+        for genome_index, genome_wins, _ in self.play([(index, genome, seed, 0, n_games)
+                                                       for index, genome in enumerate(population)]):
+            wins[genome_index] += genome_wins
+        return wins / n_games
+
+    def close(self) -> None:
+        """Stops the worker processes. They are started again by the next evaluation."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'FitnessEvaluator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_pool", None) is not None:
+            self._pool.terminate()
+
+def wilson_interval(wins: np.ndarray, games: np.ndarray, z: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the lower and upper bounds of the Wilson score intervals of win rates."""
+    games = np.maximum(games, 1)
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    half_width = z * np.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return center - half_width, center + half_width
+
+class SequentialFitnessEvaluator(FitnessEvaluator):
+    """
+    FitnessEvaluator that races the genomes instead of playing n_games games for each of them. All the
+    genomes still in the race play the next batch of the same games, then a confidence interval on the
+    win rate of each genome is compared with those of the others: a genome stops playing as soon as it
+    is surely among the n_selected best (its lower bound is above the upper bounds of all but n_selected
+    genomes) or surely not (its upper bound is below the lower bounds of n_selected genomes). Clearly good
+    and clearly bad genomes are thus settled after a few batches, and the games go to the genomes near
+    the selection cutoff. The fitness of every genome is its win rate over the games it played.
+
+    The race only settles the cutoff of the elites, but tournament selection compares the fitness of
+    every genome, so every genome plays at least min_games games before it can stop.
+
+    The intervals are Wilson score intervals whose confidence is split (Bonferroni) between the genomes
+    and the comparisons where they can stop, since every comparison is another chance to stop wrongly.
+    """
+    def __init__(self, hidden_size: int = 0, opponents: Sequence[Callable[[str], BaseAgent]] = (RandomAgent, ZeroAgent),
+                 deck_size: int = 10, hand_size: int = 5, cards_path: Optional[str] = None,
+                 processes: Optional[int] = None, chunk_size: int = 20, batch_size: int = 20,
+                 confidence: float = 0.95, min_games: int = 40) -> None:
+        """
+        Args:
+            batch_size: Number of games played by every genome in the race between two comparisons. It must be even,
+                so that every deal is played from both seats.
+            confidence: Probability that all the stopped genomes are on the right side of the cutoff
+            min_games: Number of games every genome plays before it can stop (at most n_games)
+            The other arguments are those of FitnessEvaluator.
+        """
+        super().__init__(hidden_size, opponents, deck_size=deck_size, hand_size=hand_size, cards_path=cards_path,
+                         processes=processes, chunk_size=chunk_size)
+        if batch_size < 2 or batch_size % 2 != 0:
+            raise ValueError(f"Batch size must be a positive even number, got {batch_size}.")
+        if not 0 < confidence < 1:
+            raise ValueError(f"Confidence must be in (0, 1), got {confidence}.")
+        if min_games < 0:
+            raise ValueError(f"Minimum number of games cannot be negative, got {min_games}.")
+        self.batch_size = batch_size
+        self.confidence = confidence
+        self.min_games = min_games
+        self.last_games: Optional[np.ndarray] = None # Number of games played by each genome in the last evaluation
+
+    def evaluate(self, population: np.ndarray, seed: int, n_games: int, n_selected: Optional[int] = None) -> np.ndarray:
+        """
+        Races the genomes (rows) of the population on the same deals, each playing at most n_games games,
+        until every genome is known to be among the n_selected best or not. Returns their win rates.
+        Without n_selected, the cutoff is half the population.
+        """
+        n_genomes = len(population)
+        if n_selected is None:
+            n_selected = n_genomes // 2
+        min_games = min(self.min_games, n_games)
+        z = self.z_value(n_genomes, n_games)
+        wins = np.zeros(n_genomes)
+        games = np.zeros(n_genomes)
+        racing = np.ones(n_genomes, dtype=bool)
+        if not 0 < n_selected < n_genomes:
+            racing[:] = False # Everyone is selected, or no one: there is no race to run
+
+        played = 0
+        while played < n_games and (played < min_games or racing.any()):
+            batch = min(self.batch_size, n_games - played)
+            playing = racing | (played < min_games)
+            tasks = [(index, population[index], seed, played, batch) for index in np.flatnonzero(playing)]
+            for genome_index, genome_wins, genome_games in self.play(tasks):
+                wins[genome_index] += genome_wins
+                games[genome_index] += genome_games
+            played += batch
+            if played < min_games:
+                continue
+
+            lower, upper = wilson_interval(wins, games, z)
+            # Number of other genomes each genome is surely better, or surely worse, than
+            surely_better = (lower[:, None] > upper[None, :]).sum(axis=1)
+            surely_worse = (upper[:, None] < lower[None, :]).sum(axis=1)
+            racing &= (surely_better < n_genomes - n_selected) & (surely_worse < n_selected)
+
+        self.last_games = games
+        return wins / np.maximum(games, 1)
+
+    def z_value(self, n_genomes: int, n_games: int) -> float:
+        """
+        Returns the number of standard deviations of the confidence intervals of a race of n_genomes genomes
+        playing at most n_games games: the confidence is split between the genomes and the comparisons made
+        after min_games games and before the last batch (after which no genome is stopped early).
+        """
+        min_games = min(self.min_games, n_games)
+        n_looks = max(1, sum(1 for played in range(self.batch_size, n_games, self.batch_size) if played >= min_games))
+        return NormalDist().inv_cdf(1 - (1 - self.confidence) / (2 * n_genomes * n_looks))
+
+class GeneticAlgorithm:
+    """
+    Evolves the genomes of EvolutionaryAgents, as in plan_outlines/evolution_outline.txt. Every
+    generation, the whole population is evaluated at once by a FitnessEvaluator on deals drawn
+    for that generation, the best genomes are kept unchanged (elitism), and the rest of the new
+    population are children of parents picked by tournament selection, made by uniform crossover
+    and Gaussian mutation.
+
+    The state of the run (population, random generator, history) can be saved to a checkpoint
+    after every generation and loaded back, so a long run can be resumed where it stopped and
+    goes on exactly as if it hadn't.
+    """
+    def __init__(self, evaluator: FitnessEvaluator, population_size: int = 50, n_games: int = 100,
+                 elite_size: int = 5, tournament_size: int = 3, crossover_rate: float = 0.9,
+                 mutation_rate: float = 0.1, mutation_strength: float = 0.1, initial_scale: float = 0.5,
+                 seed: Optional[int] = None) -> None:
+        """
+        Args:
+            evaluator: Evaluates the fitness of the genomes
+            population_size: Number of genomes of every generation
+            n_games: Number of games played by every genome of a generation
+            elite_size: Number of best genomes carried over unchanged to the next generation
+            tournament_size: Number of genomes that compete to be picked as a parent
+            crossover_rate: Probability that a child is a crossover of two parents rather than a copy of one
+            mutation_rate: Probability that each gene of a child is mutated
+            mutation_strength: Standard deviation of the Gaussian noise added to mutated genes
+            initial_scale: Standard deviation of the genes of the initial population
+            seed: Seed of the random generator, for the initial population, the deals and the genetic operators
+        """
+        if not 0 <= elite_size < population_size:
+            raise ValueError(f"Elite size must be in [0, {population_size}), got {elite_size}.")
+        if tournament_size < 1:
+            raise ValueError(f"Tournament size must be positive, got {tournament_size}.")
+        self.evaluator = evaluator
+        self.population_size = population_size
+        self.n_games = n_games
+        self.elite_size = elite_size
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.mutation_strength = mutation_strength
+        self.initial_scale = initial_scale
+
+        self.rng = np.random.default_rng(seed)
+        self.population = self.rng.normal(0, initial_scale, (population_size, evaluator.genome_size)).astype(np.float32)
+        self.generation = 0
+        self.evaluated_population: Optional[np.ndarray] = None # Last evaluated generation (not saved in checkpoints)
+        self.fitness: Optional[np.ndarray] = None # Of the last evaluated generation
+        self.best_genome: Optional[np.ndarray] = None # Best genome of the last evaluated generation
+        self.best_fitness = -np.inf
+        self.history: List[Dict[str, Any]] = [] # Statistics of every generation
+
+    # --- Genetic operators ---
+
+    def select_parents(self, fitness: np.ndarray, n_parents: int) -> np.ndarray:
+        """Returns the indices of n_parents genomes picked by tournament selection."""
+        contenders = self.rng.integers(len(fitness), size=(n_parents, self.tournament_size))
+        return contenders[np.arange(n_parents), fitness[contenders].argmax(axis=1)]
+
+    def crossover(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
+        """Uniform crossover: each gene of a child comes from either parent with equal probability."""
+        children = parents1.copy()
+        mixed = self.rng.random(len(children)) < self.crossover_rate
+        from_second = mixed[:, None] & (self.rng.random(children.shape) < 0.5)
+        children[from_second] = parents2[from_second]
+        return children
+
+    def mutate(self, genomes: np.ndarray) -> np.ndarray:
+        """Adds Gaussian noise to genes picked with probability mutation_rate, in place."""
+        mutated = self.rng.random(genomes.shape) < self.mutation_rate
+        genomes[mutated] += self.rng.normal(0, self.mutation_strength, np.count_nonzero(mutated)).astype(genomes.dtype)
+        return genomes
+
+    def next_population(self, fitness: np.ndarray) -> np.ndarray:
+        """Makes the next generation from the current population and its fitness."""
+        order = np.argsort(-fitness, kind="stable")
+        elites = self.population[order[:self.elite_size]]
+        n_children = self.population_size - self.elite_size
+        parents1 = self.population[self.select_parents(fitness, n_children)]
+        parents2 = self.population[self.select_parents(fitness, n_children)]
+        children = self.mutate(self.crossover(parents1, parents2))
+        return np.concatenate([elites, children])
+
+    def top_genomes(self, n: int) -> np.ndarray:
+        """Returns copies of the n best genomes of the last generation evaluated since the run was made or loaded."""
+        if self.evaluated_population is None:
+            raise ValueError("No generation has been evaluated yet.")
+        return self.evaluated_population[np.argsort(-self.fitness, kind="stable")[:n]].copy()
+
+    # --- Training loop ---
+
+    def evaluate(self, seed: int) -> np.ndarray:
+        """
+        Evaluates the current population on the deals of the given seed. The selection cutoff passed to
+        the evaluator is the number of elites, or half the population without elitism.
+        """
+        n_selected = self.elite_size if self.elite_size > 0 else self.population_size // 2
+        return self.evaluator.evaluate(self.population, seed, self.n_games, n_selected=n_selected)
+
+    def step(self) -> Dict[str, Any]:
+        """Evaluates the current generation, makes the next one, and returns the statistics of the generation."""
+        start_time = time.perf_counter()
+        start_games = self.evaluator.total_games
+        seed = int(self.rng.integers(2**63))
+        fitness = self.evaluate(seed)
+
+        best = int(np.argmax(fitness))
+        self.evaluated_population = self.population
+        self.fitness = fitness
+        self.best_genome = self.population[best].copy()
+        self.best_fitness = float(fitness[best])
+        elapsed = time.perf_counter() - start_time
+        n_games = self.evaluator.total_games - start_games
+        stats = {"generation": self.generation, "best_fitness": self.best_fitness, "mean_fitness": float(fitness.mean()),
+                 "games": n_games, "elapsed": elapsed, "games_per_second": n_games / elapsed if elapsed > 0 else 0.0}
+        self.history.append(stats)
+
+        self.population = self.next_population(fitness)
+        self.generation += 1
+        return stats
+
+    def run(self, n_generations: int, checkpoint_path: Optional[str] = None, verbose: bool = False) -> np.ndarray:
+        """
+        Runs generations until n_generations have been evaluated in total (counting those of a resumed
+        run), and returns the best genome of the last one.
+        Args:
+            n_generations: Total number of generations
+            checkpoint_path: If given, the run is saved there after every generation
+            verbose: Whether the statistics of every generation are printed
+        """
+        while self.generation < n_generations:
+            stats = self.step()
+            if checkpoint_path is not None:
+                self.save(checkpoint_path)
+            if verbose:
+                print(f"Generation {stats['generation'] + 1}/{n_generations}: best fitness {stats['best_fitness']:.3f}, "
+                      f"mean fitness {stats['mean_fitness']:.3f}, {stats['games_per_second']:.0f} games/s",
+                      file=sys.stderr, flush=True)
+        return self.best_genome
+
+    # --- Checkpoints ---
+
+    _SAVED_FIELDS = ("population_size", "n_games", "elite_size", "tournament_size", "crossover_rate", "mutation_rate",
+                     "mutation_strength", "initial_scale", "population", "generation", "fitness", "best_genome",
+                     "best_fitness", "history")
+
+    def save(self, path: str) -> None:
+        """
+        Saves the state of the run. The file is replaced at once, so an interrupted save leaves
+        the previous checkpoint intact.
+        """
+        checkpoint = {field: getattr(self, field) for field in self._SAVED_FIELDS}
+        checkpoint["rng_state"] = self.rng.bit_generator.state
+        checkpoint["genome_size"] = self.evaluator.genome_size
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump(checkpoint, file)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str, evaluator: FitnessEvaluator) -> 'GeneticAlgorithm':
+        """Loads a run saved with save, to be resumed with the given evaluator."""
+        with open(path, "rb") as file:
+            checkpoint = pickle.load(file)
+        if checkpoint["genome_size"] != evaluator.genome_size:
+            raise ValueError(f"The checkpoint has genomes of {checkpoint['genome_size']} genes, "
+                             f"but the evaluator plays genomes of {evaluator.genome_size}.")
+        algorithm = cls.__new__(cls)
+        algorithm.evaluator = evaluator
+        algorithm.evaluated_population = None
+        for field in cls._SAVED_FIELDS:
+            setattr(algorithm, field, checkpoint[field])
+        algorithm.rng = np.random.default_rng()
+        algorithm.rng.bit_generator.state = checkpoint["rng_state"]
+        return algorithm
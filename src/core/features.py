@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import src.core.game_rules as GameRules
+from src.core.game_engine import GameEngine
+from src.models.game_state import GameState, PHASES
+from src.models.action import Action
+from src.models.card import Card, Keyword
+
+# Every value of GameState._pending_action: the phases, then those that choose targets
+PENDING_ACTIONS = PHASES + ("play_from_discard", "steal", "discard", "defeat")
+KEYWORDS = tuple(Keyword)
+# Indices in KEYWORDS of the keywords of every mask, to avoid Keyword operations on every card
+_MASK_KEYWORDS = tuple(tuple(index for index, keyword in enumerate(KEYWORDS) if mask & int(keyword))
+                       for mask in range(1 << len(KEYWORDS)))
+
+# Features of each side that aren't card counts, in the order of the vector
+_SIDE_FIELDS = ("life_points", "mindbugs", "deck_size", "hand_size", "play_area_size", "discard_pile_size",
+                "power", "exhausted") + tuple(f"keyword_{keyword.name.lower()}" for keyword in KEYWORDS)
+_LIFE, _MINDBUGS, _DECK, _HAND, _PLAY_AREA, _DISCARD, _POWER, _EXHAUSTED = range(8)
+_KEYWORD_OFFSET = 8
+# Zones whose cards are counted by card ID
+_COUNTED_ZONES = ("hand", "play_area", "discard_pile")
+
+class FeatureExtractor:
+    """
+    Turns game states into fixed-length NumPy vectors seen from one player's perspective, so that
+    heuristic and learned agents can score many states with one matrix product.
+
+    The vector has a block for the player, then the same block for their opponent:
+        - Life points, mindbugs and the number of cards in each zone
+        - The sum of the effective powers of the creatures in play, and how many are exhausted
+        - For each keyword, how many creatures in play have it (with passive abilities)
+        - For hand, play area and discard pile, how many copies of each card are in the zone
+    followed by a one-hot of the pending action, whether the player is the one to act, and
+    whether they have won or lost. The opponent's hand is only counted by size unless
+    perfect_information is set. names holds the name of every feature.
+    """
+    def __init__(self, all_cards: List[Card], perfect_information: bool = False) -> None:
+        """
+        Args:
+            all_cards: The card pool. Each card ID gets its own count features.
+            perfect_information: Whether the copies in the opponent's hand are counted
+        """
+        self.card_ids: List[str] = sorted({card.id for card in all_cards})
+        self._card_index: Dict[str, int] = {card_id: index for index, card_id in enumerate(self.card_ids)}
+        self.perfect_information = perfect_information
+
+        self.n_card_ids = len(self.card_ids)
+        self._zone_offsets = {zone_name: len(_SIDE_FIELDS) + index * self.n_card_ids
+                              for index, zone_name in enumerate(_COUNTED_ZONES)}
+        self.side_size = len(_SIDE_FIELDS) + len(_COUNTED_ZONES) * self.n_card_ids
+        self.pending_offset = 2 * self.side_size
+        self._pending_index = {pending_action: self.pending_offset + index
+                               for index, pending_action in enumerate(PENDING_ACTIONS)}
+        self.to_act_index = self.pending_offset + len(PENDING_ACTIONS)
+        self.won_index = self.to_act_index + 1
+        self.lost_index = self.won_index + 1
+        self.size = self.lost_index + 1
+
+        side_names = list(_SIDE_FIELDS) + [f"{zone_name}_{card_id}" for zone_name in _COUNTED_ZONES
+                                           for card_id in self.card_ids]
+        self.names: List[str] = ([f"own_{name}" for name in side_names] + [f"opponent_{name}" for name in side_names]
+                                 + [f"pending_{pending_action}" for pending_action in PENDING_ACTIONS]
+                                 + ["to_act", "won", "lost"])
+
+    def extract(self, game_state: GameState, player_id: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the features of a game state from the perspective of a player.
+        Args:
+            game_state: The game state
+            player_id: ID of the player whose perspective is taken
+            out: Array of length size to fill. A new float32 array is made if not given.
+        """
+        if out is None:
+            out = np.zeros(self.size, dtype=np.float32)
+        self.extract_batch([game_state], player_id, out.reshape(1, self.size))
+        return out
+
+    def extract_batch(self, game_states: Sequence[GameState], player_id: str,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fills the rows of an (N, size) array with the features of many game states (e.g. the successors
+        of every valid action) from the perspective of a player, and returns the filled rows.
+        Args:
+            game_states: The game states
+            player_id: ID of the player whose perspective is taken
+            out: C-contiguous array with at least as many rows as game states, reused between calls to avoid
+                allocations. A new float32 array is made if not given.
+        """
+        rows = self._rows(len(game_states), out)
+        # The features are gathered as flat indices and values in Python lists, then written at once
+        indices: List[int] = []
+        values: List[int] = []
+        for row, game_state in enumerate(game_states):
+            self._collect(game_state, player_id, row * self.size, indices, values)
+        np.add.at(rows.reshape(-1), indices, values)
+        return rows
+
+    def extract_successors(self, game_state: GameState, player_id: str, actions: Sequence[Action],
+                           game_engine: GameEngine, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fills the rows of an (N, size) array with the features of the states that each action leads to,
+        from the perspective of a player, and returns the filled rows. The actions are applied to the
+        given state in place and undone, so no state is copied.
+        Args:
+            game_state: The game state the actions are valid in. It is left unchanged.
+            player_id: ID of the player whose perspective is taken
+            actions: The actions
+            game_engine: The engine that applies the actions, whose agents make the choices asked meanwhile
+            out: As in extract_batch
+        """
+        rows = self._rows(len(actions), out)
+        indices: List[int] = []
+        values: List[int] = []
+        for row, action in enumerate(actions):
+            record = game_engine.apply_in_place(game_state, action)
+            try:
+                self._collect(game_state, player_id, row * self.size, indices, values)
+            finally:
+                game_engine.undo(game_state, record)
+        np.add.at(rows.reshape(-1), indices, values)
+        return rows
+
+    def _rows(self, n: int, out: Optional[np.ndarray]) -> np.ndarray:
+        if out is None:
+            return np.zeros((n, self.size), dtype=np.float32)
+        if out.ndim != 2 or out.shape[0] < n or out.shape[1] != self.size or not out.flags.c_contiguous:
+            raise ValueError(f"Expected a C-contiguous array of shape (>={n}, {self.size}), got {out.shape}.")
+        rows = out[:n]
+        rows.fill(0)
+        return rows
+
+    def _collect(self, game_state: GameState, player_id: str, offset: int,
+                 indices: List[int], values: List[int]) -> None:
+        player = game_state.get_player(player_id)
+        opponent = game_state.get_opponent_of(player_id)
+        # Without passive abilities in play, powers and keywords are those printed on the cards
+        passives = any(card.ability_type == "passive" for card in player.play_area + opponent.play_area)
+        for side_offset, side, counted_zones in ((offset, player, _COUNTED_ZONES),
+                                                 (offset + self.side_size, opponent,
+                                                  _COUNTED_ZONES if self.perfect_information else _COUNTED_ZONES[1:])):
+            indices += (side_offset + _LIFE, side_offset + _MINDBUGS, side_offset + _DECK, side_offset + _HAND,
+                        side_offset + _PLAY_AREA, side_offset + _DISCARD)
+            values += (side.life_points, side.mindbugs, len(side.deck), len(side.hand),
+                       len(side.play_area), len(side.discard_pile))
+
+            for card in side.play_area:
+                indices.append(side_offset + _POWER)
+                if passives:
+                    values.append(GameRules.get_effective_power(game_state, card.handle))
+                    keyword_mask = GameRules.get_effective_keywords(game_state, card.handle)
+                else:
+                    values.append(card.power)
+                    keyword_mask = card.keyword_mask
+                if card.is_exhausted:
+                    indices.append(side_offset + _EXHAUSTED)
+                    values.append(1)
+                for keyword_index in _MASK_KEYWORDS[int(keyword_mask)]:
+                    indices.append(side_offset + _KEYWORD_OFFSET + keyword_index)
+                    values.append(1)
+
+            for zone_name in counted_zones:
+                zone_offset = side_offset + self._zone_offsets[zone_name]
+                for card in getattr(side, zone_name):
+                    card_index = self._card_index.get(card.id)
+                    if card_index is None:
+                        raise ValueError(f"Card '{card.id}' is not in the card pool of the feature extractor.")
+                    indices.append(zone_offset + card_index)
+                    values.append(1)
+
+        pending_index = self._pending_index.get(game_state._pending_action)
+        if pending_index is not None:
+            indices.append(offset + pending_index)
+            values.append(1)
+        if game_state.active_player_id == player_id:
+            indices.append(offset + self.to_act_index)
+            values.append(1)
+        if game_state.game_over:
+            indices.append(offset + (self.won_index if game_state.winner_id == player_id else self.lost_index))
+            values.append(1)
@@ -1,10 +1,18 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Any
 import copy
-from src.models.game_state import GameState
+import random
+from itertools import combinations
+from src.models.game_state import GameState, UndoRecord
 from src.models.action import *
-from src.models.card import Card
+from src.models.card import Card, Keyword
 import src.core.game_rules as GameRules
 from src.agents.base_agent import BaseAgent
+from src.utils.subsets import count_subsets, subset_at
+from src.core.events import *
+
+# Phases where the active player chooses a subset of the valid targets, with the class of their actions.
+# These actions are counted and indexed without being generated, since there can be very many.
+TARGET_SUBSET_PHASES = {"steal": StealAction, "discard": DiscardAction, "defeat": DefeatAction}
 
 class GameEngine:
     def __init__(
@@ -69,12 +77,47 @@ class GameEngine:
         """
         Applies a player's action to the current game state and returns the new state.
         This is the core method for advancing the game.
+        The given state is left untouched: the action is applied to a copy of it.
         """
         if game_state.game_over:
-            print("Game is already over. Cannot apply more actions.")
+            if event_bus.active:
+                event_bus.publish(GameAlreadyOver())
             return game_state
 
-        new_state = copy.deepcopy(game_state)
+        return self._dispatch_action(game_state.clone(), action)
+
+    def apply_in_place(self, game_state: GameState, action: Action) -> UndoRecord:
+        """
+        Applies a player's action directly to the given game state, without copying it.
+        The steps that follow automatically are resolved too, so the state is left waiting
+        for the next decision of an agent (or finished).
+        Returns an UndoRecord that can be passed to undo() to get the previous state back,
+        which allows tree searches to explore many moves without allocating new states.
+        """
+        record = game_state.start_undo_record()
+        try:
+            if game_state.game_over:
+                if event_bus.active:
+                    event_bus.publish(GameAlreadyOver())
+            else:
+                self._dispatch_action(game_state, action)
+                self.resolve_automatic_steps(game_state)
+        finally:
+            game_state.stop_undo_record()
+        return record
+
+    def undo(self, game_state: GameState, record: UndoRecord) -> None:
+        """
+        Reverts an action applied with apply_in_place. When several actions have been applied,
+        their records must be undone in reverse order.
+        """
+        game_state.undo(record)
+
+    def _dispatch_action(self, new_state: GameState, action: Action) -> GameState:
+        """
+        Calls the handler for the given action according to the pending action of the state.
+        Handlers modify the state they are given and return it.
+        """
         if action.player_id != new_state.active_player_id:
                 raise ValueError(f"Wrong active player: {action}.")
         
@@ -106,8 +149,9 @@ class GameEngine:
     def lose_life(self, game_state: GameState, player_id: str, amount: int = 1) -> GameState:
         """A player loses life."""
         player_losing_life = game_state.get_player(player_id)
-        player_losing_life.life_points -= amount
-        print(f"{player_id} loses {amount} life points, now they have {player_losing_life.life_points} life points left.")
+        game_state.set_life_points(player_losing_life, player_losing_life.life_points - amount)
+        if event_bus.active:
+            event_bus.publish(LifeLost(player_id, amount, player_losing_life.life_points))
 
         if player_losing_life.life_points <= 0:
             # Player has no life points left, they lose the game
@@ -116,7 +160,8 @@ class GameEngine:
                 game_state.winner_id = game_state.inactive_player_id
             else:
                 game_state.winner_id = game_state.active_player_id
-            print(f"{player_id} has no life points left! {game_state.winner_id} wins!")
+            if event_bus.active:
+                event_bus.publish(PlayerDefeated(player_id, game_state.winner_id))
 
         return game_state
 
@@ -125,27 +170,30 @@ class GameEngine:
     def _handle_play_card_action(self, game_state: GameState, action: PlayCardAction) -> GameState:
         player = game_state.get_active_player()
         opponent = game_state.get_inactive_player()
-        card_to_play = GameRules.get_card_by_uuid(game_state, action.card_uuid)
+        card_to_play = GameRules.get_card_by_handle(game_state, action.card_handle)
             
         # 1. Remove card from hand
-        player.play_card(card_to_play) # player.play_card removes it from hand and adds it to play_area.
-        print(f"{player.id} plays {card_to_play.name}.")
+        game_state.move_card(card_to_play, player, "play_area") # Removes it from hand and adds it to play_area.
+        if event_bus.active:
+            event_bus.publish(CardPlayed(player.id, card_to_play.name))
 
         # 2. Draw back to hand_size cards
         while len(player.hand) < self.hand_size and player.deck:
-            drawn_card = player.draw_card()
+            drawn_card = game_state.draw_card(player)
         
         # 3. Opponent gets a chance to Mindbug
         if opponent.mindbugs:
-            game_state._pending_mindbug_card_uuid = card_to_play.uuid # Store the card being played for Mindbug decision
+            game_state._pending_mindbug_card_handle = card_to_play.handle # Store the card being played for Mindbug decision
             game_state._pending_action = "mindbug" # Set phase to mindbug
             game_state.switch_active_player() # Switch to opponent for Mindbug decision
             
-            print(f"{opponent.id}, do you want to Mindbug {card_to_play.name}?")
+            if event_bus.active:
+                event_bus.publish(MindbugOffered(opponent.id, card_to_play.name))
             # The game loop will now wait for a UseMindbugAction or PassMindbugAction from the opponent.
         else:
-            print(f"{opponent.id} has no Mindbugs left.")
-            game_state = GameRules.activate_play_ability(game_state, card_to_play.uuid, self.agents)
+            if event_bus.active:
+                event_bus.publish(NoMindbugsLeft(opponent.id))
+            game_state = GameRules.activate_play_ability(game_state, card_to_play.handle, self.agents)
         
         return game_state
     
@@ -155,20 +203,19 @@ class GameEngine:
         """
         player = game_state.get_active_player()
         opponent = game_state.get_inactive_player()
-        card = GameRules.get_card_by_uuid(game_state, action.card_uuid)
+        card = GameRules.get_card_by_handle(game_state, action.card_handle)
         
-        if card in player.discard_pile:
+        if game_state.is_in_zone(card.handle, player.id, "discard_pile"):
             previous_owner = player
-        elif card in opponent.discard_pile:
+        elif game_state.is_in_zone(card.handle, opponent.id, "discard_pile"):
             previous_owner = opponent
         else:
-            raise ValueError(f"Card with UUID {action.card_uuid} not found in either player's discard pile.")
+            raise ValueError(f"Card with handle {action.card_handle} not found in either player's discard pile.")
 
-        previous_owner.discard_pile.remove(card)
-        player.play_area.append(card)
-        card.controller = player
-        print(f"{player.id} plays {card.name} from {previous_owner.id}'s discard pile.")
-        game_state = GameRules.activate_play_ability(game_state, card.uuid, self.agents)
+        game_state.move_card(card, player, "play_area")
+        if event_bus.active:
+            event_bus.publish(CardPlayed(player.id, card.name, from_discard_of=previous_owner.id))
+        game_state = GameRules.activate_play_ability(game_state, card.handle, self.agents)
 
         return game_state
 
@@ -176,10 +223,10 @@ class GameEngine:
         opponent = game_state.get_active_player() # In mindbug phase, the "active" player is the opponent.
         player = game_state.get_inactive_player() # The player who originally played the card.
         # Get the card pending Mindbug response
-        if game_state._pending_mindbug_card_uuid:
-            played_card = GameRules.get_card_by_uuid(game_state, game_state._pending_mindbug_card_uuid)
+        if game_state._pending_mindbug_card_handle is not None:
+            played_card = GameRules.get_card_by_handle(game_state, game_state._pending_mindbug_card_handle)
         else:
-            raise ValueError("No pending Mindbug card UUID found in game state.")
+            raise ValueError("No pending Mindbug card handle found in game state.")
 
         if not played_card:
             raise ValueError("No played card found for Mindbug response.")
@@ -188,47 +235,47 @@ class GameEngine:
         
         if action.use_mindbug:
             if opponent.mindbugs:
-                opponent.use_mindbug()
-                print(f"{opponent.id} uses a Mindbug on {played_card.name}!")
-
-                # 1. Add played card to opponent's battlefield
-                opponent.play_area.append(played_card)
-                played_card.controller = opponent # Update controller
-                # 2. Remove played card from original player's hand
-                player.play_area.remove(played_card)
-                # 3. Activate the card's play ability for the opponent
-                game_state = GameRules.activate_play_ability(game_state, played_card.uuid, self.agents)
+                game_state.use_mindbug(opponent)
+                if event_bus.active:
+                    event_bus.publish(MindbugUsed(opponent.id, played_card.name))
+
+                # 1. Move played card from original player's battlefield to opponent's battlefield
+                game_state.move_card(played_card, opponent, "play_area") # This also updates the controller
+                # 2. Activate the card's play ability for the opponent
+                game_state = GameRules.activate_play_ability(game_state, played_card.handle, self.agents)
                 # Now we do NOT switch back to the original player, so that when the turn ends they go again.
             else:
                 raise ValueError(f"{opponent.id} tried to use Mindbug but has no Mindbugs left.")
         else:
-            print(f"{opponent.id} passes on Mindbugging {played_card.name}.")
+            if event_bus.active:
+                event_bus.publish(MindbugPassed(opponent.id, played_card.name))
             game_state.switch_active_player() # Switch back to original player
-            game_state = GameRules.activate_play_ability(game_state, played_card.uuid, self.agents)
+            game_state = GameRules.activate_play_ability(game_state, played_card.handle, self.agents)
 
-        game_state._pending_mindbug_card_uuid = None # Clear pending Mindbug state
+        game_state._pending_mindbug_card_handle = None # Clear pending Mindbug state
 
         return game_state
 
     def _handle_attack_action(self, game_state: GameState, action: AttackAction) -> GameState:
         attacking_player = game_state.get_active_player()
         blocking_player = game_state.get_inactive_player()
-        attacking_card = GameRules.get_card_by_uuid(game_state, action.attacking_card_uuid)
-        if attacking_card not in attacking_player.play_area:
+        attacking_card = GameRules.get_card_by_handle(game_state, action.attacking_card_handle)
+        if not game_state.is_in_zone(attacking_card.handle, attacking_player.id, "play_area"):
             raise ValueError(f"Attacking card {attacking_card.name} not found in {attacking_player.id}'s play area.")
 
         if game_state._pending_action in ["play_or_attack", "frenzy_attack"]:
             # This is the first part of the phase, so activate "Attack" abilities
-            print(f"{attacking_player.id}'s {attacking_card.name} attacks!")
-            game_state._pending_attack_card_uuid = attacking_card.uuid
-            game_state = GameRules.activate_attack_ability(game_state, attacking_card.uuid, self.agents)
+            if event_bus.active:
+                event_bus.publish(AttackDeclared(attacking_player.id, attacking_card.name))
+            game_state._pending_attack_card_handle = attacking_card.handle
+            game_state = GameRules.activate_attack_ability(game_state, attacking_card.handle, self.agents)
             return game_state
         
         elif game_state._pending_action == "continue_attack":
             # This is the second part of the phase, where we resolve the attack
-            if ("Hunter" in GameRules.get_effective_keywords(game_state, attacking_card.uuid)
+            if (GameRules.get_effective_keywords(game_state, attacking_card.handle) & Keyword.HUNTER
                 and not game_state._already_hunted):
-                valid_targets = [card.uuid for card in blocking_player.play_area]
+                valid_targets = [card.handle for card in blocking_player.play_area]
                 if not valid_targets:
                     game_state._pending_action = "resolve_attack"
                 else:
@@ -237,14 +284,14 @@ class GameEngine:
                 return game_state
             # If there is no Hunter ability or it has already been used, move on to choosing a blocker
             else:
-                valid_blockers: List[UUID] = []
+                valid_blockers: List[int] = []
                 for card in blocking_player.play_area:
                     if GameRules.is_valid_blocker(
-                        blocking_card_uuid=card.uuid, 
-                        attacking_card_uuid=attacking_card.uuid, 
+                        blocking_card_handle=card.handle, 
+                        attacking_card_handle=attacking_card.handle, 
                         game_state=game_state,
                     ):
-                        valid_blockers.append(card.uuid)
+                        valid_blockers.append(card.handle)
                 
                 if not valid_blockers:
                     game_state._pending_action = "resolve_attack"
@@ -255,33 +302,35 @@ class GameEngine:
                 return game_state
         
         elif game_state._pending_action == "resolve_attack":
-            if not game_state._pending_block_card_uuid:
+            if game_state._pending_block_card_handle is None:
                 # No blocker was chosen, opponent takes damage
-                print(f"{blocking_player.id} does not block. {attacking_player.id} deals damage directly!")
+                if event_bus.active:
+                    event_bus.publish(AttackUnblocked(blocking_player.id, attacking_player.id))
                 game_state = self.lose_life(game_state, blocking_player.id)
             else:
-                blocking_card = GameRules.get_card_by_uuid(game_state, game_state._pending_block_card_uuid)
-                if blocking_card not in blocking_player.play_area:
+                blocking_card = GameRules.get_card_by_handle(game_state, game_state._pending_block_card_handle)
+                if not game_state.is_in_zone(blocking_card.handle, blocking_player.id, "play_area"):
                     raise ValueError(f"Blocking card {blocking_card.name} not found in {blocking_player.id}'s play area.")
-                print(f"{blocking_card.name} and {attacking_card.name} face each other.")
+                if event_bus.active:
+                    event_bus.publish(CardsFaceOff(blocking_card.name, attacking_card.name))
                 # Resolve combat
-                game_state = GameRules.resolve_combat(game_state, attacking_card.uuid, blocking_card.uuid, self.agents)
-                game_state._pending_block_card_uuid = None # Clear pending block card UUID
+                game_state = GameRules.resolve_combat(game_state, attacking_card.handle, blocking_card.handle, self.agents)
+                game_state._pending_block_card_handle = None # Clear pending block card handle
                 game_state._already_hunted = False # Reset hunting state
 
             attacking_player = game_state.get_player(attacking_player.id) # Refresh player state after combat resolution
-            attacking_card = GameRules.get_card_by_uuid(game_state, action.attacking_card_uuid)
-            if ("Frenzy" in GameRules.get_effective_keywords(game_state, attacking_card.uuid) 
+            attacking_card = GameRules.get_card_by_handle(game_state, action.attacking_card_handle)
+            if (GameRules.get_effective_keywords(game_state, attacking_card.handle) & Keyword.FRENZY
                 and not game_state._frenzy_active # Ensure Frenzy has not already been activated
-                and attacking_card in attacking_player.play_area # Ensure the card has not been defeated
+                and game_state.is_in_zone(attacking_card.handle, attacking_player.id, "play_area") # Ensure the card has not been defeated
             ):
                 game_state._pending_action = "frenzy"
                 game_state._frenzy_active = True
                 return game_state
             else:
                 game_state._frenzy_active = False
-                game_state._pending_attack_card_uuid = None
-                game_state._pending_block_card_uuid = None
+                game_state._pending_attack_card_handle = None
+                game_state._pending_block_card_handle = None
                 game_state._already_hunted = False 
                 game_state = self.end_turn(game_state)
                 return game_state
@@ -296,17 +345,18 @@ class GameEngine:
         blocking_player = game_state.get_active_player()
         attacking_player = game_state.get_inactive_player()
         
-        if not game_state._pending_attack_card_uuid:
+        if game_state._pending_attack_card_handle is None:
             raise ValueError("No pending attack card to block.")
 
-        attacking_card = GameRules.get_card_by_uuid(game_state, game_state._pending_attack_card_uuid)
+        attacking_card = GameRules.get_card_by_handle(game_state, game_state._pending_attack_card_handle)
 
-        if action.blocking_card_uuid:
-            blocking_card = GameRules.get_card_by_uuid(game_state, action.blocking_card_uuid)
-            if blocking_card not in blocking_player.play_area:
+        if action.blocking_card_handle is not None:
+            blocking_card = GameRules.get_card_by_handle(game_state, action.blocking_card_handle)
+            if not game_state.is_in_zone(blocking_card.handle, blocking_player.id, "play_area"):
                 raise ValueError(f"Blocking card {blocking_card.name} not found in {blocking_player.id}'s play area.")
-            print(f"{blocking_player.id} blocks {attacking_card.name} with {blocking_card.name}.")
-            game_state._pending_block_card_uuid = blocking_card.uuid
+            if event_bus.active:
+                event_bus.publish(AttackBlocked(blocking_player.id, attacking_card.name, blocking_card.name))
+            game_state._pending_block_card_handle = blocking_card.handle
         
         game_state._pending_action = "resolve_attack"
         game_state.switch_active_player() # Switch to attacking player to resolve the attack
@@ -322,7 +372,7 @@ class GameEngine:
         if action.player_id != player.id:
             raise ValueError(f"Action player {action.player_id} is not the active player {player.id}.")
 
-        game_state = GameRules.defeat(game_state, action.card_uuids, self.agents)            
+        game_state = GameRules.defeat(game_state, action.card_handles, self.agents)            
 
         # Clear the auxiliary variables used for defeating
         game_state._valid_targets = None
@@ -345,17 +395,15 @@ class GameEngine:
         if action.player_id != stealing_player.id:
             raise ValueError(f"Action player {action.player_id} is not the active player {stealing_player.id}.")
 
-        for card_uuid in action.card_uuids:
-            if card_uuid not in [card.uuid for card in target_player.play_area]:
-                raise ValueError(f"Card with UUID {card_uuid} not found in {target_player.id}'s play area.")
+        for card_handle in action.card_handles:
+            if not game_state.is_in_zone(card_handle, target_player.id, "play_area"):
+                raise ValueError(f"Card with handle {card_handle} not found in {target_player.id}'s play area.")
 
-            card = GameRules.get_card_by_uuid(game_state, card_uuid)
-            # 1. Remove the card from the target player's play area
-            target_player.play_area.remove(card)
-            # 2. Add the card to the stealing player's play area
-            stealing_player.play_area.append(card)
-            card.controller = stealing_player
-            print(f"{stealing_player.id} steals {card.name} from {target_player.id}.")
+            card = GameRules.get_card_by_handle(game_state, card_handle)
+            # Move the card from the target player's play area to the stealing player's play area
+            game_state.move_card(card, stealing_player, "play_area")
+            if event_bus.active:
+                event_bus.publish(CardStolen(stealing_player.id, card.name, target_player.id))
 
         # Clear the auxiliary variables used for stealing
         game_state._valid_targets = None
@@ -372,13 +420,15 @@ class GameEngine:
         if action.player_id != player.id:
             raise ValueError(f"Action player {action.player_id} is not the active player {player.id}.")
         
-        for card_uuid in action.card_uuids:
-            if card_uuid not in [card.uuid for card in player.hand]:
-                raise ValueError(f"Card with UUID {card_uuid} not found in {player.id}'s hand.")
+        for card_handle in action.card_handles:
+            if not game_state.is_in_zone(card_handle, player.id, "hand"):
+                raise ValueError(f"Card with handle {card_handle} not found in {player.id}'s hand.")
 
-            card = GameRules.get_card_by_uuid(game_state, card_uuid)
-            player.discard_card(card)
-            print(f"{player.id} discards {card.name}.")
+            card = GameRules.get_card_by_handle(game_state, card_handle)
+            game_state.move_card(card, player, "discard_pile")
+            game_state.draw_card(player)
+            if event_bus.active:
+                event_bus.publish(CardDiscarded(player.id, card.name))
 
         # Clear the auxiliary variables used for discarding
         game_state._valid_targets = None
@@ -401,15 +451,15 @@ class GameEngine:
         if action.player_id != player.id:
             raise ValueError(f"Action player {action.player_id} is not the active player {player.id}.")
         
-        if action.card_uuid is None:
+        if action.card_handle is None:
             game_state._already_hunted = True
             game_state._pending_action = "continue_attack"
 
-        elif action.card_uuid not in [card.uuid for card in opponent.play_area]:
-            raise ValueError(f"Card with UUID {action.card_uuid} not found in {opponent.id}'s play area.")
+        elif not game_state.is_in_zone(action.card_handle, opponent.id, "play_area"):
+            raise ValueError(f"Card with handle {action.card_handle} not found in {opponent.id}'s play area.")
         
         else: 
-            game_state._pending_block_card_uuid = action.card_uuid
+            game_state._pending_block_card_handle = action.card_handle
             game_state._already_hunted = True
             game_state._pending_action = "resolve_attack"
             # Clear the auxiliary variables used for hunting
@@ -425,14 +475,15 @@ class GameEngine:
 
         if action.player_id != player.id:
             raise ValueError(f"Action player {action.player_id} is not the active player {player.id}.")
-        if not game_state._pending_attack_card_uuid:
-            raise ValueError("No pending attack card UUID found in game state to activate Frenzy.")
-        attacking_card = GameRules.get_card_by_uuid(game_state, game_state._pending_attack_card_uuid)
-        if "Frenzy" not in GameRules.get_effective_keywords(game_state, attacking_card.uuid):
+        if game_state._pending_attack_card_handle is None:
+            raise ValueError("No pending attack card handle found in game state to activate Frenzy.")
+        attacking_card = GameRules.get_card_by_handle(game_state, game_state._pending_attack_card_handle)
+        if not GameRules.get_effective_keywords(game_state, attacking_card.handle) & Keyword.FRENZY:
             raise ValueError(f"{attacking_card.name} does not have Frenzy ability.")
 
         if action.go_again:
-            print(f"{player.id} activates Frenzy on {attacking_card.name}!")
+            if event_bus.active:
+                event_bus.publish(FrenzyActivated(player.id, attacking_card.name))
             game_state._pending_action = "frenzy_attack"
             game_state._frenzy_active = True
         else:
@@ -440,6 +491,33 @@ class GameEngine:
 
         return game_state
 
+    # --- Steps that need no decision ---
+
+    def resolve_automatic_steps(self, game_state: GameState) -> GameState:
+        """
+        Resolves in place the steps that do not need a decision from any agent:
+        finishing an action (which ends the turn) and continuing or resolving an attack.
+        Returns the game state once an agent has to act or the game is over.
+        """
+        while not game_state.game_over:
+            if game_state._pending_action == "finish_action":
+                if game_state._switch_active_player_back:
+                    game_state.switch_active_player()
+                    game_state._switch_active_player_back = False # Reset the flag
+                game_state = self.end_turn(game_state)
+
+            elif game_state._pending_action in ["continue_attack", "resolve_attack", "frenzy_attack"]:
+                if game_state._pending_attack_card_handle is None:
+                    raise ValueError("No pending attack card handle found in game state to continue attack action.")
+                attack_card = GameRules.get_card_by_handle(game_state, game_state._pending_attack_card_handle)
+                if not attack_card.controller_id:
+                    raise ValueError(f"Attack card {attack_card.name} has no controller.")
+                game_state = self._dispatch_action(game_state, AttackAction(attack_card.controller_id, attack_card.handle))
+
+            else:
+                break
+        return game_state
+
     # --- End Turn ---
 
     def end_turn(self, game_state: GameState) -> GameState:
@@ -447,7 +525,8 @@ class GameEngine:
         if game_state.is_game_over():
             return game_state
         
-        print(f"Turn {game_state.turn_count} ended.\n")
+        if event_bus.active:
+            event_bus.publish(TurnEnded(game_state.turn_count))
         game_state.switch_active_player() # Switch active player
         game_state.turn_count += 1 # Increment turn count
         game_state._pending_action = "play_or_attack" # Go back to play/attack phase
@@ -456,151 +535,172 @@ class GameEngine:
 
     # --- Check of possible actions ---
 
-    def get_valid_actions(self, game_state: GameState) -> List[Dict[str, Any]]:
+    def iter_valid_actions(self, game_state: GameState) -> Iterator[Action]:
         """
-        Determines all legal actions the active player can take in the current game state.
-        This is critical for AI and human input validation.
+        Yields, one at a time, all legal actions the active player can take in the current game state.
+        Nothing is computed for an action until it is requested, and no display data is built;
+        use describe_action for that. Unlike get_valid_actions, it does not end the game when
+        there are no valid actions.
         """
-        valid_actions: List[Dict[str, Any]] = []
         active_player = game_state.get_active_player()
-        inactive_player = game_state.get_inactive_player()
 
         if game_state.game_over:
-            return []
+            return
 
         if game_state._pending_action == "mindbug":
             # During the mindbug phase, the active player must choose whether to use a mindbug or not.
             if not active_player.mindbugs:
                 raise ValueError(f"Entered Mindbug phase but {active_player.id} has no Mindbugs left to use.")
-            if not game_state._pending_mindbug_card_uuid:
+            if game_state._pending_mindbug_card_handle is None:
                 raise ValueError("Mindbug phase entered without a pending Mindbug card.")
 
-            valid_actions.append({'action': MindbugAction(active_player.id, use_mindbug=True)})
-            valid_actions.append({'action': MindbugAction(active_player.id, use_mindbug=False)})
+            yield MindbugAction(active_player.id, use_mindbug=True)
+            yield MindbugAction(active_player.id, use_mindbug=False)
 
         elif game_state._pending_action == "play_or_attack":
             # During the play phase, the active player can play a card or attack with a card on the play area.
-            for card in active_player.hand:
-                valid_actions.append({'action': PlayCardAction(active_player.id, card.uuid),
-                                      'card_name': card.name})
-            for card in active_player.play_area:
-                valid_actions.append({'action': AttackAction(active_player.id, card.uuid),
-                                      'card_name': card.name})
+            # The zones are copied, since they may change while the actions are being tried out.
+            for card in active_player.hand[:]:
+                yield PlayCardAction(active_player.id, card.handle)
+            for card in active_player.play_area[:]:
+                yield AttackAction(active_player.id, card.handle)
                 
         elif game_state._pending_action == "block":
             # During the block phase, the active player can choose to block an attack with one of their cards.
             if not game_state._valid_targets:
                 raise ValueError("No valid targets for blocking action.")
-            for card_uuid in game_state._valid_targets:
-                valid_actions.append({'action': BlockAction(active_player.id, card_uuid),
-                                      'card_name': GameRules.get_card_by_uuid(game_state, card_uuid).name})
-            valid_actions.append({'action': BlockAction(active_player.id, None)})
-
-        elif game_state._pending_action == "steal":
-            # During the steal phase, the active player can choose to steal cards among the valid targets.
-            if not game_state._valid_targets:
-                raise ValueError("No valid targets for stealing action.")
-            if not game_state._amount_of_targets:
-                raise ValueError("No amount of targets specified for stealing action.")
-            
-            valid_targets = game_state._valid_targets
-            if isinstance(game_state._amount_of_targets, int):
-                min_size = max_size = min(game_state._amount_of_targets, len(valid_targets))
-            else:
-                min_size = min(game_state._amount_of_targets[0], len(valid_targets))
-                max_size = min(game_state._amount_of_targets[1], len(valid_targets))
-
-            valid_target_lists = self.list_of_subsets(valid_targets, min_size=min_size, max_size=max_size)
-            for target_list in valid_target_lists:
-                valid_actions.append({'action': StealAction(active_player.id, target_list),
-                                      'card_names': [GameRules.get_card_by_uuid(game_state, uuid).name for uuid in target_list]})
-                
-        elif game_state._pending_action == "discard":
-            # During the discard phase, the active player can choose which cards from hand to discard.
-            if not game_state._valid_targets:
-                raise ValueError("No valid targets for stealing action.")
-            if not game_state._amount_of_targets:
-                raise ValueError("No amount of targets specified for discard action.")
-            
-            valid_targets = game_state._valid_targets
-            if isinstance(game_state._amount_of_targets, int):
-                min_size = max_size = min(game_state._amount_of_targets, len(valid_targets))
-            else:
-                min_size = min(game_state._amount_of_targets[0], len(valid_targets))
-                max_size = min(game_state._amount_of_targets[1], len(valid_targets))
-
-            valid_target_lists = self.list_of_subsets(valid_targets, min_size=min_size, max_size=max_size)
-            for target_list in valid_target_lists:
-                valid_actions.append({'action': DiscardAction(active_player.id, target_list),
-                                      'card_names': [GameRules.get_card_by_uuid(game_state, uuid).name for uuid in target_list]})
-                
-        elif game_state._pending_action == "defeat":
-            # During the discard phase, the active player can choose which cards to defeat.
-            if not game_state._valid_targets:
-                raise ValueError("No valid targets for stealing action.")
-            if not game_state._amount_of_targets:
-                raise ValueError("No amount of targets specified for defeat action.")
-            
-            valid_targets = game_state._valid_targets
-            if isinstance(game_state._amount_of_targets, int):
-                min_size = max_size = min(game_state._amount_of_targets, len(valid_targets))
-            else:
-                min_size = min(game_state._amount_of_targets[0], len(valid_targets))
-                max_size = min(game_state._amount_of_targets[1], len(valid_targets))
-
-            valid_target_lists = self.list_of_subsets(valid_targets, min_size=min_size, max_size=max_size)
-            for target_list in valid_target_lists:
-                valid_actions.append({'action': DefeatAction(active_player.id, target_list),
-                                      'card_names': [GameRules.get_card_by_uuid(game_state, uuid).name for uuid in target_list]})
+            for card_handle in game_state._valid_targets:
+                yield BlockAction(active_player.id, card_handle)
+            yield BlockAction(active_player.id, None)
+
+        elif game_state._pending_action in TARGET_SUBSET_PHASES:
+            # During these phases, the active player can choose a subset of the valid targets
+            # to steal, to discard from hand or to defeat.
+            action_class, valid_targets, min_size, max_size = self._target_subsets(game_state)
+            for size in range(min_size, max_size + 1):
+                for target_list in combinations(valid_targets, size):
+                    yield action_class(active_player.id, list(target_list))
             
         elif game_state._pending_action == "play_from_discard":
             # During the play from discard phase, the active player can play cards 
             # either from their discard pile or from the opponent's discard pile.
             if not game_state._valid_targets:
-                raise ValueError("No valid targets for stealing action.")
+                raise ValueError("No valid targets for play from discard action.")
             if not game_state._amount_of_targets:
-                raise ValueError("No amount of targets specified for stealing action.")
+                raise ValueError("No amount of targets specified for play from discard action.")
             if game_state._amount_of_targets != 1:
                 raise NotImplementedError("Currently only one card can be played from discard at a time.")
             
-            for card_uuid in game_state._valid_targets:
-                valid_actions.append({'action': PlayFromDiscardAction(active_player.id, card_uuid),
-                                      'card_name': GameRules.get_card_by_uuid(game_state, card_uuid).name})
+            for card_handle in game_state._valid_targets:
+                yield PlayFromDiscardAction(active_player.id, card_handle)
                 
         elif game_state._pending_action == "hunt":
             # During the hunt phase, the active player can choose to hunt a card from the opponent's play area.
             if not game_state._valid_targets:
                 raise ValueError("No valid targets for hunting action.")
             
-            for card_uuid in game_state._valid_targets:
-                valid_actions.append({'action': HuntAction(active_player.id, card_uuid),
-                                      'card_name': GameRules.get_card_by_uuid(game_state, card_uuid).name})
+            for card_handle in game_state._valid_targets:
+                yield HuntAction(active_player.id, card_handle)
                 
         elif game_state._pending_action == "frenzy":
             # During the frenzy phase, the active player can choose to activate Frenzy or not.
-            if not game_state._pending_attack_card_uuid:
-                raise ValueError("No pending attack card UUID found in game state to activate Frenzy.")
-            attacking_card = GameRules.get_card_by_uuid(game_state, game_state._pending_attack_card_uuid)
-            if "Frenzy" in GameRules.get_effective_keywords(game_state, attacking_card.uuid):
-                valid_actions.append({'action': FrenzyAction(active_player.id, go_again=True),
-                                      'card_name': attacking_card.name})
-                valid_actions.append({'action': FrenzyAction(active_player.id, go_again=False),
-                                      'card_name': attacking_card.name})
+            if game_state._pending_attack_card_handle is None:
+                raise ValueError("No pending attack card handle found in game state to activate Frenzy.")
+            attacking_card = GameRules.get_card_by_handle(game_state, game_state._pending_attack_card_handle)
+            if GameRules.get_effective_keywords(game_state, attacking_card.handle) & Keyword.FRENZY:
+                yield FrenzyAction(active_player.id, go_again=True)
+                yield FrenzyAction(active_player.id, go_again=False)
             else:
                 raise ValueError(f"{attacking_card.name} does not have Frenzy ability.")
 
         else:
             raise ValueError(f"Unknown pending action: {game_state._pending_action}. Cannot determine valid actions.")
 
+    def count_valid_actions(self, game_state: GameState) -> int:
+        """
+        Returns the number of valid actions. When a subset of targets has to be chosen,
+        they are counted without being generated.
+        """
+        if not game_state.game_over and game_state._pending_action in TARGET_SUBSET_PHASES:
+            _, valid_targets, min_size, max_size = self._target_subsets(game_state)
+            return count_subsets(len(valid_targets), min_size, max_size)
+        return sum(1 for _ in self.iter_valid_actions(game_state))
+
+    def get_valid_action(self, game_state: GameState, index: int) -> Action:
+        """
+        Returns the valid action at the given position, in the order of iter_valid_actions.
+        When a subset of targets has to be chosen, it is found without generating the previous ones.
+        """
+        if index < 0:
+            raise IndexError(f"Action index {index} cannot be negative.")
+        if not game_state.game_over and game_state._pending_action in TARGET_SUBSET_PHASES:
+            action_class, valid_targets, min_size, max_size = self._target_subsets(game_state)
+            if index >= count_subsets(len(valid_targets), min_size, max_size):
+                raise IndexError(f"Action index {index} out of range.")
+            return action_class(game_state.active_player_id, subset_at(valid_targets, index, min_size, max_size))
+        for action_index, action in enumerate(self.iter_valid_actions(game_state)):
+            if action_index == index:
+                return action
+        raise IndexError(f"Action index {index} out of range.")
+
+    @staticmethod
+    def _target_subsets(game_state: GameState) -> Tuple[type, List[int], int, int]:
+        """
+        For the phases where a subset of targets is chosen (steal, discard and defeat), returns
+        the class of the action, the valid targets and the minimum and maximum number of them to choose.
+        """
+        if not game_state._valid_targets:
+            raise ValueError(f"No valid targets for {game_state._pending_action} action.")
+        if not game_state._amount_of_targets:
+            raise ValueError(f"No amount of targets specified for {game_state._pending_action} action.")
+
+        action_class = TARGET_SUBSET_PHASES[game_state._pending_action]
+        valid_targets = game_state._valid_targets
+        if isinstance(game_state._amount_of_targets, int):
+            min_size = max_size = min(game_state._amount_of_targets, len(valid_targets))
+        else:
+            min_size = min(game_state._amount_of_targets[0], len(valid_targets))
+            max_size = min(game_state._amount_of_targets[1], len(valid_targets))
+        return action_class, valid_targets, min_size, max_size
+
+    @staticmethod
+    def describe_action(game_state: GameState, action: Action) -> Dict[str, Any]:
+        """
+        Returns an action together with the names of the cards it involves, for display:
+        {'action': action} plus 'card_name' or 'card_names' when the action refers to cards.
+        """
+        if isinstance(action, FrenzyAction):
+            if game_state._pending_attack_card_handle is None:
+                return {'action': action}
+            return {'action': action,
+                    'card_name': GameRules.get_card_by_handle(game_state, game_state._pending_attack_card_handle).name}
+        for attribute, value in vars(action).items():
+            if attribute.endswith("handle") and value is not None:
+                return {'action': action, 'card_name': GameRules.get_card_by_handle(game_state, value).name}
+            elif attribute.endswith("handles"):
+                return {'action': action,
+                        'card_names': [GameRules.get_card_by_handle(game_state, handle).name for handle in value]}
+        return {'action': action}
+
+    def get_valid_actions(self, game_state: GameState) -> List[Dict[str, Any]]:
+        """
+        Determines all legal actions the active player can take in the current game state,
+        with the names of the cards they involve (see describe_action).
+        This is critical for AI and human input validation.
+        """
+        valid_actions = [self.describe_action(game_state, action) for action in self.iter_valid_actions(game_state)]
+
         # General rule: a player must take an action. If they cannot, they lose.
         if not valid_actions and not game_state.game_over:
-            print(f"No valid actions for {active_player.id}. They lose by inability to act.")
+            if event_bus.active:
+                event_bus.publish(NoValidActions(game_state.active_player_id))
             game_state.game_over = True
-            game_state.winner_id = inactive_player.id # Opponent wins
+            game_state.winner_id = game_state.inactive_player_id # Opponent wins
             return [] # No valid actions
 
         return valid_actions
     
+
     # --- Helper functions ---
     
     @staticmethod
@@ -614,15 +714,82 @@ class GameEngine:
             subsets.extend(combinations(original_list, size))
         return [list(subset) for subset in subsets]
     
+    @staticmethod
+    def _action_log_string(game_state: GameState, action: Action) -> str:
+        """
+        Returns the string of an action for the game logs, with its card handles replaced by card UUIDs.
+        """
+        log_action = copy.copy(action)
+        for attribute, value in vars(action).items():
+            if attribute.endswith("handle") and value is not None:
+                setattr(log_action, attribute, game_state.get_card_uuid(value))
+            elif attribute.endswith("handles"):
+                setattr(log_action, attribute, [game_state.get_card_uuid(handle) for handle in value])
+        return str(log_action)
+
     # --- Play a full game and return the history ---
 
+    def seed_game(self, seed: int) -> int:
+        """
+        Seeds the agents for a new game and returns the seed for its GameState.
+        Every source of randomness gets its own seed, all derived from the seed of the game.
+        """
+        seed_sequence = random.Random(seed)
+        game_seed = seed_sequence.getrandbits(64)
+        for agent in self.agents.values():
+            agent.seed(seed_sequence.getrandbits(64))
+        return game_seed
+
+    def choose_next_action(self, game_state: GameState) -> Optional[Action]:
+        """
+        Asks the active agent for its next action. If the active player has no valid actions,
+        they lose: the game is ended and None is returned.
+        """
+        valid_actions = ValidActions(self, game_state)
+        if not valid_actions:
+            if event_bus.active:
+                event_bus.publish(NoValidActions(game_state.active_player_id))
+            game_state.game_over = True
+            game_state.winner_id = game_state.inactive_player_id
+            return None
+
+        return self.agents[game_state.active_player_id].choose_from_valid_actions(
+            game_state, valid_actions, lambda valid_action: self.describe_action(game_state, valid_action))
+
+    def play_until_over(self, game_state: GameState) -> int:
+        """
+        Plays the game in place with the current agents until it is over, without copying
+        the state or keeping any history. Returns the number of actions taken.
+        """
+        n_actions = 0
+        self.resolve_automatic_steps(game_state)
+        while not game_state.game_over:
+            action = self.choose_next_action(game_state)
+            if action is None:
+                break
+            self._dispatch_action(game_state, action)
+            self.resolve_automatic_steps(game_state)
+            n_actions += 1
+        return n_actions
+
+    @staticmethod
+    def win_condition(game_state: GameState) -> str:
+        """Returns how a finished game was won: "life_below_zero" or "run_out_of_actions"."""
+        for player in game_state.players.values():
+            if player.life_points <= 0:
+                return "life_below_zero"
+        return "run_out_of_actions"
+
     def play_game(
             self,
             p1_forced_card_ids: List[str] = [],
-            p2_forced_card_ids: List[str] = []
+            p2_forced_card_ids: List[str] = [],
+            seed: Optional[int] = None
         ) -> Dict:
         """
         Plays a full game with the current agents and returns the final game state as a Dict.
+        The game and the agents are seeded from seed (a random one if not given, which is
+        saved in the logs), so playing again with the same seed and agents gives the same game.
         """
 
         logs = {}
@@ -648,6 +815,11 @@ class GameEngine:
         player1_id=list(self.agents.keys())[0]
         player2_id=list(self.agents.keys())[1]
 
+        if seed is None:
+            seed = random.getrandbits(63)
+        game_seed = self.seed_game(seed)
+        logs['seed'] = seed
+
         game_state = GameState.initial_state(
             player1_id=player1_id,
             player2_id=player2_id,
@@ -655,12 +827,13 @@ class GameEngine:
             deck_size=self.deck_size,
             hand_size=self.hand_size,
             p1_forced_cards=p1_forced_cards,
-            p2_forced_cards=p2_forced_cards
+            p2_forced_cards=p2_forced_cards,
+            seed=game_seed
         )
 
-        p1_initial_deck = {str(card.uuid): card.id 
+        p1_initial_deck = {str(game_state.get_card_uuid(card.handle)): card.id 
                            for card in game_state.get_player(player1_id).hand + game_state.get_player(player1_id).deck}
-        p2_initial_deck = {str(card.uuid): card.id
+        p2_initial_deck = {str(game_state.get_card_uuid(card.handle)): card.id
                            for card in game_state.get_player(player2_id).hand + game_state.get_player(player2_id).deck}
 
         logs['agents'] = {
@@ -675,46 +848,21 @@ class GameEngine:
         logs['history'] = []
 
         while not game_state.game_over:
-            if game_state._pending_action == "finish_action":
-                if game_state._switch_active_player_back:
-                    game_state.switch_active_player()
-                    game_state._switch_active_player_back = False # Reset the flag
-                game_state = self.end_turn(game_state)
-                continue
-                
-            if game_state._pending_action in ["continue_attack", "resolve_attack", "frenzy_attack"]:
-                if not game_state._pending_attack_card_uuid:
-                    raise ValueError("No pending attack card UUID found in game state to continue attack action.")
-                attack_card = GameRules.get_card_by_uuid(game_state, game_state._pending_attack_card_uuid)
-                if not attack_card.controller:
-                    raise ValueError(f"Attack card {attack_card.name} has no controller.")
-                game_state = self.apply_action(game_state, AttackAction(attack_card.controller.id, attack_card.uuid))
-                continue
-
-            active_player_id = game_state.active_player_id
-            active_agent = self.agents[active_player_id]
+            game_state = self.resolve_automatic_steps(game_state)
+            if game_state.game_over:
+                break
 
-            valid_actions = self.get_valid_actions(game_state)
-            
-            if not valid_actions:
-                print(f"{active_player_id} has no valid actions and loses!")
-                game_state.game_over = True
-                game_state.winner_id = game_state.inactive_player_id
+            action = self.choose_next_action(game_state)
+            if action is None:
                 break
 
-            action = active_agent.choose_action(game_state, valid_actions)
             logs['history'].append({
                 "turn": game_state.turn_count,
-                "action": str(action),
+                "action": self._action_log_string(game_state, action),
             })
             game_state = self.apply_action(game_state, action)
 
-        for player in game_state.players.values():
-            if player.life_points <= 0:
-                win_condition = "life_below_zero"
-                break
-        else:
-            win_condition = "run_out_of_actions"
+        win_condition = self.win_condition(game_state)
 
         logs['final_state'] = {
             "active_player_id": game_state.active_player_id,
@@ -726,13 +874,62 @@ class GameEngine:
             "players": {
                 player.id: {
                     "life_points": player.life_points,
-                    "hand": [str(card.uuid) for card in player.hand],
-                    "play_area": [str(card.uuid) for card in player.play_area],
-                    "discard_pile": [str(card.uuid) for card in player.discard_pile],
+                    "hand": [str(game_state.get_card_uuid(card.handle)) for card in player.hand],
+                    "play_area": [str(game_state.get_card_uuid(card.handle)) for card in player.play_area],
+                    "discard_pile": [str(game_state.get_card_uuid(card.handle)) for card in player.discard_pile],
                     "deck_size": len(player.deck),
                     "mindbugs": player.mindbugs
                 } for player in game_state.players.values()
             }
         }
 
-        return logs
\ No newline at end of file
+        return logs
+
+
+class ValidActions(Sequence[Action]):
+    """
+    Lazy sequence of the valid actions in a game state, in the order of GameEngine.iter_valid_actions.
+    Actions are only generated when they are iterated over or indexed, and the length is computed
+    without generating them when possible, so agents can e.g. pick a random action with
+    random.choice without the list of actions ever being built.
+    The game state must not change while the sequence is in use.
+    """
+    def __init__(self, game_engine: GameEngine, game_state: GameState) -> None:
+        self.game_engine = game_engine
+        self.game_state = game_state
+        self._length: Optional[int] = None
+        self._actions: Optional[List[Action]] = None # Only built in the phases with few actions
+
+    def _is_target_subset_choice(self) -> bool:
+        return not self.game_state.game_over and self.game_state._pending_action in TARGET_SUBSET_PHASES
+
+    def __iter__(self) -> Iterator[Action]:
+        if self._actions is not None:
+            return iter(self._actions)
+        return self.game_engine.iter_valid_actions(self.game_state)
+
+    def __len__(self) -> int:
+        if self._length is None:
+            if self._is_target_subset_choice():
+                self._length = self.game_engine.count_valid_actions(self.game_state)
+            else:
+                self._actions = list(self.game_engine.iter_valid_actions(self.game_state))
+                self._length = len(self._actions)
+        return self._length
+
+    def __bool__(self) -> bool:
+        if self._length is not None:
+            return self._length > 0
+        return next(iter(self), None) is not None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if self._is_target_subset_choice():
+            return self.game_engine.get_valid_action(self.game_state, index)
+        len(self) # Builds the list of actions
+        if not 0 <= index < len(self._actions):
+            raise IndexError(f"Action index {index} out of range.")
+        return self._actions[index]
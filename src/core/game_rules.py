@@ -1,52 +1,50 @@
-import random
-import copy
-from uuid import UUID
 from typing import List, Dict
 from src.models.game_state import GameState
-from src.models.card import Card
+from src.models.card import Card, Keyword
 from src.agents.base_agent import BaseAgent
 from src.models.action import CardChoiceRequest
+from src.core.events import *
 
 # --- Core Game Logic Functions ---
 
-def defeat(game_state: GameState, card_uuids: UUID | List[UUID], agents: Dict[str, BaseAgent] = {}) -> GameState:
+def defeat(game_state: GameState, card_handles: int | List[int], agents: Dict[str, BaseAgent] = {}) -> GameState:
     """
     Defeats a card or list of cards by moving it from play area to discard pile.
     It includes Tough keyword handling and activation of Defeated abilities.
     Returns the updated GameState.
     """
-    if isinstance(card_uuids, UUID):
-        card = get_card_by_uuid(game_state, card_uuids)
-        if card.controller is None:
+    if isinstance(card_handles, int):
+        card = get_card_by_handle(game_state, card_handles)
+        if card.controller_id is None:
             raise ValueError("Card has no controller. Cannot defeat.")   
 
         # Apply Tough
-        if "Tough" in get_effective_keywords(game_state, card.uuid) and not card.is_exhausted:
-            print(f"{card.name} is Tough. It becomes exhausted instead of defeated.")
-            card.is_exhausted = True
+        if get_effective_keywords(game_state, card.handle) & Keyword.TOUGH and not card.is_exhausted:
+            if event_bus.active:
+                event_bus.publish(ToughSaved(card.name))
+            game_state.set_exhausted(card, True)
         else:
             # Remove defeated card from play area and move to controller's discard pile
-            card.controller.discard_pile.append(card)
-            card.controller.play_area.remove(card)
-            card.is_exhausted = False  # Reset exhausted state
-            game_state = activate_defeated_ability(game_state, card.uuid, agents)
+            game_state.set_exhausted(card, False)  # Reset exhausted state
+            game_state.move_card(card, game_state.get_player(card.controller_id), "discard_pile")
+            game_state = activate_defeated_ability(game_state, card.handle, agents)
 
-    elif isinstance(card_uuids, list):
+    elif isinstance(card_handles, list):
         defeated_cards = []
-        for card_uuid in card_uuids:
-            card = get_card_by_uuid(game_state, card_uuid)
-            if card.controller is None:
+        for card_handle in card_handles:
+            card = get_card_by_handle(game_state, card_handle)
+            if card.controller_id is None:
                 raise ValueError("Card has no controller. Cannot defeat.")
             
             # Apply Tough
-            if "Tough" in get_effective_keywords(game_state, card.uuid) and not card.is_exhausted:
-                print(f"{card.name} is Tough. It becomes exhausted instead of defeated.")
-                card.is_exhausted = True
+            if get_effective_keywords(game_state, card.handle) & Keyword.TOUGH and not card.is_exhausted:
+                if event_bus.active:
+                    event_bus.publish(ToughSaved(card.name))
+                game_state.set_exhausted(card, True)
             else:
                 # Remove defeated card from play area and move to controller's discard pile
-                card.controller.discard_pile.append(card)
-                card.controller.play_area.remove(card)
-                card.is_exhausted = False  # Reset exhausted state
+                game_state.set_exhausted(card, False)  # Reset exhausted state
+                game_state.move_card(card, game_state.get_player(card.controller_id), "discard_pile")
                 defeated_cards.append(card)
         
         # Ask the active player to choose the order of defeated abilities
@@ -66,101 +64,110 @@ def defeat(game_state: GameState, card_uuids: UUID | List[UUID], agents: Dict[st
                 agent = agents[game_state.active_player_id]
                 defeated_cards_with_defeated_abilities = agent.choose_cards(game_state, choice_request)
             for card in defeated_cards_with_defeated_abilities:
-                game_state = activate_defeated_ability(game_state, card.uuid, agents)
+                game_state = activate_defeated_ability(game_state, card.handle, agents)
     return game_state
 
-def resolve_combat(game_state: GameState, attacker_uuid: UUID, 
-                    blocker_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def resolve_combat(game_state: GameState, attacker_handle: int, 
+                    blocker_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """
     Resolves a combat between two cards.
     Returns the updated GameState.
     """
-    attacker = get_card_by_uuid(game_state, attacker_uuid)
-    blocker = get_card_by_uuid(game_state, blocker_uuid)
-    if attacker.controller is None or blocker.controller is None:
+    attacker = get_card_by_handle(game_state, attacker_handle)
+    blocker = get_card_by_handle(game_state, blocker_handle)
+    if attacker.controller_id is None or blocker.controller_id is None:
         raise ValueError("Attacker or blocker has no controller. Cannot resolve combat.")
     
-    effective_attacker_power = get_effective_power(game_state, attacker.uuid)
-    effective_blocker_power = get_effective_power(game_state, blocker.uuid)
+    effective_attacker_power = get_effective_power(game_state, attacker.handle)
+    effective_blocker_power = get_effective_power(game_state, blocker.handle)
 
-    print(f"Resolving combat: {attacker.name} (P={effective_attacker_power}) "
-            f"vs {blocker.name} (P={effective_blocker_power})")
+    if event_bus.active:
+        event_bus.publish(CombatResolved(attacker.name, effective_attacker_power, blocker.name, effective_blocker_power))
 
-    defeated_cards_UUID: List[UUID] = []
+    defeated_card_handles: List[int] = []
 
     # Check for Poisonous keyword first
-    if "Poisonous" in get_effective_keywords(game_state, attacker.uuid):
-        print(f"{attacker.name} is Poisonous. {blocker.name} is defeated.")
-        defeated_cards_UUID.append(blocker.uuid)
+    if get_effective_keywords(game_state, attacker.handle) & Keyword.POISONOUS:
+        if event_bus.active:
+            event_bus.publish(CombatDefeat(attacker.name, blocker.name, poisonous=True))
+        defeated_card_handles.append(blocker.handle)
         
-    if "Poisonous" in get_effective_keywords(game_state, blocker.uuid):
-        print(f"{blocker.name} is Poisonous. {attacker.name} is defeated.")
-        defeated_cards_UUID.append(attacker.uuid)
+    if get_effective_keywords(game_state, blocker.handle) & Keyword.POISONOUS:
+        if event_bus.active:
+            event_bus.publish(CombatDefeat(blocker.name, attacker.name, poisonous=True))
+        defeated_card_handles.append(attacker.handle)
 
     # Effective power comparison
     if effective_attacker_power > effective_blocker_power:
-        print(f"{attacker.name} defeats {blocker.name}.")
-        defeated_cards_UUID.append(blocker.uuid)
+        if event_bus.active:
+            event_bus.publish(CombatDefeat(attacker.name, blocker.name))
+        defeated_card_handles.append(blocker.handle)
     elif effective_blocker_power > effective_attacker_power:
-        print(f"{blocker.name} defeats {attacker.name}.")
-        defeated_cards_UUID.append(attacker.uuid)
+        if event_bus.active:
+            event_bus.publish(CombatDefeat(blocker.name, attacker.name))
+        defeated_card_handles.append(attacker.handle)
     else: # Equal power
-        print(f"{attacker.name} and {blocker.name} defeat each other.")
-        defeated_cards_UUID.append(attacker.uuid)
-        defeated_cards_UUID.append(blocker.uuid)
+        if event_bus.active:
+            event_bus.publish(CombatMutualDefeat(attacker.name, blocker.name))
+        defeated_card_handles.append(attacker.handle)
+        defeated_card_handles.append(blocker.handle)
 
-    defeated_cards_UUID = list(set(defeated_cards_UUID))  # Remove duplicates
-    game_state = defeat(game_state, defeated_cards_UUID, agents) # This handles Choice of order of defeated abilities
+    defeated_card_handles = list(set(defeated_card_handles))  # Remove duplicates
+    game_state = defeat(game_state, defeated_card_handles, agents) # This handles Choice of order of defeated abilities
     
     return game_state
 
 
 # --- Ability Handlers (called by GameEngine when appropriate) ---
 
-def activate_play_ability(game_state: GameState, card_played_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def activate_play_ability(game_state: GameState, card_played_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Activates a card's 'Play' ability."""
-    card_played = get_card_by_uuid(game_state, card_played_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card with UUID {card_played_uuid} has no controller. Cannot activate play ability.")
-    opponent = game_state.get_opponent_of(card_played.controller.id)
+    card_played = get_card_by_handle(game_state, card_played_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card with handle {card_played_handle} has no controller. Cannot activate play ability.")
+    opponent = game_state.get_opponent_of(card_played.controller_id)
     
     if card_played.ability_type == "play":
         if "deathweaver" in [card.id for card in opponent.play_area]:
-            print(f"{card_played.name} cannot activate its play ability because Deathweaver is in play.")
+            if event_bus.active:
+                event_bus.publish(AbilityPrevented(card_played.name, "Deathweaver"))
             game_state._pending_action = "finish_action"
         else:
-            print(f"Activating Play ability of {card_played.name} for {card_played.controller.id}")
+            if event_bus.active:
+                event_bus.publish(AbilityActivated(card_played.name, "play", card_played.controller_id))
             handler = play_ability_handlers.get(card_played.id)
             if handler:
-                game_state = handler(copy.deepcopy(game_state), card_played_uuid, agents)
+                game_state = handler(game_state, card_played_handle, agents)
     else:
         game_state._pending_action = "finish_action"
     return game_state
 
-def activate_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def activate_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Activates a card's 'Attack' ability."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
-        raise ValueError(f"Attacking card with UUID {attacking_card_uuid} has no controller. Cannot activate attack ability.")
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
+        raise ValueError(f"Attacking card with handle {attacking_card_handle} has no controller. Cannot activate attack ability.")
     if attacking_card.ability_type == "attack":
-        print(f"Activating Attack ability for {attacking_card.name}.")
+        if event_bus.active:
+            event_bus.publish(AbilityActivated(attacking_card.name, "attack", attacking_card.controller_id))
         handler = attack_ability_handlers.get(attacking_card.id)
         if handler:
-            game_state = handler(copy.deepcopy(game_state), attacking_card_uuid, agents)
+            game_state = handler(game_state, attacking_card_handle, agents)
     else:
         game_state._pending_action = "continue_attack"
     return game_state
 
-def activate_defeated_ability(game_state: GameState, defeated_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def activate_defeated_ability(game_state: GameState, defeated_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Activates a card's 'Defeated' ability."""
-    defeated_card = get_card_by_uuid(game_state, defeated_card_uuid)
-    if defeated_card.controller is None:
-        raise ValueError(f"Defeated card with UUID {defeated_card_uuid} has no controller. Cannot activate defeated ability.")
+    defeated_card = get_card_by_handle(game_state, defeated_card_handle)
+    if defeated_card.controller_id is None:
+        raise ValueError(f"Defeated card with handle {defeated_card_handle} has no controller. Cannot activate defeated ability.")
     if defeated_card.ability_type == "defeated":
-        print(f"Activating Defeated ability for {defeated_card.name}.")
+        if event_bus.active:
+            event_bus.publish(AbilityActivated(defeated_card.name, "defeated", defeated_card.controller_id))
         handler = defeated_ability_handlers.get(defeated_card.id)
         if handler:
-            game_state = handler(copy.deepcopy(game_state), defeated_card_uuid, agents)
+            game_state = handler(game_state, defeated_card_handle, agents)
     else:
         game_state._pending_action = "finish_action"
     return game_state
@@ -168,61 +175,66 @@ def activate_defeated_ability(game_state: GameState, defeated_card_uuid: UUID, a
 
 # --- Specific Card Ability Implementations ---
 # These functions take a GameState (or relevant parts) and apply the effect,
-# returning a new GameState.
+# returning the updated GameState. They modify the state they are given in place:
+# a copy made by GameEngine.apply_action, or the caller's own state with
+# apply_in_place (recorded for undo) and play_until_over.
 
 # -- Play Abilities --
 
-def _axolotl_healer_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _axolotl_healer_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Axolotl Healer's 'Play' effect: Gain 2 life points."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    player = card_played.controller
-    if player is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
+    player = game_state.get_player(card_played.controller_id)
 
     # Player gains 2 life
-    player.life_points += 2
-    print(f"{player.id} gains 2 life points. New life: {player.life_points}")
+    game_state.set_life_points(player, player.life_points + 2)
+    if event_bus.active:
+        event_bus.publish(LifeGained(player.id, 2, player.life_points))
     game_state._pending_action = "finish_action"
 
     return game_state
 
-def _brain_fly_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _brain_fly_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Brain Fly's 'Play' effect: Take control of a creature with power 6 or more."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     valid_targets: List[Card] = []
     for card in opponent.play_area:
-        effective_power = get_effective_power(game_state, card.uuid)
+        effective_power = get_effective_power(game_state, card.handle)
         if effective_power >= 6:
             valid_targets.append(card)
 
     if not valid_targets:
-        print(f"No valid creatures with power 6 or more to take control of.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, "No valid creatures with power 6 or more to take control of."))
         game_state._pending_action = "finish_action"
         return game_state
     
     game_state._pending_action = "steal"
-    game_state._valid_targets = [card.uuid for card in valid_targets]
+    game_state._valid_targets = [card.handle for card in valid_targets]
     game_state._amount_of_targets = 1
 
     return game_state
 
-def _compost_dragon_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _compost_dragon_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Compost Dragon's 'Play' effect: Play a card from your discard pile."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
 
-    valid_targets = [card.uuid for card in player.discard_pile]
+    valid_targets = [card.handle for card in player.discard_pile]
     if not valid_targets:
-        print(f"{player.id} has no cards in discard pile to play.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, f"{player.id} has no cards in discard pile to play."))
         game_state._pending_action = "finish_action"
         return game_state
     
@@ -232,62 +244,64 @@ def _compost_dragon_play_ability(game_state: GameState, card_uuid: UUID, agents:
 
     return game_state
 
-def _ferret_bomber_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _ferret_bomber_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Ferret Bomber's 'Play' effect: The opponent discards two cards."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    opponent = game_state.get_opponent_of(card_played.controller.id)
+    opponent = game_state.get_opponent_of(card_played.controller_id)
 
     if not opponent.hand:
-        print(f"{opponent.id} has no cards in hand, cannot discard.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, f"{opponent.id} has no cards in hand, cannot discard."))
         game_state._pending_action = "finish_action"
         return game_state
 
     game_state._pending_action = "discard"
     game_state.switch_active_player()
     game_state._switch_active_player_back = True
-    game_state._valid_targets = [card.uuid for card in opponent.hand]
+    game_state._valid_targets = [card.handle for card in opponent.hand]
     game_state._amount_of_targets = 2
 
     return game_state
 
-def _giraffodile_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _giraffodile_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Giraffodile's 'Play' effect: Draw your entire discard pile."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
 
     if not player.discard_pile:
-        print(f"{player.id} has no cards in discard pile to draw.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, f"{player.id} has no cards in discard pile to draw."))
         game_state._pending_action = "finish_action"
         return game_state
 
     # Move all cards from discard pile to hand
     for card in player.discard_pile[:]:  # Slice to avoid modifying while iterating
-        player.hand.append(card)
-        player.discard_pile.remove(card)
-        card.controller = player  # Ensure the controller is set correctly
-        print(f"{player.id} draws {card.name} from their discard pile.")
+        game_state.move_card(card, player, "hand")
+        if event_bus.active:
+            event_bus.publish(CardDrawn(player.id, card.name, from_zone="discard_pile"))
 
     game_state._pending_action = "finish_action"
     return game_state
 
-def _grave_robber_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _grave_robber_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Grave Robber's 'Play' effect: Play a card from the opponent's discard pile."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
-    valid_targets = [card.uuid for card in opponent.discard_pile]
+    valid_targets = [card.handle for card in opponent.discard_pile]
     if not valid_targets:
-        print(f"{opponent.id} has no cards in discard pile to play.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, f"{opponent.id} has no cards in discard pile to play."))
         game_state._pending_action = "finish_action"
         return game_state
 
@@ -297,123 +311,130 @@ def _grave_robber_play_ability(game_state: GameState, card_uuid: UUID, agents: D
 
     return game_state
 
-def _kangasaurus_rex_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _kangasaurus_rex_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Kangasaurus Rex's 'Play' effect: Defeat all enemy creatures with power 4 or less.."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    opponent = game_state.get_opponent_of(card_played.controller.id)
+    opponent = game_state.get_opponent_of(card_played.controller_id)
     for card in opponent.play_area[:]: # We need to slice the list to avoid modifying it while iterating
-        effective_power = get_effective_power(game_state, card.uuid)
+        effective_power = get_effective_power(game_state, card.handle)
         if effective_power <= 4:
-            print(f"{card.name} (P={effective_power}) is defeated by Kangasaurus Rex.")
-            game_state = defeat(game_state, card.uuid)
+            if event_bus.active:
+                event_bus.publish(CardDefeatedByAbility(card.name, effective_power, card_played.name))
+            game_state = defeat(game_state, card.handle)
 
     game_state._pending_action = "finish_action"
     return game_state
 
-def _killer_bee_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _killer_bee_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Killer Bee's 'Play' effect: The opponent loses a life point."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
     opponent = game_state.get_opponent_of(player.id)
     
     # Opponent loses 1 life
-    opponent.life_points -= 1
-    print(f"{opponent.id} loses 1 life point, now they have {opponent.life_points} left.")
+    game_state.set_life_points(opponent, opponent.life_points - 1)
+    if event_bus.active:
+        event_bus.publish(LifeLost(opponent.id, 1, opponent.life_points))
     
     if opponent.life_points <= 0:
         game_state.game_over = True
         game_state.winner_id = player.id
-        print(f"{opponent.id} has no life points left! {game_state.winner_id} wins!")
+        if event_bus.active:
+            event_bus.publish(PlayerDefeated(opponent.id, game_state.winner_id))
 
     game_state._pending_action = "finish_action"
     return game_state
 
-def _mysterious_mermaid_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _mysterious_mermaid_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Mysterious Mermaid's 'Play' effect: Set your life points equal to the opponent's."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     # Set player's life points to opponent's life points
-    player.life_points = opponent.life_points
-    print(f"{player.id}'s life points are now set to {player.life_points}.")
+    game_state.set_life_points(player, opponent.life_points)
+    if event_bus.active:
+        event_bus.publish(LifeSet(player.id, player.life_points, card_played.name))
 
     game_state._pending_action = "finish_action"
     return game_state
 
-def _tiger_squirrel_play_ability(game_state: GameState, card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _tiger_squirrel_play_ability(game_state: GameState, card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Tiger Squirrel's 'Play' effect: Defeat an enemy creature with power 7 or more."""
-    card_played = get_card_by_uuid(game_state, card_uuid)
-    if card_played.controller is None:
-        raise ValueError(f"Card played {card_uuid} has no controller. Cannot resolve play ability.")
+    card_played = get_card_by_handle(game_state, card_handle)
+    if card_played.controller_id is None:
+        raise ValueError(f"Card played {card_handle} has no controller. Cannot resolve play ability.")
     
-    player = card_played.controller
+    player = game_state.get_player(card_played.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     valid_targets = []
     for card in opponent.play_area:
-        effective_power = get_effective_power(game_state, card.uuid)
+        effective_power = get_effective_power(game_state, card.handle)
         if effective_power >= 7:
             valid_targets.append(card)
 
     if not valid_targets:
-        print(f"No valid creatures with power 7 or more to defeat.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(card_played.name, "No valid creatures with power 7 or more to defeat."))
         game_state._pending_action = "finish_action"
         return game_state
     
     game_state._pending_action = "defeat"
-    game_state._valid_targets = [card.uuid for card in valid_targets]
+    game_state._valid_targets = [card.handle for card in valid_targets]
     game_state._amount_of_targets = 1
     
     return game_state
 
 # -- Attack Abilities --
 
-def _chameleon_sniper_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _chameleon_sniper_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Chameleon Sniper's 'Attack' effect: The opponent loses a life point."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve attack ability.")
     
-    player = attacking_card.controller
+    player = game_state.get_player(attacking_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
     
     # Opponent loses 1 life
-    opponent.life_points -= 1
+    game_state.set_life_points(opponent, opponent.life_points - 1)
     if opponent.life_points <= 0:
         game_state.game_over = True
         game_state.winner_id = player.id
-        print(f"{opponent.id} has no life points left! {game_state.winner_id} wins!")
+        if event_bus.active:
+            event_bus.publish(PlayerDefeated(opponent.id, game_state.winner_id))
 
     game_state._pending_action = "continue_attack"
     return game_state
 
-def _shark_dog_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _shark_dog_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Shark Dog's 'Attack' effect: Defeat an enemy creature with power 6 or more."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve attack ability.")
     
-    player = attacking_card.controller
+    player = game_state.get_player(attacking_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     valid_targets = []
     for card in opponent.play_area:
-        effective_power = get_effective_power(game_state, card.uuid)
+        effective_power = get_effective_power(game_state, card.handle)
         if effective_power >= 6:
-            valid_targets.append(card.uuid)
+            valid_targets.append(card.handle)
 
     if not valid_targets:
-        print(f"No valid creatures with power 6 or more to defeat.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(attacking_card.name, "No valid creatures with power 6 or more to defeat."))
         game_state._pending_action = "continue_attack"
         return game_state
     
@@ -424,22 +445,23 @@ def _shark_dog_attack_ability(game_state: GameState, attacking_card_uuid: UUID,
     
     return game_state
 
-def _snail_hydra_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _snail_hydra_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Snail Hydra's 'Attack' effect: If you control fewer creatures than your opponent, defeat a creature."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve attack ability.")
     
-    player = attacking_card.controller
+    player = game_state.get_player(attacking_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     # Check if player controls fewer creatures than opponent
     if len(player.play_area) < len(opponent.play_area):
-        valid_targets = [card.uuid for card in opponent.play_area + player.play_area]  # Can defeat any creature (except itself)
-        valid_targets = [uuid for uuid in valid_targets if uuid != attacking_card.uuid]  # Exclude itself
+        valid_targets = [card.handle for card in opponent.play_area + player.play_area]  # Can defeat any creature (except itself)
+        valid_targets = [handle for handle in valid_targets if handle != attacking_card.handle]  # Exclude itself
 
         if not valid_targets:
-            print(f"No creatures to defeat.")
+            if event_bus.active:
+                event_bus.publish(NoValidTargets(attacking_card.name, "No creatures to defeat."))
             game_state._pending_action = "continue_attack"
             return game_state
         
@@ -452,33 +474,35 @@ def _snail_hydra_attack_ability(game_state: GameState, attacking_card_uuid: UUID
 
     return game_state
 
-def _turbo_bug_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _turbo_bug_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Turbo Bug's 'Attack' effect: The opponent loses all life points except one."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve attack ability.")
     
-    opponent = game_state.get_opponent_of(attacking_card.controller.id)
+    opponent = game_state.get_opponent_of(attacking_card.controller_id)
 
     # Set opponent's life points to 1
     if opponent.life_points >= 1:
-        print(f"{opponent.id} loses all life points except one due to Turbo Bug.")
-        opponent.life_points = 1
+        game_state.set_life_points(opponent, 1)
+        if event_bus.active:
+            event_bus.publish(LifeSet(opponent.id, 1, attacking_card.name))
 
     game_state._pending_action = "continue_attack"
     return game_state
 
-def _tusked_extorter_attack_ability(game_state: GameState, attacking_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _tusked_extorter_attack_ability(game_state: GameState, attacking_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Tusked Extorter's 'Attack' effect: The opponent discards a card."""
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    if attacking_card.controller is None:
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve attack ability.")
     
-    opponent = game_state.get_opponent_of(attacking_card.controller.id)
-    valid_targets = [card.uuid for card in opponent.hand]
+    opponent = game_state.get_opponent_of(attacking_card.controller_id)
+    valid_targets = [card.handle for card in opponent.hand]
 
     if not valid_targets:
-        print(f"{opponent.id}'s hand is empty, cannot discard.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(attacking_card.name, f"{opponent.id}'s hand is empty, cannot discard."))
         game_state._pending_action = "continue_attack"
         return game_state
 
@@ -493,19 +517,20 @@ def _tusked_extorter_attack_ability(game_state: GameState, attacking_card_uuid:
 
 # -- Defeated Abilities --
 
-def _explosive_toad_defeated_ability(game_state: GameState, defeated_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _explosive_toad_defeated_ability(game_state: GameState, defeated_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Explosive Toad's 'Defeated' effect: Defeat a creature."""
-    defeated_card = get_card_by_uuid(game_state, defeated_card_uuid)
-    if defeated_card.controller is None:
+    defeated_card = get_card_by_handle(game_state, defeated_card_handle)
+    if defeated_card.controller_id is None:
         raise ValueError("Defeated card has no controller. Cannot resolve defeated ability.")
     
-    player = defeated_card.controller
+    player = game_state.get_player(defeated_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
-    valid_targets = [card.uuid for card in opponent.play_area + player.play_area]
+    valid_targets = [card.handle for card in opponent.play_area + player.play_area]
 
     if not valid_targets:
-        print(f"No creatures to defeat.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(defeated_card.name, "No creatures to defeat."))
         game_state._pending_action = "finish_action"
         return game_state
     
@@ -515,23 +540,24 @@ def _explosive_toad_defeated_ability(game_state: GameState, defeated_card_uuid:
     
     return game_state
 
-def _harpy_mother_defeated_ability(game_state: GameState, defeated_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _harpy_mother_defeated_ability(game_state: GameState, defeated_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Harpy Mother's 'Defeated' effect: Take control of up to two creatures with power 5 or less."""
-    defeated_card = get_card_by_uuid(game_state, defeated_card_uuid)
-    if defeated_card.controller is None:
+    defeated_card = get_card_by_handle(game_state, defeated_card_handle)
+    if defeated_card.controller_id is None:
         raise ValueError("Defeated card has no controller. Cannot resolve defeated ability.")
     
-    player = defeated_card.controller
+    player = game_state.get_player(defeated_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     valid_targets = []
     for card in opponent.play_area:
-        effective_power = get_effective_power(game_state, card.uuid)
+        effective_power = get_effective_power(game_state, card.handle)
         if effective_power <= 5:
-            valid_targets.append(card.uuid)
+            valid_targets.append(card.handle)
 
     if not valid_targets:
-        print(f"No valid creatures with power 5 or less to take control of.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(defeated_card.name, "No valid creatures with power 5 or less to take control of."))
         game_state._pending_action = "finish_action"
         return game_state
     
@@ -541,28 +567,28 @@ def _harpy_mother_defeated_ability(game_state: GameState, defeated_card_uuid: UU
 
     return game_state
 
-def _strange_barrel_defeated_ability(game_state: GameState, defeated_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> GameState:
+def _strange_barrel_defeated_ability(game_state: GameState, defeated_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> GameState:
     """Strange Barrel's 'Defeated' effect: Steal two random cards from the opponent's hand."""
-    defeated_card = get_card_by_uuid(game_state, defeated_card_uuid)
-    if defeated_card.controller is None:
+    defeated_card = get_card_by_handle(game_state, defeated_card_handle)
+    if defeated_card.controller_id is None:
         raise ValueError("Defeated card has no controller. Cannot resolve defeated ability.")
     
-    player = defeated_card.controller
+    player = game_state.get_player(defeated_card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
 
     if not opponent.hand:
-        print(f"{opponent.id} has no cards in hand to steal.")
+        if event_bus.active:
+            event_bus.publish(NoValidTargets(defeated_card.name, f"{opponent.id} has no cards in hand to steal."))
         return game_state
 
     # Randomly select up to two cards from opponent's hand
     num_to_steal = min(2, len(opponent.hand))
-    stolen_cards = random.sample(opponent.hand, num_to_steal)
+    stolen_cards = game_state.random_sample(opponent.hand, num_to_steal)
 
     for card in stolen_cards:
-        opponent.hand.remove(card)
-        player.hand.append(card)
-        card.controller = player
-        print(f"{player.id} steals {card.name} from {opponent.id}'s hand.")
+        game_state.move_card(card, player, "hand")
+        if event_bus.active:
+            event_bus.publish(CardStolen(player.id, card.name, opponent.id, from_zone="hand"))
 
     game_state._pending_action = "finish_action"
     return game_state
@@ -570,13 +596,13 @@ def _strange_barrel_defeated_ability(game_state: GameState, defeated_card_uuid:
 # -- Passive Abilities --
 # Some of these are handled at the relevant part of the game logic, such as is_valid_blocker or resolve_combat.
 
-def _goblin_werewolf_passive_ability(game_state: GameState, goblin_werewolf_uuid: UUID,
-                                    affected_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> int:
+def _goblin_werewolf_passive_ability(game_state: GameState, goblin_werewolf_handle: int,
+                                    affected_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> int:
     """Goblin Werewolf's 'Passive' effect: Has +6 power while it is your turn."""
-    goblin_werewolf_controller = get_card_by_uuid(game_state, goblin_werewolf_uuid).controller
-    if goblin_werewolf_controller:
-        if (game_state.active_player_id == goblin_werewolf_controller.id
-            and goblin_werewolf_uuid == affected_card_uuid):
+    goblin_werewolf_controller_id = get_card_by_handle(game_state, goblin_werewolf_handle).controller_id
+    if goblin_werewolf_controller_id:
+        if (game_state.active_player_id == goblin_werewolf_controller_id
+            and goblin_werewolf_handle == affected_card_handle):
             # Only apply the bonus if it's the controller's turn
             return 6
         else:
@@ -584,45 +610,45 @@ def _goblin_werewolf_passive_ability(game_state: GameState, goblin_werewolf_uuid
     else:
         raise ValueError("Goblin Werewolf card has no controller. Cannot resolve passive ability.")
 
-def _lone_yeti_passive_ability(game_state: GameState, lone_yeti_uuid: UUID,
-                                affected_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> int:
+def _lone_yeti_passive_ability(game_state: GameState, lone_yeti_handle: int,
+                                affected_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> int:
     """Lone Yeti's 'Passive' effect: While this is your only allied creature, it has +5 power and Frenzy."""
-    lone_yeti = get_card_by_uuid(game_state, lone_yeti_uuid)
-    if lone_yeti.controller is None:
+    lone_yeti = get_card_by_handle(game_state, lone_yeti_handle)
+    if lone_yeti.controller_id is None:
         raise ValueError("Lone Yeti card has no controller. Cannot resolve passive ability.")
-    play_area = lone_yeti.controller.play_area
-    if len(play_area) == 1 and play_area[0].uuid == lone_yeti_uuid and affected_card_uuid == lone_yeti_uuid:
+    play_area = game_state.get_player(lone_yeti.controller_id).play_area
+    if len(play_area) == 1 and play_area[0].handle == lone_yeti_handle and affected_card_handle == lone_yeti_handle:
         return 5
     return 0
     
-def _shield_bugs_passive_ability(game_state: GameState, shield_bugs_uuid: UUID, 
-                                    affected_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> int:
+def _shield_bugs_passive_ability(game_state: GameState, shield_bugs_handle: int, 
+                                    affected_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> int:
     """Shield Bugs' 'Passive' effect: Other allied creatures have +1 power."""
-    shield_bugs_card = get_card_by_uuid(game_state, shield_bugs_uuid)
-    if shield_bugs_card.controller is None:
+    shield_bugs_card = get_card_by_handle(game_state, shield_bugs_handle)
+    if shield_bugs_card.controller_id is None:
         raise ValueError("Shield Bugs card has no controller. Cannot resolve passive ability.")
-    affected_card = get_card_by_uuid(game_state, affected_card_uuid)
-    if affected_card.controller is None:
+    affected_card = get_card_by_handle(game_state, affected_card_handle)
+    if affected_card.controller_id is None:
         raise ValueError("Affected card has no controller. Cannot resolve passive ability.")
-    if (affected_card.controller.id == shield_bugs_card.controller.id
-        and affected_card.uuid != shield_bugs_uuid
-        and affected_card in affected_card.controller.play_area):
+    if (affected_card.controller_id == shield_bugs_card.controller_id
+        and affected_card.handle != shield_bugs_handle
+        and game_state.is_in_zone(affected_card_handle, affected_card.controller_id, "play_area")):
         return 1
     else:
         return 0
 
-def _urchin_hurler_passive_ability(game_state: GameState, urchin_hurler_uuid: UUID,
-                                    affected_card_uuid: UUID, agents: Dict[str, BaseAgent] = {}) -> int:
+def _urchin_hurler_passive_ability(game_state: GameState, urchin_hurler_handle: int,
+                                    affected_card_handle: int, agents: Dict[str, BaseAgent] = {}) -> int:
     """Urchin Hurler's 'Passive' effect: Other allied creatures have +2 power while it is your turn."""
-    urchin_hurler_card = get_card_by_uuid(game_state, urchin_hurler_uuid)
-    affected_card = get_card_by_uuid(game_state, affected_card_uuid)
-    if affected_card.controller is None:
+    urchin_hurler_card = get_card_by_handle(game_state, urchin_hurler_handle)
+    affected_card = get_card_by_handle(game_state, affected_card_handle)
+    if affected_card.controller_id is None:
         raise ValueError("Affected card has no controller. Cannot resolve passive ability.")
-    if urchin_hurler_card.controller is None:
+    if urchin_hurler_card.controller_id is None:
         raise ValueError("Urchin Hurler card has no controller. Cannot resolve passive ability.")
-    if (game_state.active_player_id == urchin_hurler_card.controller.id
-        and affected_card.controller.id == urchin_hurler_card.controller.id
-        and affected_card_uuid != urchin_hurler_uuid):
+    if (game_state.active_player_id == urchin_hurler_card.controller_id
+        and affected_card.controller_id == urchin_hurler_card.controller_id
+        and affected_card_handle != urchin_hurler_handle):
         return 2
     return 0
 
@@ -667,19 +693,19 @@ passive_ability_handlers = {
 # --- Utility methods for rules ---
 # These might be used by GameEngine to determine valid actions or apply effects.
 
-def is_valid_blocker(blocking_card_uuid: UUID, attacking_card_uuid: UUID,
+def is_valid_blocker(blocking_card_handle: int, attacking_card_handle: int,
                      game_state: GameState) -> bool:
     """Checks if a blocker is valid."""
-    blocking_card = get_card_by_uuid(game_state, blocking_card_uuid)
-    attacking_card = get_card_by_uuid(game_state, attacking_card_uuid)
-    attacking_player = attacking_card.controller
-    if attacking_player is None:
+    blocking_card = get_card_by_handle(game_state, blocking_card_handle)
+    attacking_card = get_card_by_handle(game_state, attacking_card_handle)
+    if attacking_card.controller_id is None:
         raise ValueError("Attacking card has no controller. Cannot resolve blocking.")
+    attacking_player = game_state.get_player(attacking_card.controller_id)
 
-    blocking_card_effective_power = get_effective_power(game_state, blocking_card.uuid)
+    blocking_card_effective_power = get_effective_power(game_state, blocking_card.handle)
 
-    if ("Sneaky" in get_effective_keywords(game_state, attacking_card_uuid) 
-        and "Sneaky" not in get_effective_keywords(game_state, blocking_card_uuid)):
+    if (get_effective_keywords(game_state, attacking_card_handle)
+        & ~get_effective_keywords(game_state, blocking_card_handle) & Keyword.SNEAKY):
         return False # Sneaky can only be blocked by Sneaky
     
     # Bee Bear ability
@@ -693,55 +719,60 @@ def is_valid_blocker(blocking_card_uuid: UUID, attacking_card_uuid: UUID,
     
     return True
 
-def get_card_by_uuid(game_state: GameState, card_uuid: UUID) -> Card:
-    """Returns a card by its UUID from the game state."""
-    for player in [game_state.get_active_player(), game_state.get_inactive_player()]:
-        for card in player.play_area + player.hand + player.discard_pile:
-            if card.uuid == card_uuid:
-                return card
-    else:
-        raise ValueError(f"Card with UUID {card_uuid} not found in game state.")
+def get_card_by_handle(game_state: GameState, card_handle: int) -> Card:
+    """Returns a card by its handle from the game state."""
+    return game_state.get_card(card_handle)
 
-def get_effective_power(game_state: GameState, card_uuid: UUID) -> int:
+def get_effective_power(game_state: GameState, card_handle: int) -> int:
     """Returns the effective power of a card, considering any passive effects."""
-    card = get_card_by_uuid(game_state, card_uuid)
+    effective_power = game_state._effective_power_cache.get(card_handle)
+    if effective_power is not None:
+        return effective_power
+
+    card = get_card_by_handle(game_state, card_handle)
     effective_power = card.power
 
     for other_card in game_state.get_active_player().play_area + game_state.get_inactive_player().play_area:
         if other_card.ability_type == "passive":
             handler = passive_ability_handlers.get(other_card.id)
             if handler:
-                effective_power += handler(game_state, other_card.uuid, card.uuid)
-    
+                effective_power += handler(game_state, other_card.handle, card.handle)
+
+    game_state._effective_power_cache[card_handle] = effective_power
     return effective_power
     
-def get_effective_keywords(game_state: GameState, card_uuid: UUID) -> List[str]:
-    """Returns the effective keywords of a card, considering any passive effects."""
-    card = get_card_by_uuid(game_state, card_uuid)
-    effective_keywords = set(card.keywords)
+def get_effective_keywords(game_state: GameState, card_handle: int) -> Keyword:
+    """
+    Returns the effective keywords of a card as a Keyword mask, considering any passive effects.
+    Use Keyword.names to get them as strings.
+    """
+    cached_keywords = game_state._effective_keywords_cache.get(card_handle)
+    if cached_keywords is not None:
+        return cached_keywords
+
+    card = get_card_by_handle(game_state, card_handle)
+    effective_keywords = card.keyword_mask
 
-    player = card.controller
-    if player is None:
+    if card.controller_id is None:
         raise ValueError("Card has no controller. Cannot resolve effective keywords.")
+    player = game_state.get_player(card.controller_id)
     opponent = game_state.get_opponent_of(player.id)
     if opponent is None:
         raise ValueError("Opponent not found. Cannot resolve effective keywords.")
 
     # Lone Yeti passive ability
     if card.id == "lone_yeti" and len(player.play_area) == 1:
-        effective_keywords.add("Frenzy")
+        effective_keywords |= Keyword.FRENZY
 
     # Sharky Crab-Dog-Mummypus passive ability
     if card.id == "sharky_crab-dog-mummypus":
-        for card in opponent.play_area:
-            for keyword in card.keywords:
-                if keyword in ["Hunter", "Sneaky", "Frenzy", "Poisonous"]:
-                    effective_keywords.add(keyword)
+        for enemy in opponent.play_area:
+            effective_keywords |= enemy.keyword_mask & (Keyword.HUNTER | Keyword.SNEAKY | Keyword.FRENZY | Keyword.POISONOUS)
 
     # Snail Thrower passive ability
-    if "snail_thrower" in [other_card.id for other_card in player.play_area if other_card.uuid != card_uuid]:
-        if get_effective_power(game_state, card.uuid) <= 4:
-            effective_keywords.add("Hunter")
-            effective_keywords.add("Poisonous")
-    
-    return list(effective_keywords)
\ No newline at end of file
+    if "snail_thrower" in [other_card.id for other_card in player.play_area if other_card.handle != card_handle]:
+        if get_effective_power(game_state, card.handle) <= 4:
+            effective_keywords |= Keyword.HUNTER | Keyword.POISONOUS
+
+    game_state._effective_keywords_cache[card_handle] = effective_keywords
+    return effective_keywords
\ No newline at end of file
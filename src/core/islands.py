@@ -0,0 +1,176 @@
+import multiprocessing as mp
+import queue
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Any
+import numpy as np
+from src.core.evolution import FitnessEvaluator, SequentialFitnessEvaluator, GeneticAlgorithm, GenomeOpponent
+from src.agents.base_agent import BaseAgent
+from src.agents.random_agent import RandomAgent, ZeroAgent
+
+def population_diversity(population: np.ndarray) -> float:
+    """Mean Euclidean distance of the genomes of a population to their centroid."""
+    return float(np.linalg.norm(population - population.mean(axis=0), axis=1).mean())
+
+def _take_in_migrants(algorithm: GeneticAlgorithm, inbox: Any) -> int:
+    """
+    Replaces the last children of the population of an island by the migrants found in its inbox,
+    without waiting for any, and returns their number. Migrants that arrived together take different
+    places, the latest ones being kept when there are more than children. The elites are never replaced.
+    """
+    arrivals = []
+    while True:
+        try:
+            arrivals.append(inbox.get_nowait())
+        except queue.Empty:
+            break
+    if not arrivals:
+        return 0
+    migrants = np.concatenate(arrivals)[-(algorithm.population_size - algorithm.elite_size):]
+    algorithm.population[len(algorithm.population) - len(migrants):] = migrants
+    return len(migrants)
+
+def _run_island(island_index: int, n_generations: int, settings: Dict[str, Any], inbox: mp.Queue,
+                outbox: mp.Queue, reports: mp.Queue) -> None:
+    """
+    Runs the genetic algorithm of one island in its own process. Every generation, a report is put on
+    the reports queue; every migration_interval generations, the best genomes are put on the outbox.
+    Migrants found in the inbox replace the last children of the next generation, without waiting for them.
+    """
+    outbox.cancel_join_thread() # Migration is best effort: the island can exit with migrants still unread
+    evaluator_class = SequentialFitnessEvaluator if settings["sequential"] else FitnessEvaluator
+    evaluator = evaluator_class(processes=1, **settings["evaluator_options"])
+    algorithm = GeneticAlgorithm(evaluator, seed=settings["seed"] + island_index, **settings["algorithm_options"])
+    genome_options = {key: value for key, value in settings["evaluator_options"].items()
+                      if key in ("hidden_size", "deck_size", "hand_size", "cards_path")}
+    hall_of_fame: List[np.ndarray] = []
+
+    start_time = time.perf_counter()
+    while algorithm.generation < n_generations:
+        stats = algorithm.step()
+
+        # The best genome of the generation joins the hall of fame, whose members are opponents from now on
+        if settings["hall_of_fame_size"] > 0:
+            hall_of_fame = (hall_of_fame + [algorithm.best_genome])[-settings["hall_of_fame_size"]:]
+            evaluator.set_opponents(tuple(settings["opponents"]) +
+                                    tuple(GenomeOpponent(genome, **genome_options) for genome in hall_of_fame))
+
+        migrants_sent = 0
+        if algorithm.generation % settings["migration_interval"] == 0:
+            migrants = algorithm.top_genomes(settings["n_migrants"])
+            outbox.put(migrants)
+            migrants_sent = len(migrants)
+
+        migrants_received = _take_in_migrants(algorithm, inbox)
+        elapsed = time.perf_counter() - start_time
+        reports.put({**stats, "island": island_index, "diversity": population_diversity(algorithm.population),
+                     "migrants_sent": migrants_sent, "migrants_received": migrants_received,
+                     "total_elapsed": elapsed, "done": False})
+    reports.put({"island": island_index, "done": True, "best_genome": algorithm.best_genome,
+                 "best_fitness": algorithm.best_fitness})
+
+class IslandModel:
+    """
+    Evolves several populations (islands) at once, each with its own GeneticAlgorithm in its own process,
+    playing its games in that process. Islands don't wait for each other: every migration_interval
+    generations, an island sends copies of its best genomes to the next island (in a ring) over a queue,
+    and each island takes in the migrants that have arrived whenever it finishes a generation. Islands
+    keep the diversity that a single population loses, while all the cores stay busy without a barrier
+    at every generation.
+
+    Genomes play against fixed opponents (RandomAgent and ZeroAgent by default) and the island's hall of
+    fame: its best genomes of the last generations. Every island reports its progress each generation,
+    with its throughput and the diversity of its population (see population_diversity). Runs are not
+    reproducible, since migrants arrive whenever the other islands send them.
+    """
+    def __init__(self, n_islands: Optional[int] = None, migration_interval: int = 5, n_migrants: int = 2,
+                 hall_of_fame_size: int = 3, opponents: Sequence[Callable[[str], BaseAgent]] = (RandomAgent, ZeroAgent),
+                 sequential: bool = True, evaluator_options: Optional[Dict[str, Any]] = None,
+                 algorithm_options: Optional[Dict[str, Any]] = None, seed: int = 0) -> None:
+        """
+        Args:
+            n_islands: Number of islands, each run in its own process. All the CPUs if not given.
+            migration_interval: Number of generations between two migrations of an island
+            n_migrants: Number of genomes an island sends at each migration
+            hall_of_fame_size: Number of the island's last best genomes that genomes also play against (0 for none)
+            opponents: Fixed opponents (see FitnessEvaluator). They must be picklable.
+            sequential: Whether fitness is evaluated by racing (SequentialFitnessEvaluator)
+            evaluator_options: Other arguments of the evaluators (e.g. hidden_size, batch_size)
+            algorithm_options: Arguments of the GeneticAlgorithm of every island (e.g. population_size, n_games)
+            seed: Seed of the first island. Island i uses seed + i.
+        """
+        if migration_interval < 1:
+            raise ValueError(f"Migration interval must be positive, got {migration_interval}.")
+        self.n_islands = n_islands if n_islands is not None else mp.cpu_count()
+        self.settings = {"migration_interval": migration_interval, "n_migrants": n_migrants,
+                         "hall_of_fame_size": hall_of_fame_size, "opponents": tuple(opponents),
+                         "sequential": sequential, "evaluator_options": {**(evaluator_options or {}), "opponents": opponents},
+                         "algorithm_options": algorithm_options or {}, "seed": seed}
+        self.reports: List[Dict[str, Any]] = [] # Every report of the last run, in the order they arrived
+        self.best_genome: Optional[np.ndarray] = None
+        self.best_fitness = -np.inf
+
+    def run(self, n_generations: int, verbose: bool = False) -> np.ndarray:
+        """
+        Runs every island for n_generations generations, and returns the best genome of the islands' last generations.
+        Args:
+            n_generations: Number of generations of every island
+            verbose: Whether the reports of the islands are printed as they arrive
+        """
+        inboxes = [mp.Queue() for _ in range(self.n_islands)]
+        reports = mp.Queue()
+        islands = [mp.Process(target=_run_island, daemon=True,
+                              args=(index, n_generations, self.settings, inboxes[index],
+                                    inboxes[(index + 1) % self.n_islands], reports))
+                   for index in range(self.n_islands)]
+        for island in islands:
+            island.start()
+
+        self.reports = []
+        self.best_genome, self.best_fitness = None, -np.inf
+        running = self.n_islands
+        try:
+            while running > 0:
+                try:
+                    report = reports.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(island.is_alive() for island in islands):
+                        raise RuntimeError("The island processes stopped without finishing their run.")
+                    continue
+                if report["done"]:
+                    running -= 1
+                    if report["best_genome"] is not None and report["best_fitness"] > self.best_fitness:
+                        self.best_genome, self.best_fitness = report["best_genome"], report["best_fitness"]
+                    continue
+                self.reports.append(report)
+                if verbose:
+                    print(f"Island {report['island']}, generation {report['generation'] + 1}/{n_generations}: "
+                          f"best fitness {report['best_fitness']:.3f}, mean fitness {report['mean_fitness']:.3f}, "
+                          f"diversity {report['diversity']:.2f}, {report['games_per_second']:.0f} games/s",
+                          file=sys.stderr, flush=True)
+        finally:
+            for island in islands:
+                island.join(timeout=5.0)
+                if island.is_alive():
+                    island.terminate()
+        return self.best_genome
+
+    def island_stats(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Returns the totals of every island over the last run: generations, games, throughput
+        (games per second of the island's process), diversity of its last population, migrants
+        sent and received, and its best fitness in its last generation.
+        """
+        stats: Dict[int, Dict[str, Any]] = {}
+        for report in self.reports:
+            island = stats.setdefault(report["island"], {"generations": 0, "games": 0, "migrants_sent": 0,
+                                                         "migrants_received": 0})
+            island["generations"] += 1
+            island["games"] += report["games"]
+            island["migrants_sent"] += report["migrants_sent"]
+            island["migrants_received"] += report["migrants_received"]
+            island["elapsed"] = report["total_elapsed"]
+            island["games_per_second"] = island["games"] / island["elapsed"] if island["elapsed"] > 0 else 0.0
+            island["diversity"] = report["diversity"]
+            island["best_fitness"] = report["best_fitness"]
+        return stats
@@ -0,0 +1,106 @@
+import random
+from typing import Callable, Dict, Iterator, List, Optional
+from src.core.game_engine import GameEngine
+from src.models.game_state import GameState
+from src.models.card import Card
+from src.agents.base_agent import BaseAgent
+from src.utils.data_loader import load_cards_from_json
+
+class GameResult:
+    """
+    Compact record of a finished game, kept instead of its full logs.
+    The game can be replayed with GameEngine.play_game(seed=seed) and the same agents.
+    """
+    __slots__ = ('seed', 'winner_id', 'win_condition', 'turn_count', 'n_actions')
+
+    def __init__(self, seed: int, winner_id: Optional[str], win_condition: str, turn_count: int, n_actions: int) -> None:
+        self.seed = seed
+        self.winner_id = winner_id
+        self.win_condition = win_condition
+        self.turn_count = turn_count
+        self.n_actions = n_actions
+
+    def __reduce__(self):
+        # Sent back from worker processes as a plain tuple
+        return (GameResult, (self.seed, self.winner_id, self.win_condition, self.turn_count, self.n_actions))
+
+    def __repr__(self) -> str:
+        return (f"GameResult(Seed: {self.seed}, Winner: {self.winner_id}, Win condition: {self.win_condition}, "
+                f"Turns: {self.turn_count}, Actions: {self.n_actions})")
+
+class Simulator:
+    """
+    Plays many headless games between agents as fast as possible: the card pool is loaded once,
+    one GameEngine and one set of agents are reused for all games, and games are played in place
+    with no copies, logs or printed output.
+    """
+    def __init__(self, all_cards: Optional[List[Card]] = None, deck_size: int = 10, hand_size: int = 5) -> None:
+        """
+        Args:
+            all_cards: The card pool. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+        """
+        self.all_cards: List[Card] = all_cards if all_cards is not None else load_cards_from_json()
+        self.game_engine = GameEngine(all_cards=self.all_cards, deck_size=deck_size, hand_size=hand_size)
+
+    def play(self, seed: int) -> GameResult:
+        """
+        Plays one game with the current agents of the engine.
+        The result is the same as for GameEngine.play_game(seed=seed) with the same agents.
+        """
+        player1_id, player2_id = self.game_engine.agents
+        game_state = GameState.initial_state(
+            player1_id=player1_id,
+            player2_id=player2_id,
+            all_cards=self.all_cards,
+            deck_size=self.game_engine.deck_size,
+            hand_size=self.game_engine.hand_size,
+            seed=self.game_engine.seed_game(seed)
+        )
+        n_actions = self.game_engine.play_until_over(game_state)
+        return GameResult(seed, game_state.winner_id, self.game_engine.win_condition(game_state),
+                          game_state.turn_count, n_actions)
+
+    def set_agents(self, agent_factories: Dict[str, Callable[[str], BaseAgent]]) -> None:
+        """
+        Makes the agents that play the following games.
+
+        Args:
+            agent_factories: For each of the two player IDs, a callable that makes its agent
+                given the player ID (e.g. {"AI1": RandomAgent, "AI2": ZeroAgent}). The first player starts.
+        """
+        if len(agent_factories) != 2:
+            raise ValueError(f"Exactly two agent factories are needed, got {len(agent_factories)}.")
+        self.game_engine.agents = {player_id: factory(player_id) for player_id, factory in agent_factories.items()}
+
+    @staticmethod
+    def game_seed(seed: int, game_index: int) -> int:
+        """
+        Returns the seed of the game with the given index in a run with the given seed.
+        It doesn't depend on the other games, so runs can be split between processes.
+        """
+        return random.Random((seed << 32) + game_index).getrandbits(63)
+
+    def iter_results(self, n_games: int, agent_factories: Dict[str, Callable[[str], BaseAgent]],
+                     seed: Optional[int] = None) -> Iterator[GameResult]:
+        """
+        Plays n_games games and yields their results one by one as they finish.
+
+        Args:
+            n_games: Number of games to play
+            agent_factories: The agent factory of each player (see set_agents)
+            seed: Seed from which the seeds of all games are derived. Random if not given.
+        """
+        self.set_agents(agent_factories)
+        if seed is None:
+            seed = random.getrandbits(63)
+        for game_index in range(n_games):
+            yield self.play(self.game_seed(seed, game_index))
+
+    def run(self, n_games: int, agent_factories: Dict[str, Callable[[str], BaseAgent]],
+            seed: Optional[int] = None) -> List[GameResult]:
+        """
+        Plays n_games games and returns their results (see iter_results).
+        """
+        return list(self.iter_results(n_games, agent_factories, seed))
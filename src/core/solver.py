@@ -0,0 +1,227 @@
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.core.game_engine import GameEngine
+from src.core.events import event_bus
+from src.models.game_state import GameState, ZONES
+from src.models.action import Action, AttackAction
+from src.models.card import Card
+from src.agents.random_agent import ZeroAgent
+from src.utils.data_loader import load_cards_from_json
+
+# Zones whose order changes the game: cards are drawn from the top of decks, and Kangasaurus Rex
+# defeats creatures in play area order. Cards in hands and discard piles are sorted in keys.
+_ORDERED_ZONES = ("deck", "play_area")
+
+def canonical_key(game_state: GameState) -> Tuple:
+    """
+    Returns a key that is the same for positions where the game goes on identically: cards are
+    referred to by ID (so copies of a card are interchangeable) and the order of hands and
+    discard piles is left out. When a Strange Barrel is in the game, its random steal depends
+    on the random generator of the game, so the seed and number of random draws are included.
+    """
+    def card_ref(card_handle: Optional[int]):
+        if card_handle is None:
+            return None
+        player_id, zone_name, position = game_state.get_card_location(card_handle)
+        if zone_name in _ORDERED_ZONES:
+            return (player_id, zone_name, position)
+        return (player_id, zone_name, game_state.get_card(card_handle).id)
+
+    players = []
+    for player_id in sorted(game_state.players):
+        player = game_state.players[player_id]
+        zones = (tuple(card.id for card in player.deck), tuple(sorted(card.id for card in player.hand)),
+                 tuple((card.id, card.is_exhausted) for card in player.play_area),
+                 tuple(sorted(card.id for card in player.discard_pile)))
+        players.append((player_id, player.life_points, player.mindbugs, zones))
+    barrel = any(card.id == "strange_barrel" for player in game_state.players.values()
+                 for zone_name in ZONES for card in getattr(player, zone_name))
+
+    valid_targets = None
+    if game_state._valid_targets is not None:
+        valid_targets = tuple(sorted(map(card_ref, game_state._valid_targets)))
+    pending = (game_state.active_player_id, game_state._pending_action,
+               card_ref(game_state._pending_mindbug_card_handle), card_ref(game_state._pending_attack_card_handle),
+               card_ref(game_state._pending_block_card_handle), game_state._frenzy_active,
+               game_state._already_hunted, game_state._switch_active_player_back, game_state._return_to_attack,
+               valid_targets, game_state._amount_of_targets, game_state.game_over, game_state.winner_id)
+    random_state = (game_state.seed, game_state._random_draws) if barrel else None
+    return (tuple(players), pending, random_state)
+
+def cards_remaining(key: Tuple) -> int:
+    """Number of cards left in the decks and hands of a position, given its canonical key."""
+    players, _, _ = key
+    return sum(len(zones[ZONES.index("deck")]) + len(zones[ZONES.index("hand")]) for _, _, _, zones in players)
+
+class Tablebase:
+    """
+    Values of solved positions, stored in an SQLite file so that they can be looked up without
+    loading them all. Positions are stored by a 128-bit digest of their canonical key, with their
+    value for the player to move: 1 if they win with perfect play, -1 if they lose.
+
+    Canonical keys don't record the size of the game (the hand size players draw back up to), so
+    the tablebase stores it too, and refuses to be used for games of another size.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Path of the SQLite file. It is created if it doesn't exist.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS positions "
+                                "(digest BLOB PRIMARY KEY, value INTEGER NOT NULL, cards INTEGER NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def check_game_size(self, deck_size: int, hand_size: int) -> None:
+        """
+        Checks that the positions of the tablebase are those of games of the given size, and raises a
+        ValueError otherwise. A tablebase without a size yet takes the given one.
+        """
+        size = {"deck_size": deck_size, "hand_size": hand_size}
+        stored = dict(self.connection.execute("SELECT name, value FROM metadata").fetchall())
+        if not stored:
+            with self.connection:
+                self.connection.executemany("INSERT INTO metadata VALUES (?, ?)", size.items())
+        elif stored != size:
+            raise ValueError(f"Tablebase {self.path} holds games with deck size {stored.get('deck_size')} and hand size "
+                             f"{stored.get('hand_size')}, not {deck_size} and {hand_size}.")
+
+    @staticmethod
+    def digest(key: Tuple) -> bytes:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+    def lookup(self, key: Tuple) -> Optional[int]:
+        """Returns the value of a position given its canonical key, or None if it is not stored."""
+        row = self.connection.execute("SELECT value FROM positions WHERE digest = ?", (self.digest(key),)).fetchone()
+        return None if row is None else row[0]
+
+    def store(self, values: Iterable[Tuple[Tuple, int]]) -> None:
+        """Stores the values of positions, given as (canonical key, value) pairs."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO positions VALUES (?, ?, ?)",
+                ((self.digest(key), value, cards_remaining(key)) for key, value in values))
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'Tablebase':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class ExactSolver:
+    """
+    Solves games whose cards are all known (e.g. the reduced games with deck_size=4, hand_size=2)
+    by searching every line of play, with memoization over canonical positions. The value of a
+    position is 1 if the player to move wins with perfect play from both sides, -1 otherwise.
+    Choices asked in the middle of an action (the order of Defeated abilities) are made as ZeroAgent
+    would. A tablebase, if given, is looked up before searching.
+    """
+    def __init__(self, all_cards: Optional[List[Card]] = None, deck_size: int = 4, hand_size: int = 2,
+                 tablebase: Optional[Tablebase] = None) -> None:
+        """
+        Args:
+            all_cards: The card pool. It is loaded from data/cards.json if not given.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            tablebase: Tablebase to look positions up in. It must hold games of the same size.
+        """
+        self.all_cards: List[Card] = all_cards if all_cards is not None else load_cards_from_json()
+        self.game_engine = GameEngine(all_cards=self.all_cards, deck_size=deck_size, hand_size=hand_size)
+        if tablebase is not None:
+            tablebase.check_game_size(deck_size, hand_size)
+        self.tablebase = tablebase
+        self.memo: Dict[Tuple, int] = {}
+        self.nodes = 0 # Number of positions searched
+        self._in_progress: Set[Tuple] = set()
+
+    def initial_state(self, seed: int, player_ids: Tuple[str, str] = ("player1", "player2")) -> GameState:
+        """Deals a game of the solver's size from a seed."""
+        return GameState.initial_state(player_ids[0], player_ids[1], self.all_cards,
+                                       deck_size=self.game_engine.deck_size, hand_size=self.game_engine.hand_size,
+                                       seed=seed)
+
+    def children(self, game_state: GameState) -> Iterator[Tuple[Action, GameState]]:
+        """Yields every valid action with the state it leads to (once the automatic steps are resolved)."""
+        if self.game_engine.agents.keys() != game_state.players.keys():
+            self.game_engine.agents = {player_id: ZeroAgent(player_id) for player_id in game_state.players}
+        actions = list(self.game_engine.iter_valid_actions(game_state))
+        # Attacks are tried first: they end games sooner, so winning lines are found with fewer positions
+        actions.sort(key=lambda action: not isinstance(action, AttackAction))
+        for action in actions:
+            child = game_state.clone()
+            self.game_engine._dispatch_action(child, action)
+            self.game_engine.resolve_automatic_steps(child)
+            yield action, child
+
+    def value(self, game_state: GameState) -> int:
+        """Returns 1 if the player to move wins with perfect play, -1 if they lose."""
+        with event_bus.muted():
+            return self._value(game_state)
+
+    def _value(self, game_state: GameState) -> int:
+        key = canonical_key(game_state)
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+        if self.tablebase is not None:
+            value = self.tablebase.lookup(key)
+            if value is not None:
+                self.memo[key] = value
+                return value
+        if key in self._in_progress:
+            raise RuntimeError("The game can loop forever from this position, so it can't be solved.")
+
+        self.nodes += 1
+        if game_state.game_over:
+            value = 1 if game_state.winner_id == game_state.active_player_id else -1
+        else:
+            self._in_progress.add(key)
+            value = -1 # A player with no valid actions loses
+            for _, child in self.children(game_state):
+                child_value = self._value(child)
+                if child.active_player_id != game_state.active_player_id:
+                    child_value = -child_value
+                if child_value == 1:
+                    value = 1
+                    break
+            self._in_progress.discard(key)
+        self.memo[key] = value
+        return value
+
+    def best_action(self, game_state: GameState) -> Tuple[Action, int]:
+        """Returns an action with the best value for the player to move, and that value."""
+        with event_bus.muted():
+            best = None
+            for action, child in self.children(game_state):
+                child_value = self._value(child)
+                if child.active_player_id != game_state.active_player_id:
+                    child_value = -child_value
+                if best is None or child_value > best[1]:
+                    best = (action, child_value)
+                if child_value == 1:
+                    break
+        if best is None:
+            raise ValueError("The player to move has no valid actions.")
+        return best
+
+    def build_tablebase(self, tablebase: Tablebase, seeds: Iterable[int], max_cards: Optional[int] = None) -> int:
+        """
+        Solves the games dealt from the given seeds and stores the positions met in the tablebase,
+        keeping only those with at most max_cards cards left in decks and hands (all if None).
+        Returns the number of positions stored.
+        """
+        tablebase.check_game_size(self.game_engine.deck_size, self.game_engine.hand_size)
+        for seed in seeds:
+            self.value(self.initial_state(seed))
+        values = [(key, value) for key, value in self.memo.items()
+                  if max_cards is None or cards_remaining(key) <= max_cards]
+        tablebase.store(values)
+        return len(values)
@@ -0,0 +1,145 @@
+import multiprocessing as mp
+import random
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.core.simulator import Simulator, GameResult
+from src.agents.base_agent import BaseAgent
+from src.utils.data_loader import load_cards_from_json
+
+# Simulator of each worker process, made once by _init_worker
+_worker_simulator: Optional[Simulator] = None
+
+def _init_worker(cards_path: Optional[str], deck_size: int, hand_size: int,
+                 agent_factories: Dict[str, Callable[[str], BaseAgent]]) -> None:
+    """Loads the card pool and makes the agents once per worker process."""
+    global _worker_simulator
+    _worker_simulator = Simulator(all_cards=load_cards_from_json(cards_path), deck_size=deck_size, hand_size=hand_size)
+    _worker_simulator.set_agents(agent_factories)
+
+def _play_chunk(chunk: Tuple[int, int, int]) -> List[GameResult]:
+    """Plays the games first_index, ..., first_index + n_games - 1 of the run with the given seed."""
+    seed, first_index, n_games = chunk
+    return [_worker_simulator.play(Simulator.game_seed(seed, game_index))
+            for game_index in range(first_index, first_index + n_games)]
+
+class TournamentStats:
+    """
+    Running totals of a tournament. Results are added one at a time and not kept,
+    so the memory used doesn't grow with the number of games.
+    """
+    def __init__(self) -> None:
+        self.n_games = 0
+        self.n_actions = 0
+        self.n_turns = 0
+        self.wins: Dict[Optional[str], int] = {}
+        self.win_conditions: Dict[str, int] = {}
+        self.elapsed = 0.0 # Seconds
+
+    def add(self, result: GameResult) -> None:
+        self.n_games += 1
+        self.n_actions += result.n_actions
+        self.n_turns += result.turn_count
+        self.wins[result.winner_id] = self.wins.get(result.winner_id, 0) + 1
+        self.win_conditions[result.win_condition] = self.win_conditions.get(result.win_condition, 0) + 1
+
+    def games_per_second(self) -> float:
+        return self.n_games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"TournamentStats(Games: {self.n_games}, Wins: {self.wins}, "
+                f"Win conditions: {self.win_conditions}, Games/s: {self.games_per_second():.0f})")
+
+class Tournament:
+    """
+    Plays many headless games between two agents on a pool of worker processes.
+
+    Every worker loads the card pool and makes its agents once, then plays chunks of games
+    with its own Simulator. Results are streamed back as chunks finish (in any order) and
+    aggregated on the fly, so the parent process never holds all the results at once.
+    Game seeds only depend on the seed of the tournament and the index of the game, so
+    the totals don't depend on the number of processes or the chunk size.
+    """
+    def __init__(self, agent_factories: Dict[str, Callable[[str], BaseAgent]], deck_size: int = 10,
+                 hand_size: int = 5, cards_path: Optional[str] = None, processes: Optional[int] = None,
+                 chunk_size: int = 100) -> None:
+        """
+        Args:
+            agent_factories: For each of the two player IDs, a callable that makes its agent given
+                the player ID (e.g. {"AI1": RandomAgent, "AI2": ZeroAgent}). It must be picklable,
+                e.g. an agent class or a module-level function. The first player starts.
+            deck_size: Number of cards in each player's deck
+            hand_size: Number of cards each player starts with in hand
+            cards_path: Path to the cards JSON file. data/cards.json if not given.
+            processes: Number of worker processes. All the CPUs if not given. With 1, games are
+                played in this process.
+            chunk_size: Number of games sent to a worker at a time
+        """
+        if len(agent_factories) != 2:
+            raise ValueError(f"Exactly two agent factories are needed, got {len(agent_factories)}.")
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}.")
+        self.agent_factories = agent_factories
+        self.deck_size = deck_size
+        self.hand_size = hand_size
+        self.cards_path = cards_path
+        self.processes = processes if processes is not None else mp.cpu_count()
+        self.chunk_size = chunk_size
+
+    def _chunks(self, n_games: int, seed: int) -> Iterator[Tuple[int, int, int]]:
+        for first_index in range(0, n_games, self.chunk_size):
+            yield (seed, first_index, min(self.chunk_size, n_games - first_index))
+
+    def iter_results(self, n_games: int, seed: Optional[int] = None) -> Iterator[GameResult]:
+        """
+        Plays n_games games and yields their results as they finish, in no particular order.
+
+        Args:
+            n_games: Number of games to play
+            seed: Seed from which the seeds of all games are derived. Random if not given.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        init_args = (self.cards_path, self.deck_size, self.hand_size, self.agent_factories)
+
+        if self.processes == 1:
+            _init_worker(*init_args)
+            for chunk in self._chunks(n_games, seed):
+                yield from _play_chunk(chunk)
+            return
+
+        with mp.Pool(self.processes, initializer=_init_worker, initargs=init_args) as pool:
+            for chunk_results in pool.imap_unordered(_play_chunk, self._chunks(n_games, seed)):
+                yield from chunk_results
+
+    def run(self, n_games: int, seed: Optional[int] = None, progress_interval: Optional[float] = None) -> TournamentStats:
+        """
+        Plays n_games games and returns their totals.
+
+        Args:
+            n_games: Number of games to play
+            seed: Seed from which the seeds of all games are derived. Random if not given.
+            progress_interval: If given, the progress and throughput are printed every
+                progress_interval seconds.
+        """
+        stats = TournamentStats()
+        start_time = time.perf_counter()
+        last_report = start_time
+        for result in self.iter_results(n_games, seed):
+            stats.add(result)
+            if progress_interval is not None:
+                now = time.perf_counter()
+                if now - last_report >= progress_interval:
+                    stats.elapsed = now - start_time
+                    self._print_progress(stats, n_games)
+                    last_report = now
+        stats.elapsed = time.perf_counter() - start_time
+        if progress_interval is not None:
+            self._print_progress(stats, n_games)
+            print(file=sys.stderr)
+        return stats
+
+    @staticmethod
+    def _print_progress(stats: TournamentStats, n_games: int) -> None:
+        print(f"\r{stats.n_games}/{n_games} games ({stats.n_games / max(n_games, 1):.0%}), "
+              f"{stats.games_per_second():.0f} games/s", end="", file=sys.stderr, flush=True)
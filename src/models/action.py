@@ -1,5 +1,4 @@
 from typing import Optional, List
-from uuid import UUID
 from src.models.card import Card
 
 class Action:
@@ -11,28 +10,28 @@ class Action:
         return f"Action(Player: {self.player_id})"
 
 class PlayCardAction(Action):
-    def __init__(self, player_id: str, card_uuid: UUID):
+    def __init__(self, player_id: str, card_handle: int):
         super().__init__(player_id)
-        self.card_uuid = card_uuid
+        self.card_handle = card_handle
 
     def __repr__(self):
-        return f"PlayCardAction(Player: {self.player_id}, Card: {self.card_uuid})"
+        return f"PlayCardAction(Player: {self.player_id}, Card: {self.card_handle})"
 
 class AttackAction(Action):
-    def __init__(self, player_id: str, attacking_card_uuid: UUID):
+    def __init__(self, player_id: str, attacking_card_handle: int):
         super().__init__(player_id)
-        self.attacking_card_uuid = attacking_card_uuid
+        self.attacking_card_handle = attacking_card_handle
 
     def __repr__(self):
-        return (f"AttackAction(Player: {self.player_id}, Card: {self.attacking_card_uuid})")
+        return (f"AttackAction(Player: {self.player_id}, Card: {self.attacking_card_handle})")
 
 class BlockAction(Action):
-    def __init__(self, player_id: str, blocking_card_uuid: Optional[UUID] = None):
+    def __init__(self, player_id: str, blocking_card_handle: Optional[int] = None):
         super().__init__(player_id)
-        self.blocking_card_uuid = blocking_card_uuid # The card blocking, None if no block
+        self.blocking_card_handle = blocking_card_handle # The card blocking, None if no block
 
     def __repr__(self):
-        return (f"BlockAction(Player: {self.player_id}, Card: {self.blocking_card_uuid})")
+        return (f"BlockAction(Player: {self.player_id}, Card: {self.blocking_card_handle})")
 
 class MindbugAction(Action):
     def __init__(self, player_id: str, use_mindbug):
@@ -43,44 +42,44 @@ class MindbugAction(Action):
         return f"MindbugAction(Player: {self.player_id}, Use Mindbug: {self.use_mindbug})"
     
 class StealAction(Action):
-    def __init__(self, player_id: str, card_uuids: List[UUID]):
+    def __init__(self, player_id: str, card_handles: List[int]):
         super().__init__(player_id)
-        self.card_uuids = card_uuids
+        self.card_handles = card_handles
 
     def __repr__(self):
-        return (f"StealAction(Player: {self.player_id}, Cards: {self.card_uuids})")
+        return (f"StealAction(Player: {self.player_id}, Cards: {self.card_handles})")
     
 class PlayFromDiscardAction(Action):
-    def __init__(self, player_id: str, card_uuid: UUID):
+    def __init__(self, player_id: str, card_handle: int):
         super().__init__(player_id)
-        self.card_uuid = card_uuid
+        self.card_handle = card_handle
 
     def __repr__(self):
-        return (f"PlayFromDiscardAction(Player: {self.player_id}, Card: {self.card_uuid})")
+        return (f"PlayFromDiscardAction(Player: {self.player_id}, Card: {self.card_handle})")
     
 class DiscardAction(Action):
-    def __init__(self, player_id: str, card_uuids: List[UUID]):
+    def __init__(self, player_id: str, card_handles: List[int]):
         super().__init__(player_id)
-        self.card_uuids = card_uuids
+        self.card_handles = card_handles
 
     def __repr__(self):
-        return (f"DiscardAction(Player: {self.player_id}, Cards: {self.card_uuids})")
+        return (f"DiscardAction(Player: {self.player_id}, Cards: {self.card_handles})")
     
 class DefeatAction(Action):
-    def __init__(self, player_id: str, card_uuids: List[UUID]):
+    def __init__(self, player_id: str, card_handles: List[int]):
         super().__init__(player_id)
-        self.card_uuids = card_uuids
+        self.card_handles = card_handles
 
     def __repr__(self):
-        return (f"DefeatAction(Player: {self.player_id}, Cards: {self.card_uuids})")
+        return (f"DefeatAction(Player: {self.player_id}, Cards: {self.card_handles})")
     
 class HuntAction(Action):
-    def __init__(self, player_id: str, card_uuid: Optional[UUID]):
+    def __init__(self, player_id: str, card_handle: Optional[int]):
         super().__init__(player_id)
-        self.card_uuid = card_uuid
+        self.card_handle = card_handle
 
     def __repr__(self):
-        return (f"HuntAction(Player: {self.player_id}, Card: {self.card_uuid})")
+        return (f"HuntAction(Player: {self.player_id}, Card: {self.card_handle})")
     
 class FrenzyAction(Action):
     def __init__(self, player_id: str, go_again: bool):
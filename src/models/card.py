@@ -1,96 +1,202 @@
-from typing import List, Dict, Any, Optional, TYPE_CHECKING
-from uuid import UUID, uuid4
-import copy
-if TYPE_CHECKING:
-    from src.models.player import Player
+from enum import IntFlag
+from typing import Tuple, Dict, Any, List, Optional
 
-class Card:
-    def __init__(self, id:str, name: str, 
-                 power: int, keywords: List[str],
-                 ability_type: str, ability_text: str,
-                 is_exhausted: bool = False, controller: Optional['Player'] = None) -> None:
+class Keyword(IntFlag):
+    """
+    Card keywords as bits of an integer mask, so that checking or combining
+    keywords are single integer operations.
+    """
+    NONE = 0
+    POISONOUS = 1
+    TOUGH = 2
+    SNEAKY = 4
+    HUNTER = 8
+    FRENZY = 16
+
+    @classmethod
+    def from_names(cls, names: Tuple[str, ...] | List[str]) -> 'Keyword':
+        """
+        Builds a keyword mask from keyword names, as written in cards.json (e.g., "Poisonous").
+        """
+        mask = cls.NONE
+        for name in names:
+            if name.upper() not in cls.__members__:
+                raise ValueError(f"Unknown keyword '{name}'.")
+            mask |= cls[name.upper()]
+        return mask
+
+    def names(self) -> List[str]:
+        """Returns the names of the keywords in the mask, for display and logs."""
+        return [keyword.name.capitalize() for keyword in Keyword if keyword & self]
+
+class CardDefinition:
+    """
+    Immutable data of a card, as found in cards.json.
+    Definitions are interned: every copy of the same card shares a single CardDefinition.
+    """
+    __slots__ = ('id', 'name', 'power', 'keywords', 'ability_type', 'ability_text', 'keyword_mask')
+
+    _interned: Dict[tuple, 'CardDefinition'] = {}
+
+    def __new__(cls, id: str, name: str, power: int, keywords: Tuple[str, ...],
+                ability_type: str, ability_text: str) -> 'CardDefinition':
         """
-        Initialize a Card object with data from cards.json
-        
+        Returns the CardDefinition with the given data, creating it only the first time it is requested.
+
         Args:
-            uuid: Code-appropiate identifier for the card
+            id: Code-appropiate identifier for the card
             name: Name of the card
             power: Power value for creatures
-            keywords: List of card keywords (e.g., poisonous, tough)
+            keywords: Card keywords (e.g., poisonous, tough)
             ability_type: Type of ability (e.g., attack, passive)
             ability_text: Text description of the card
         """
-        self.uuid: UUID = uuid4()  # Generate a unique ID for the card
-        self.id: str = id
-        self.name: str = name
-        self.power: int = power
-        self.keywords: List[str] = keywords or []
-        self.ability_type: str = ability_type
-        self.ability_text: str = ability_text
-        self.is_exhausted: bool = is_exhausted
-        self.controller: Optional[Player] = controller
-    
+        key = (id, name, power, tuple(keywords or ()), ability_type, ability_text)
+        definition = cls._interned.get(key)
+        if definition is None:
+            definition = super().__new__(cls)
+            for attribute, value in zip(cls.__slots__, key):
+                object.__setattr__(definition, attribute, value)
+            object.__setattr__(definition, 'keyword_mask', Keyword.from_names(key[3]))
+            cls._interned[key] = definition
+        return definition
+
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Card':
+    def from_dict(cls, data: Dict[str, Any]) -> 'CardDefinition':
         """
-        Create a Card instance from a dictionary (typically from JSON)
-        
+        Get the CardDefinition described by a dictionary (typically from JSON)
+
         Args:
             data: Dictionary containing card data
-            
+
         Returns:
-            Card: A new Card instance
+            CardDefinition: The interned definition of the card
         """
         return cls(
             id = data.get('id', ''),
             name = data.get('name', ''),
             power = data.get('base_power', -1),
-            keywords = data.get('keywords', []),
+            keywords = tuple(data.get('keywords', [])),
             ability_type = data.get('ability_type', ''),
             ability_text = data.get('ability_text', '')
         )
-    
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CardDefinition objects are immutable.")
+
+    def __reduce__(self):
+        # Unpickling goes through __new__, so definitions stay interned in worker processes
+        return (CardDefinition, (self.id, self.name, self.power, self.keywords, self.ability_type, self.ability_text))
+
+    def __repr__(self) -> str:
+        return f"CardDefinition(ID: {self.id})"
+
+class Card:
+    """
+    A physical copy of a card in a game. It only holds the state that can change
+    during the game; everything else is read from its shared CardDefinition.
+    Within a game, cards are identified by their handle: a small integer which is
+    their index in the card pool the game was dealt from.
+    """
+    __slots__ = ('definition', 'handle', 'is_exhausted', 'controller_id')
+
+    def __init__(self, definition: CardDefinition, handle: int,
+                 is_exhausted: bool = False, controller_id: Optional[str] = None) -> None:
+        """
+        Initialize a Card object from its definition
+
+        Args:
+            definition: The shared data of the card
+            handle: Identifier of the card within a game (its index in the card pool)
+            is_exhausted: Whether the card is exhausted
+            controller_id: The ID of the player controlling the card
+        """
+        self.definition: CardDefinition = definition
+        self.handle: int = handle
+        self.is_exhausted: bool = is_exhausted
+        self.controller_id: Optional[str] = controller_id
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], handle: int) -> 'Card':
+        """
+        Create a Card instance from a dictionary (typically from JSON)
+
+        Args:
+            data: Dictionary containing card data
+            handle: Identifier of the card within a game
+
+        Returns:
+            Card: A new Card instance
+        """
+        return cls(CardDefinition.from_dict(data), handle)
+
+    @property
+    def id(self) -> str:
+        return self.definition.id
+
+    @property
+    def name(self) -> str:
+        return self.definition.name
+
+    @property
+    def power(self) -> int:
+        return self.definition.power
+
+    @property
+    def keywords(self) -> Tuple[str, ...]:
+        return self.definition.keywords
+
+    @property
+    def keyword_mask(self) -> Keyword:
+        return self.definition.keyword_mask
+
+    @property
+    def ability_type(self) -> str:
+        return self.definition.ability_type
+
+    @property
+    def ability_text(self) -> str:
+        return self.definition.ability_text
+
     def __repr__(self) -> str:
         """
         String representation of the Card for easy printing
-        
+
         Returns:
             str: A formatted string with card information
         """
-        return f"Card(ID: {self.id}, UUID: {self.uuid}, Controller: {self.controller.id if self.controller else 'None'}"
-    
+        return f"Card(ID: {self.id}, Handle: {self.handle}, Controller: {self.controller_id if self.controller_id else 'None'}"
+
     def __str__(self) -> str:
         """
         String representation of the Card for easy printing
-        
+
         Returns:
             str: A formatted string with card information
         """
         text = (
             f"Card Details:\n"
             f"----------------\n"
-            f"| Name: {self.name}\n" 
+            f"| Name: {self.name}\n"
             f"| ID: {self.id}\n"
-            f"| UUID: {self.uuid}\n"
+            f"| Handle: {self.handle}\n"
             f"| Power: {self.power}\n"
             f"| Keywords: {', '.join(self.keywords) if self.keywords else 'None'}\n"
             f"| Abilities: {self.ability_text if self.ability_text else 'None'}"
         )
         return text
-    
-    # def __deepcopy__(self) -> 'Card':
-    #     """
-    #     Create a deep copy of the card.
-    #     Returns:
-    #         Card: A new Card object with the same attributes
-    #     """
-    #     return Card(
-    #         card_id=self.id,
-    #         name=self.name,
-    #         power=self.power,
-    #         keywords=copy.deepcopy(self.keywords),
-    #         ability_type=self.ability_type,
-    #         ability_text=self.ability_text,
-    #         is_exhausted=self.is_exhausted,
-    #         controller=self.controller
-    #     )
\ No newline at end of file
+
+    def copy(self) -> 'Card':
+        """
+        Create a per-game copy of the card, with the same handle and state.
+        The CardDefinition is shared with the original.
+
+        Returns:
+            Card: A new Card object with the same attributes
+        """
+        new_card = Card.__new__(Card)
+        new_card.definition = self.definition
+        new_card.handle = self.handle
+        new_card.is_exhausted = self.is_exhausted
+        new_card.controller_id = self.controller_id
+        return new_card
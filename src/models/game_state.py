@@ -1,8 +1,43 @@
+import hashlib
 import random
-from uuid import UUID
+from functools import lru_cache
+from uuid import UUID, uuid4, uuid5
 from typing import Dict, List, Optional, Tuple
 from src.models.player import Player
-from src.models.card import Card
+from src.models.card import Card, Keyword
+from src.core.events import event_bus, DeckEmpty
+
+class UndoRecord:
+    """
+    Everything needed to revert a GameState to how it was before an action was applied in place.
+    It stores the GameState's own fields as they were, plus a log of the changes made to
+    players and cards (zone moves, deck orders, life points, mindbugs and exhaustion), which are undone in reverse order.
+    """
+    def __init__(self, state_fields: Dict):
+        self.state_fields: Dict = state_fields
+        self.changes: List[Tuple] = []
+
+# Names of the zones of a Player, which are lists of cards
+ZONES = ("deck", "hand", "play_area", "discard_pile")
+
+# Values of GameState._pending_action outside of abilities with targets. The first five need a decision
+# of the active player, the others are resolved automatically (see GameEngine.resolve_automatic_steps).
+PHASES = ("play_or_attack", "mindbug", "block", "hunt", "frenzy",
+          "continue_attack", "resolve_attack", "frenzy_attack", "finish_action")
+DECISION_PHASES = PHASES[:5]
+
+@lru_cache(maxsize=None)
+def _zobrist_feature(*feature) -> int:
+    """
+    Random-looking 64-bit key of a feature of a position (e.g. a card in a zone, or the life
+    points of a player). Keys are derived from the feature itself, so they are the same in
+    every process and every run, and hashes can be stored on disk.
+    """
+    return int.from_bytes(hashlib.blake2b(repr(feature).encode(), digest_size=8).digest(), "little")
+
+# The keys of the features are summed modulo 2**64 rather than XORed, so that two copies of a card in
+# the same zone (which have the same key) don't cancel each other out
+_ZOBRIST_MASK = (1 << 64) - 1
 
 class GameState:
     def __init__(
@@ -10,27 +45,48 @@ class GameState:
             active_player_id: str,
             inactive_player_id: str,
             players: Dict[str, Player],
-            turn_count: int
+            turn_count: int,
+            seed: Optional[int] = None
         ):
         """
         Initializes a new GameState object.
+        All the randomness of the game comes from its seed (see random_sample), so that games
+        can be replayed exactly. If no seed is given, one is drawn from the random module.
         """
         self.active_player_id: str = active_player_id
         self.inactive_player_id: str = inactive_player_id
         self.players: Dict[str, Player] = players
         self.turn_count: int = turn_count
+        self.seed: int = seed if seed is not None else random.getrandbits(64)
+        self._random_draws: int = 0 # Number of random choices made so far during the game
         self.game_over: bool = False
         self.winner_id: Optional[str] = None
         self._pending_action: str = "play_or_attack"
-        self._pending_mindbug_card_uuid: Optional[UUID] = None
-        self._pending_attack_card_uuid: Optional[UUID] = None
-        self._pending_block_card_uuid: Optional[UUID] = None
+        self._pending_mindbug_card_handle: Optional[int] = None
+        self._pending_attack_card_handle: Optional[int] = None
+        self._pending_block_card_handle: Optional[int] = None
         self._frenzy_active: bool = False
-        self._valid_targets: Optional[List[UUID]] = None
+        self._valid_targets: Optional[List[int]] = None
         self._amount_of_targets: Optional[int | Tuple[int, int]] = None
         self._switch_active_player_back: bool = False
         self._already_hunted: bool = False
         self._return_to_attack: bool = False
+        self._undo_log: Optional[List[Tuple]] = None # Change log of the UndoRecord being recorded, if any
+        self._game_uuid: Optional[UUID] = None # Only generated if card UUIDs are requested
+        # Index of every card in the game by handle, and of where it is: (player ID, zone, position)
+        self._cards: Dict[int, Card] = {}
+        self._card_locations: Dict[int, Tuple[str, str, int]] = {}
+        for player in players.values():
+            for zone in ZONES:
+                for position, card in enumerate(getattr(player, zone)):
+                    self._cards[card.handle] = card
+                    self._card_locations[card.handle] = (player.id, zone, position)
+        # Effective power and keywords of cards, once computed with the passive abilities in play.
+        # They are discarded whenever something they depend on changes (see _invalidate_passive_layer).
+        self._effective_power_cache: Dict[int, int] = {}
+        self._effective_keywords_cache: Dict[int, Keyword] = {}
+        # Zobrist hash of the cards and counters, updated by every change (see zobrist_key)
+        self._zobrist: int = self._compute_zobrist()
 
     @classmethod
     def initial_state(cls,
@@ -40,7 +96,8 @@ class GameState:
                       deck_size: int = 10, # Standard deck size
                       hand_size: int = 5, # Standard hand size
                       p1_forced_cards: List[Card] = [],
-                      p2_forced_cards: List[Card] = []
+                      p2_forced_cards: List[Card] = [],
+                      seed: Optional[int] = None
                       ):
         """
         Sets up the initial state for a new Mindbug game.
@@ -53,6 +110,7 @@ class GameState:
             hand_size: The number of cards each player draws at the start.
             p1_forced_cards: A list of Card objects that will forcefully be added to Player 1's deck.
             p2_forced_cards: A list of Card objects that will forcefully be added to Player 2's deck.
+            seed: Seed of the random number generator of the game. The same seed always gives the same game.
 
         Returns:
             A new GameState object representing the beginning of the game.
@@ -60,8 +118,12 @@ class GameState:
         # Create a list of cards that are not in forced_cards
         other_cards = [card for card in all_cards if (card not in p1_forced_cards and card not in p2_forced_cards)]
 
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = random.Random(seed)
+
         # Shuffle the common deck of cards
-        random.shuffle(other_cards)
+        rng.shuffle(other_cards)
 
         # Distribute creature cards to decks
         if len(all_cards) < deck_size * 2:
@@ -69,6 +131,9 @@ class GameState:
 
         p1_deck_list = p1_forced_cards + other_cards[0:deck_size-len(p1_forced_cards)]
         p2_deck_list = p2_forced_cards + other_cards[deck_size-len(p1_forced_cards):2*deck_size-len(p2_forced_cards)]
+        # Each game gets its own card instances, so that the shared card pool is never modified
+        p1_deck_list = [card.copy() for card in p1_deck_list]
+        p2_deck_list = [card.copy() for card in p2_deck_list]
 
         # Create Player objects
         player1 = Player(
@@ -92,12 +157,287 @@ class GameState:
         active_player_id = player1_id
         inactive_player_id = player2_id
 
-        return cls(
+        game_state = cls(
             active_player_id=active_player_id,
             inactive_player_id=inactive_player_id,
             players=players,
-            turn_count=1
+            turn_count=1,
+            seed=seed
         )
+        # Card UUIDs in the logs are derived from the seed too
+        game_state._game_uuid = UUID(int=rng.getrandbits(128), version=4)
+        return game_state
+
+    def clone(self) -> 'GameState':
+        """
+        Returns an independent copy of this GameState.
+        Only the mutable per-game data (zones, counters, card state and pending
+        fields) is copied; immutable card definitions are shared, which makes
+        this much cheaper than copy.deepcopy.
+        """
+        new_state = GameState.__new__(GameState)
+        new_state.__dict__.update(self.__dict__)
+        new_state._cards = {handle: card.copy() for handle, card in self._cards.items()}
+        new_state._card_locations = dict(self._card_locations)
+        new_state._effective_power_cache = dict(self._effective_power_cache)
+        new_state._effective_keywords_cache = dict(self._effective_keywords_cache)
+        new_state.players = {player_id: player.clone(new_state._cards) for player_id, player in self.players.items()}
+        if self._valid_targets is not None:
+            new_state._valid_targets = list(self._valid_targets)
+        new_state._undo_log = None
+        return new_state
+
+    def get_card(self, card_handle: int) -> Card:
+        """Returns the card with the given handle, wherever it is."""
+        card = self._cards.get(card_handle)
+        if card is None:
+            raise ValueError(f"Card with handle {card_handle} not found in game state.")
+        return card
+
+    def get_card_location(self, card_handle: int) -> Tuple[str, str, int]:
+        """
+        Returns where the card with the given handle is, as a tuple
+        (ID of the player whose zone it is in, zone name, position in the zone).
+        """
+        location = self._card_locations.get(card_handle)
+        if location is None:
+            raise ValueError(f"Card with handle {card_handle} not found in game state.")
+        return location
+
+    def is_in_zone(self, card_handle: int, player_id: str, zone: str) -> bool:
+        """Checks if a card is in the given zone of the given player."""
+        location = self._card_locations.get(card_handle)
+        return location is not None and location[0] == player_id and location[1] == zone
+
+    def get_card_uuid(self, card_handle: int) -> UUID:
+        """
+        Returns a UUID for a card of this game, for logs and serialization.
+        Inside the game cards are identified by their integer handle, so UUIDs
+        are only generated when requested, derived from a per-game UUID.
+        """
+        if self._game_uuid is None:
+            self._game_uuid = uuid4()
+        return uuid5(self._game_uuid, str(card_handle))
+
+    # --- Zobrist hashing ---
+
+    def zobrist_key(self) -> int:
+        """
+        Returns a 64-bit hash of the position, for transposition tables and caches.
+        It covers the cards in every zone, exhausted cards, life points, mindbugs, the active player
+        and the pending action with its cards and targets. Cards are hashed by ID, so positions that
+        only differ by which copy of a card is where (e.g. the two Axolotl Healers) get the same key.
+        The order of the cards in hands, play areas and discard piles is left out; the order of decks isn't.
+
+        The part for cards and counters is kept up to date by every change made through GameState,
+        so this is O(1) (plus the number of valid targets).
+        """
+        def card_key(card_handle: Optional[int]) -> Optional[Tuple[str, str, str]]:
+            if card_handle is None:
+                return None
+            player_id, zone_name, _ = self._card_locations[card_handle]
+            return (self._cards[card_handle].id, player_id, zone_name)
+
+        valid_targets = None if self._valid_targets is None else tuple(sorted(map(card_key, self._valid_targets)))
+        return self._zobrist ^ _zobrist_feature(
+            "pending", self.active_player_id, self._pending_action, card_key(self._pending_mindbug_card_handle),
+            card_key(self._pending_attack_card_handle), card_key(self._pending_block_card_handle),
+            self._frenzy_active, self._already_hunted, self._switch_active_player_back, self._return_to_attack,
+            valid_targets, self._amount_of_targets, self.game_over, self.winner_id)
+
+    @staticmethod
+    def _card_zobrist(card: Card, player_id: str, zone_name: str, position: int, zone_size: int) -> int:
+        """
+        Key of a card at a position of a zone. Decks are hashed by position from the bottom,
+        which doesn't change when the top card is drawn; other zones are hashed without order.
+        """
+        slot = zone_size - 1 - position if zone_name == "deck" else 0
+        return _zobrist_feature("card", card.id, player_id, zone_name, slot, card.is_exhausted)
+
+    def _compute_zobrist(self) -> int:
+        """Computes the hash of the cards and counters from scratch."""
+        key = 0
+        for player in self.players.values():
+            key += _zobrist_feature("life", player.id, player.life_points)
+            key += _zobrist_feature("mindbugs", player.id, player.mindbugs)
+            for zone_name in ZONES:
+                zone = getattr(player, zone_name)
+                for position, card in enumerate(zone):
+                    key += self._card_zobrist(card, player.id, zone_name, position, len(zone))
+        return key & _ZOBRIST_MASK
+
+    def _replace_zobrist(self, old_feature_key: int, new_feature_key: int) -> None:
+        """Replaces the key of a feature of the position by another in the hash (either can be 0)."""
+        self._zobrist = (self._zobrist - old_feature_key + new_feature_key) & _ZOBRIST_MASK
+
+    def _shift_deck_zobrist(self, deck: List[Card], player_id: str, end: int, old_size: int) -> None:
+        """Updates the keys of the deck cards above position end, whose position from the bottom changed."""
+        for position in range(end):
+            card = deck[position]
+            self._replace_zobrist(self._card_zobrist(card, player_id, "deck", position, old_size),
+                                  self._card_zobrist(card, player_id, "deck", position, len(deck)))
+
+    # --- Recorded changes (used to undo actions applied in place) ---
+
+    def start_undo_record(self) -> UndoRecord:
+        """
+        Starts recording the changes made to this GameState and returns the UndoRecord
+        where they are stored. Only the methods in this section are recorded, so every
+        change to players and cards during an action must go through them.
+        """
+        if self._undo_log is not None:
+            raise ValueError("An UndoRecord is already being recorded for this GameState.")
+        record = UndoRecord(dict(self.__dict__))
+        self._undo_log = record.changes
+        return record
+
+    def stop_undo_record(self) -> None:
+        """Stops recording changes to this GameState."""
+        self._undo_log = None
+
+    def undo(self, record: UndoRecord) -> None:
+        """
+        Reverts all the changes stored in an UndoRecord. Records must be undone in
+        the reverse order in which they were created.
+        """
+        for change in reversed(record.changes):
+            if change[0] == "move":
+                _, card, from_player_id, from_zone, from_position = change
+                self._remove_from_zone(card)
+                self._insert_in_zone(card, from_player_id, from_zone, from_position)
+            elif change[0] == "deck_order":
+                _, player, deck = change
+                player.deck[:] = deck
+                for position, card in enumerate(deck):
+                    self._card_locations[card.handle] = (player.id, "deck", position)
+            else:
+                _, obj, attribute, previous_value = change
+                setattr(obj, attribute, previous_value)
+        self.__dict__.update(record.state_fields)
+
+    def _set_attribute(self, obj: Player | Card, attribute: str, value) -> None:
+        """Sets an attribute of a player or card, recording its previous value."""
+        if self._undo_log is not None:
+            self._undo_log.append(("attr", obj, attribute, getattr(obj, attribute)))
+        setattr(obj, attribute, value)
+
+    def move_card(self, card: Card, to_player: Player, to_zone: str) -> None:
+        """
+        Moves a card from wherever it is to the end of one of the zones of a player
+        ("deck", "hand", "play_area" or "discard_pile"), who becomes its controller.
+        """
+        from_player_id, from_zone, from_position = self._remove_from_zone(card)
+        self._insert_in_zone(card, to_player.id, to_zone, None)
+        if self._undo_log is not None:
+            self._undo_log.append(("move", card, from_player_id, from_zone, from_position))
+
+    def _remove_from_zone(self, card: Card) -> Tuple[str, str, int]:
+        """Takes a card out of its zone, keeping the location index up to date. Returns where it was."""
+        location = self._card_locations.get(card.handle)
+        if location is None or self._cards[card.handle] is not card:
+            raise ValueError(f"Card {card.name} not found in game state. Cannot move it.")
+        player_id, zone_name, position = location
+        zone = getattr(self.players[player_id], zone_name)
+        self._replace_zobrist(self._card_zobrist(card, player_id, zone_name, position, len(zone)), 0)
+        del zone[position]
+        if zone_name == "deck":
+            self._shift_deck_zobrist(zone, player_id, position, len(zone) + 1)
+        if zone_name == "play_area":
+            self._invalidate_passive_layer()
+        for shifted_position in range(position, len(zone)):
+            self._card_locations[zone[shifted_position].handle] = (player_id, zone_name, shifted_position)
+        return location
+
+    def _insert_in_zone(self, card: Card, player_id: str, zone_name: str, position: Optional[int]) -> None:
+        """
+        Puts a card in a zone (at the end if no position is given), keeping the location index
+        up to date. The owner of the zone becomes the controller of the card.
+        """
+        if zone_name == "play_area" or card.controller_id != player_id:
+            self._invalidate_passive_layer()
+        zone = getattr(self.players[player_id], zone_name)
+        if position is None:
+            zone.append(card)
+            self._card_locations[card.handle] = (player_id, zone_name, len(zone) - 1)
+        else:
+            zone.insert(position, card)
+            for shifted_position in range(position, len(zone)):
+                self._card_locations[zone[shifted_position].handle] = (player_id, zone_name, shifted_position)
+        card.controller_id = player_id
+        position = self._card_locations[card.handle][2]
+        self._replace_zobrist(0, self._card_zobrist(card, player_id, zone_name, position, len(zone)))
+        if zone_name == "deck":
+            self._shift_deck_zobrist(zone, player_id, position, len(zone) - 1)
+
+    def draw_card(self, player: Player) -> Optional[Card]:
+        """Draws the top card of a player's deck into their hand."""
+        if not player.deck:
+            if event_bus.active:
+                event_bus.publish(DeckEmpty(player.id))
+            return None
+        card = player.deck[0]
+        self.move_card(card, player, "hand")
+        return card
+
+    def put_on_top_of_deck(self, player: Player, cards: List[Card]) -> None:
+        """
+        Reorders a player's deck so that the given cards of it are on top, in the given order,
+        e.g. for a search to choose the outcome of the next draws.
+        """
+        deck = player.deck
+        if self._undo_log is not None:
+            self._undo_log.append(("deck_order", player, list(deck)))
+        for position, card in enumerate(deck):
+            self._replace_zobrist(self._card_zobrist(card, player.id, "deck", position, len(deck)), 0)
+        on_top = {card.handle for card in cards}
+        deck[:] = [self._cards[card.handle] for card in cards] + [card for card in deck if card.handle not in on_top]
+        for position, card in enumerate(deck):
+            self._card_locations[card.handle] = (player.id, "deck", position)
+            self._replace_zobrist(0, self._card_zobrist(card, player.id, "deck", position, len(deck)))
+
+    def random_sample(self, population: List, k: int) -> List:
+        """
+        Chooses k different elements at random. Each random choice of a game uses its own
+        generator, seeded from the seed of the game and the number of choices made before,
+        so the whole random state is two integers: copying and undoing it is free.
+        """
+        rng = random.Random((self.seed << 32) + self._random_draws)
+        self._random_draws += 1
+        return rng.sample(population, k)
+
+    def set_life_points(self, player: Player, life_points: int) -> None:
+        """Sets the life points of a player."""
+        self._replace_zobrist(_zobrist_feature("life", player.id, player.life_points),
+                              _zobrist_feature("life", player.id, life_points))
+        self._set_attribute(player, "life_points", life_points)
+
+    def use_mindbug(self, player: Player) -> bool:
+        """Spends one of the player's mindbugs. Returns False if they have none left."""
+        if player.mindbugs > 0:
+            self._replace_zobrist(_zobrist_feature("mindbugs", player.id, player.mindbugs),
+                                  _zobrist_feature("mindbugs", player.id, player.mindbugs - 1))
+            self._set_attribute(player, "mindbugs", player.mindbugs - 1)
+            return True
+        return False
+
+    def set_exhausted(self, card: Card, is_exhausted: bool) -> None:
+        """Exhausts or readies a card."""
+        if card.is_exhausted != is_exhausted:
+            player_id, zone_name, position = self._card_locations[card.handle]
+            zone_size = len(getattr(self.players[player_id], zone_name))
+            old_key = self._card_zobrist(card, player_id, zone_name, position, zone_size)
+            self._set_attribute(card, "is_exhausted", is_exhausted)
+            self._replace_zobrist(old_key, self._card_zobrist(card, player_id, zone_name, position, zone_size))
+            self._invalidate_passive_layer()
+
+    def _invalidate_passive_layer(self) -> None:
+        """
+        Discards the cached effective power and keywords of all cards.
+        The caches are replaced instead of cleared, because an UndoRecord may hold on to
+        the previous ones and restore them when the change is undone.
+        """
+        self._effective_power_cache = {}
+        self._effective_keywords_cache = {}
 
     def get_player(self, player_id: str) -> Player:
         """Helper to get a Player object by ID."""
@@ -133,6 +473,8 @@ class GameState:
     def switch_active_player(self):
         """Switches the active and inactive players."""
         self.active_player_id, self.inactive_player_id = self.inactive_player_id, self.active_player_id
+        # Some passive abilities only apply during their controller's turn
+        self._invalidate_passive_layer()
 
     def is_game_over(self) -> bool:
         """Checks if the game has ended."""
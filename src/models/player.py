@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from src.models.card import Card
+from src.core.events import event_bus, DeckEmpty
 import copy
 
 class Player:
@@ -17,22 +18,23 @@ class Player:
         self.id: str = id
         self.deck: List[Card] = deck if deck is not None else []
         for card in self.deck:
-            card.controller = self
+            card.controller_id = self.id
         self.hand: List[Card] = hand if hand is not None else []
         for card in self.hand:
-            card.controller = self
+            card.controller_id = self.id
         self.discard_pile: List[Card] = discard_pile if discard_pile is not None else []
         for card in self.discard_pile:
-            card.controller = self
+            card.controller_id = self.id
         self.play_area: List[Card] = play_area if play_area is not None else []
         for card in self.play_area:
-            card.controller = self
+            card.controller_id = self.id
         self.life_points: int = life_points
         self.mindbugs: int = mindbugs
     
     def draw_card(self) -> Card | None:
         """
-        Draw card from the top of the deck.
+        Draw card from the top of the deck. Only meant for dealing a new game: during a game,
+        cards are moved by the GameState (draw_card, move_card), which keeps its bookkeeping up to date.
             
         Returns:
             List: Cards that were drawn
@@ -42,90 +44,35 @@ class Player:
             self.hand.append(card)
             return card
         else:
-            print("No cards left in the deck to draw.")
+            if event_bus.active:
+                event_bus.publish(DeckEmpty(self.id))
             return None
         
     
-    def discard_card(self, card: Card) -> bool:
+    def clone(self, cards: Optional[Dict[int, Card]] = None) -> 'Player':
         """
-        Discard a card from hand to discard pile.
-        
-        Args:
-            card: The card to discard
-            
-        Returns:
-            bool: True if successful, False if card not in hand
-        """
-        if card in self.hand:
-            self.hand.remove(card)
-            self.discard_pile.append(card)
-            self.draw_card()
-            return True
-        return False
-    
-    def add_to_hand(self, card: Card) -> None:
-        """
-        Add a card to the player's hand.
-        
-        Args:
-            card: The card to add
-        """
-        self.hand.append(card)
-    
-    # def lose_life(self, amount: int = 1) -> int:
-    #     """
-    #     Player loses life points.
-        
-    #     Args:
-    #         amount: Amount of life to lose
-            
-    #     Returns:
-    #         int: Current life points after loss
-    #     """
-    #     self.life_points = max(0, self.life_points - amount)
-    #     return self.life_points
-    
-    def gain_life(self, amount: int = 1) -> int:
-        """
-        Player gains life points.
-        
-        Args:
-            amount: Amount of life to gain
-            
-        Returns:
-            int: Current life points after gain
-        """
-        self.life_points += amount
-        return self.life_points
-    
-    def use_mindbug(self) -> bool:
-        """
-        Use a mindbug ability.
-        
-        Returns:
-            bool: True if a mindbug was used, False if none remaining
-        """
-        if self.mindbugs > 0:
-            self.mindbugs -= 1
-            return True
-        return False
-    
-    def play_card(self, card: Card) -> bool:
-        """
-        Play a card from hand to play area.
-        
+        Create a copy of the player with its own zones and card instances.
+        Card data that never changes during a game is shared with the original.
+
         Args:
-            card: The card to play
-            
+            cards: Already copied cards to use, indexed by handle. Cards are copied if not given.
+
         Returns:
-            bool: True if successful, False if card not in hand
+            Player: A new Player object with the same attributes
         """
-        if card in self.hand:
-            self.hand.remove(card)
-            self.play_area.append(card)
-            return True
-        return False
-    
+        new_player = Player.__new__(Player)
+        new_player.id = self.id
+        new_player.life_points = self.life_points
+        new_player.mindbugs = self.mindbugs
+        if cards is None:
+            cards = {card.handle: card.copy()
+                     for zone in (self.deck, self.hand, self.discard_pile, self.play_area) for card in zone}
+        new_player.deck = [cards[card.handle] for card in self.deck]
+        new_player.hand = [cards[card.handle] for card in self.hand]
+        new_player.discard_pile = [cards[card.handle] for card in self.discard_pile]
+        new_player.play_area = [cards[card.handle] for card in self.play_area]
+        return new_player
+
     def __str__(self) -> str:
         return f"Player {self.id}: {len(self.hand)} cards in hand, {self.life_points} life, {self.mindbugs} mindbugs"
     
@@ -2,7 +2,6 @@
 from src.models.game_state import GameState
 from src.models.action import *
 from src.models.card import Card
-from uuid import UUID
 from typing import List, Dict
 import src.core.game_rules as GameRules
 import os
@@ -10,21 +9,21 @@ import os
 class MindbugCLI:
     width = 140  # Width of the display area
 
-    def get_effective_keyword_initials(self, game_state, card_uuid: UUID) -> str:
+    def get_effective_keyword_initials(self, game_state, card_handle: int) -> str:
         """
         Returns a string of keyword initials for the given card.
         """
-        keywords = GameRules.get_effective_keywords(game_state, card_uuid)
+        keywords = GameRules.get_effective_keywords(game_state, card_handle).names()
         if not keywords:
             return "None"
         initials = [keyword[0].upper() for keyword in keywords]
         return ",".join(initials)
     
-    def get_string_effective_keywords(self, game_state, card_uuid: UUID) -> str:
+    def get_string_effective_keywords(self, game_state, card_handle: int) -> str:
         """
         Returns a string of effective keywords for the given card.
         """
-        keywords = GameRules.get_effective_keywords(game_state, card_uuid)
+        keywords = GameRules.get_effective_keywords(game_state, card_handle).names()
         if not keywords:
             return "None"
         return ", ".join(keywords)
@@ -80,8 +79,8 @@ class MindbugCLI:
         if active_player.play_area:
             for i, card in enumerate(active_player.play_area):
                 exhausted = "⚠ EXHAUSTED " if card.is_exhausted else ""
-                eff_power = GameRules.get_effective_power(game_state, card.uuid)
-                eff_keywords = self.get_string_effective_keywords(game_state, card.uuid)
+                eff_power = GameRules.get_effective_power(game_state, card.handle)
+                eff_keywords = self.get_string_effective_keywords(game_state, card.handle)
                 power_and_keywords = f"(P:{eff_power:2d}, K: {eff_keywords})"
                 card_str = f"  {i+1}. {card.name:<25} {power_and_keywords:<20} {exhausted}{card.ability_text}"
                 print(f"|{card_str}{' '*(self.width - 2 - len(card_str))}│")
@@ -105,8 +104,8 @@ class MindbugCLI:
         if inactive_player.play_area:
             for i, card in enumerate(inactive_player.play_area):
                 exhausted = "⚠ EXHAUSTED" if card.is_exhausted else ""
-                eff_power = GameRules.get_effective_power(game_state, card.uuid)
-                eff_keywords = self.get_string_effective_keywords(game_state, card.uuid)
+                eff_power = GameRules.get_effective_power(game_state, card.handle)
+                eff_keywords = self.get_string_effective_keywords(game_state, card.handle)
                 power_and_keywords = f"(P:{eff_power:2d}, K: {eff_keywords})"
                 card_str = f"  {i+1}. {card.name:<25} {power_and_keywords:<20} {exhausted} {card.ability_text}"
                 print(f"|{card_str}{' '*(self.width - 2 - len(card_str))}│")
@@ -126,7 +125,7 @@ class MindbugCLI:
             elif isinstance(action, AttackAction):
                 return "Attack"
             elif isinstance(action, BlockAction):
-                if not action.blocking_card_uuid:
+                if action.blocking_card_handle is None:
                     return "Don't Block"
                 return "Block"
             elif isinstance(action, StealAction):
@@ -193,7 +192,7 @@ class MindbugCLI:
         print(f"├{'─'*(self.width-2)}┤")
         for i, card in enumerate(choice_request.options):
             exhausted = "⚠ EXHAUSTED" if card.is_exhausted else ""
-            eff_power = GameRules.get_effective_power(game_state, card.uuid)
+            eff_power = GameRules.get_effective_power(game_state, card.handle)
             card_str = f"  {i+1}. {card.name:<25} (P:{eff_power:2d}) {exhausted}"
             print(f"│{card_str}{' '*(self.width - 2 - len(card_str))}│")
         print(f"└{'─'*(self.width-2)}┘")
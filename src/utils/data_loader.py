@@ -1,13 +1,13 @@
 import json
 import os
-import copy
 from typing import List, Dict
-from src.models.card import Card
+from src.models.card import Card, CardDefinition
 
 def load_cards_from_json(filepath=None) -> List[Card]:
     """
     Loads cards from a JSON file and returns a list
     of Card objects, according to their 'amount'.
+    The handle of each card is its index in the returned list.
     """
     if filepath is None:
         # Construct the default path relative to the project root
@@ -26,15 +26,17 @@ def load_cards_from_json(filepath=None) -> List[Card]:
 
     cards = []
     for card_data in card_data_list:
+        # All copies of a card share the same (interned) definition
+        definition = CardDefinition.from_dict(card_data)
         for _ in range(card_data.get('amount', 1)):
-            # We need to create a new instance so that each card has a different UUID
-            cards.append(copy.deepcopy(Card.from_dict(card_data)))
+            # We need to create a new instance so that each card has a different handle
+            cards.append(Card(definition, handle=len(cards)))
     return cards
 
-def load_definitions_from_json(filepath=None) -> Dict[str, Card]:
+def load_definitions_from_json(filepath=None) -> Dict[str, CardDefinition]:
     """
     Loads card definitions from a JSON file and returns a Dict
-    of Card objects, indexed by their 'id'.
+    of CardDefinition objects, indexed by their 'id'.
     """
     if filepath is None:
         # Construct the default path relative to the project root
@@ -53,6 +55,5 @@ def load_definitions_from_json(filepath=None) -> Dict[str, Card]:
 
     cards = {}
     for card_data in card_data_list:
-        card = Card.from_dict(card_data)
-        cards[card_data.get('id')] = card
+        cards[card_data.get('id')] = CardDefinition.from_dict(card_data)
     return cards
\ No newline at end of file
@@ -0,0 +1,63 @@
+import random
+from math import comb
+from typing import List, Sequence, TypeVar
+
+T = TypeVar('T')
+
+# Subsets of a list with sizes between min_size and max_size are ordered as GameEngine.list_of_subsets
+# lists them: by size, and subsets of the same size in the order of itertools.combinations.
+# These functions work with that order without ever building the list of subsets.
+
+def count_subsets(n: int, min_size: int, max_size: int) -> int:
+    """
+    Returns the number of subsets of n items with sizes between min_size and max_size.
+    """
+    return sum(comb(n, size) for size in range(max(min_size, 0), min(max_size, n) + 1))
+
+def subset_at(items: Sequence[T], index: int, min_size: int, max_size: int) -> List[T]:
+    """
+    Returns the subset at the given position, in the order of GameEngine.list_of_subsets.
+
+    Args:
+        items: The items to choose from
+        index: Position of the subset, between 0 and count_subsets(len(items), min_size, max_size) - 1
+        min_size: Minimum size of the subsets
+        max_size: Maximum size of the subsets
+
+    Returns:
+        List: The items of the subset, in their original order
+    """
+    n = len(items)
+    if index < 0:
+        raise ValueError(f"Subset index {index} cannot be negative.")
+
+    # Find the size of the subset
+    for size in range(max(min_size, 0), min(max_size, n) + 1):
+        subsets_of_size = comb(n, size)
+        if index < subsets_of_size:
+            break
+        index -= subsets_of_size
+    else:
+        raise ValueError(f"Subset index out of range for {n} items and sizes {min_size}-{max_size}.")
+
+    # Choose the items one by one: skipping an item skips all the subsets that start with it
+    subset = []
+    item_index = 0
+    while len(subset) < size:
+        subsets_starting_here = comb(n - item_index - 1, size - len(subset) - 1)
+        if index < subsets_starting_here:
+            subset.append(items[item_index])
+        else:
+            index -= subsets_starting_here
+        item_index += 1
+    return subset
+
+def sample_subset(items: Sequence[T], min_size: int, max_size: int, rng: random.Random | None = None) -> List[T]:
+    """
+    Returns one of the subsets with sizes between min_size and max_size, chosen uniformly at random.
+    """
+    total = count_subsets(len(items), min_size, max_size)
+    if total == 0:
+        raise ValueError(f"There are no subsets of {len(items)} items with sizes {min_size}-{max_size}.")
+    index = rng.randrange(total) if rng is not None else random.randrange(total)
+    return subset_at(items, index, min_size, max_size)
@@ -0,0 +1,78 @@
+import sys
+import os
+import numpy as np
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.action import CardChoiceRequest
+from src.core.game_engine import GameEngine, ValidActions
+from src.core.action_space import ActionSpace
+from src.agents.policy_agent import PolicyAgent
+from src.agents.random_agent import RandomAgent
+
+def _load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+class _RandomPolicyAgent(PolicyAgent):
+    def choose_action_index(self, game_state, legal_mask) -> int:
+        return int(self.rng.choice(np.flatnonzero(legal_mask)))
+
+    def choose_cards(self, game_state: GameState, choice_request: CardChoiceRequest):
+        return choice_request.options[:choice_request.max_choices]
+
+def test_legal_indices_decode_to_valid_actions():
+    """
+    The legal indices of every state decode to exactly its valid actions, and encoding them gives the indices back.
+    """
+    cards = _load_cards()
+    action_space = ActionSpace()
+    for game_index in range(30):
+        seed = 5000 + game_index
+        agents = {"player1": RandomAgent("player1", seed=seed), "player2": RandomAgent("player2", seed=seed + 1)}
+        game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+        game_state = GameState.initial_state(player1_id="player1", player2_id="player2", all_cards=cards,
+                                             deck_size=10, hand_size=5, seed=seed)
+
+        while not game_state.game_over:
+            valid_actions = ValidActions(game_engine, game_state)
+            if not valid_actions:
+                break
+            legal_indices = action_space.legal_indices(game_state, valid_actions)
+            decoded_actions = [action_space.decode(game_state, index) for index in legal_indices]
+            assert (sorted(repr(vars(action)) for action in decoded_actions)
+                    == sorted(repr(vars(action)) for action in valid_actions))
+            assert [action_space.encode(game_state, action) for action in decoded_actions] == legal_indices
+
+            mask = action_space.legal_mask(game_state, valid_actions)
+            assert mask.shape == (action_space.size,) and np.flatnonzero(mask).tolist() == legal_indices
+            assert action_space.legal_bitmask(game_state, valid_actions) == sum(1 << index for index in legal_indices)
+
+            action = agents[game_state.active_player_id].choose_from_valid_actions(
+                game_state, valid_actions, lambda valid_action: game_engine.describe_action(game_state, valid_action))
+            game_engine.apply_in_place(game_state, action)
+
+def test_policy_agents_play_full_games():
+    """
+    Agents choosing action indices from the legality mask can play whole games.
+    """
+    cards = _load_cards()
+    for seed in range(10):
+        winners = []
+        for _ in range(2):
+            agents = {"player1": _RandomPolicyAgent("player1", seed=seed), "player2": _RandomPolicyAgent("player2", seed=seed + 1)}
+            game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+            logs = game_engine.play_game(seed=seed)
+            assert logs['final_state']['game_over']
+            winners.append((logs['final_state']['winner_id'], len(logs['history'])))
+        assert winners[0] == winners[1] # Seeded policy agents replay the same game
+
+if __name__ == "__main__":
+    test_legal_indices_decode_to_valid_actions()
+    test_policy_agents_play_full_games()
+    print("--- Action space test PASSED! ---")
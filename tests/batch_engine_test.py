@@ -0,0 +1,121 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import ZONES
+from src.core.game_engine import GameEngine
+from src.core.batch_engine import BatchEngine, DECISION_PHASES
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def test_batch_matches_game_engine():
+    """
+    At every step, the legal actions of the batch are those of GameEngine for the same game,
+    and the games survive a round trip through GameState.
+    """
+    cards = load_cards()
+    batch = BatchEngine(cards, n_games=64, seed=1)
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5)
+    checked = 0
+    while not batch.game_over.all():
+        legal_mask = batch.legal_mask()
+        for game_index in np.flatnonzero(~batch.game_over)[:8].tolist():
+            game_state = batch.to_game_state(game_index)
+            expected = sorted(repr(action) for action in game_engine.iter_valid_actions(game_state))
+            actual = sorted(repr(batch.to_action(game_index, action_index))
+                            for action_index in np.flatnonzero(legal_mask[game_index]).tolist())
+            assert actual == expected
+            batch.load_game_state(game_index, game_state)
+            assert (batch.legal_mask()[game_index] == legal_mask[game_index]).all()
+            checked += 1
+        batch.step(batch.random_actions())
+    assert checked > 100
+
+    winners = batch.winner_ids()
+    assert None not in winners
+    assert set(winners) == {"player1", "player2"}
+    assert set(batch.win_conditions()) <= {"life_below_zero", "run_out_of_actions"}
+
+def state_signature(game_state):
+    """What the batch keeps of a game: the zones in order, the players and the pending decision."""
+    players = tuple((player.life_points, player.mindbugs,
+                     tuple(tuple((card.handle, card.is_exhausted) for card in getattr(player, zone)) for zone in ZONES))
+                    for player in game_state.players.values())
+    signature = (players, game_state.game_over, game_state.winner_id)
+    if game_state.game_over:
+        return signature
+    pending = game_state._pending_action
+    signature += (game_state.active_player_id, game_state.turn_count, pending, game_state._switch_active_player_back)
+    if pending == "mindbug":
+        signature += (game_state._pending_mindbug_card_handle,)
+    elif pending in ("block", "hunt", "frenzy"):
+        signature += (game_state._pending_attack_card_handle, game_state._frenzy_active, game_state._already_hunted,
+                      sorted(game_state._valid_targets) if pending != "frenzy" else None)
+    return signature
+
+def outcomes(game_engine, game_state, action):
+    """
+    Every state that GameEngine.apply_in_place can reach from an action, through all the choices
+    that follow it, until a decision the batch makes itself (or the end of the game).
+    """
+    game_state = game_state.clone()
+    game_engine.apply_in_place(game_state, action)
+    if not game_state.game_over and game_engine.count_valid_actions(game_state) == 0:
+        game_state.game_over, game_state.winner_id = True, game_state.inactive_player_id
+    if game_state.game_over or game_state._pending_action in DECISION_PHASES:
+        return [game_state]
+    return [outcome for choice in game_engine.iter_valid_actions(game_state)
+            for outcome in outcomes(game_engine, game_state, choice)]
+
+def test_batch_transitions_match_game_engine():
+    """
+    Every step of the batch, abilities with choices included, leads to one of the states that
+    GameEngine.apply_in_place reaches from the same action. Steps where a Strange Barrel is in play
+    are skipped, since the cards it steals are drawn at random.
+    """
+    cards = load_cards()
+    batch = BatchEngine(cards, n_games=64, seed=3)
+    agents = {player_id: RandomAgent(player_id, seed=0) for player_id in batch.player_ids}
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+    checked, with_choices = 0, 0
+    while not batch.game_over.all():
+        actions = batch.random_actions()
+        expected = {}
+        for game_index in np.flatnonzero(~batch.game_over).tolist():
+            game_state = batch.to_game_state(game_index)
+            if any(card.id == "strange_barrel" for player in game_state.players.values() for card in player.play_area):
+                continue
+            reachable = outcomes(game_engine, game_state, batch.to_action(game_index, actions[game_index]))
+            expected[game_index] = {repr(state_signature(outcome)) for outcome in reachable}
+        batch.step(actions)
+        for game_index, signatures in expected.items():
+            assert repr(state_signature(batch.to_game_state(game_index))) in signatures
+            checked += 1
+            with_choices += len(signatures) > 1
+    assert checked > 1000
+    assert with_choices > 20
+    assert batch.n_fallbacks == 0 # Every ability of the base set is applied by the batch
+
+def test_batch_is_reproducible():
+    cards = load_cards()
+    results = []
+    for _ in range(2):
+        batch = BatchEngine(cards, n_games=32, seed=7)
+        batch.play_random()
+        results.append((batch.winner_ids(), batch.turn_count.tolist(), batch.actions_taken.tolist()))
+    assert results[0] == results[1]
+
+if __name__ == "__main__":
+    test_batch_matches_game_engine()
+    test_batch_transitions_match_game_engine()
+    test_batch_is_reproducible()
+    print("--- Batch engine test PASSED! ---")
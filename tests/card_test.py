@@ -0,0 +1,71 @@
+import sys
+import os
+import pickle
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json, load_definitions_from_json
+from src.models.card import Card, Keyword
+
+def _json_filepath() -> str:
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return os.path.join(project_root, 'data', 'cards.json')
+
+def test_definitions_are_shared():
+    """
+    All copies of a card share one immutable CardDefinition.
+    """
+    cards = load_cards_from_json(_json_filepath())
+    definitions = load_definitions_from_json(_json_filepath())
+
+    axolotls = [card for card in cards if card.id == "axolotl_healer"]
+    assert len(axolotls) == 2
+    assert axolotls[0].definition is axolotls[1].definition is definitions["axolotl_healer"]
+    assert axolotls[0].handle != axolotls[1].handle
+    assert axolotls[0].power == 4 and axolotls[0].keywords == ("Poisonous",)
+
+    try:
+        definitions["axolotl_healer"].power = 10
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("CardDefinition should be immutable")
+
+    # Cards only hold their per-game state
+    assert not hasattr(axolotls[0], "__dict__")
+
+def test_pickled_cards_keep_shared_definitions():
+    """
+    Unpickled cards point to the interned definitions instead of carrying their own copy.
+    """
+    cards = load_cards_from_json(_json_filepath())
+    unpickled_cards = pickle.loads(pickle.dumps(cards))
+
+    for card, unpickled_card in zip(cards, unpickled_cards):
+        assert isinstance(unpickled_card, Card)
+        assert unpickled_card.definition is card.definition
+        assert unpickled_card.handle == card.handle
+
+def test_keyword_masks():
+    """
+    Keywords are encoded as a Keyword mask when cards are loaded, keeping their names available.
+    """
+    definitions = load_definitions_from_json(_json_filepath())
+
+    for definition in definitions.values():
+        assert definition.keyword_mask == Keyword.from_names(definition.keywords)
+        assert sorted(definition.keyword_mask.names()) == sorted(definition.keywords)
+
+    assert definitions["axolotl_healer"].keyword_mask == Keyword.POISONOUS
+    assert Keyword.from_names(["Tough", "Poisonous"]) & Keyword.TOUGH
+    assert not Keyword.from_names(["Tough", "Poisonous"]) & Keyword.SNEAKY
+    assert Keyword.NONE.names() == []
+
+if __name__ == "__main__":
+    test_definitions_are_shared()
+    test_pickled_cards_keep_shared_definitions()
+    test_keyword_masks()
+    print("--- Card test PASSED! ---")
@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+
+def _make_state() -> GameState:
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    json_filepath = os.path.join(project_root, 'data', 'cards.json')
+    cards = load_cards_from_json(json_filepath)
+    return GameState.initial_state(player1_id="player1", player2_id="player2", all_cards=cards,
+                                   deck_size=4, hand_size=2)
+
+def test_clone_is_independent():
+    """
+    Mutating a cloned GameState must not affect the original one.
+    """
+    game_state = _make_state()
+    game_state._valid_targets = []
+    new_state = game_state.clone()
+
+    player = new_state.get_active_player()
+    card = player.hand[0]
+    new_state.move_card(card, player, "play_area")
+    card.is_exhausted = True
+    player.life_points -= 1
+    new_state._valid_targets.append(card.handle)
+    new_state.switch_active_player()
+
+    original_player = game_state.get_active_player()
+    assert original_player.id == player.id
+    assert len(original_player.hand) == 2 and not original_player.play_area
+    assert not original_player.hand[0].is_exhausted
+    assert original_player.life_points == 3
+    assert game_state._valid_targets == []
+
+def test_clone_shares_card_definitions():
+    """
+    Cloned cards keep their handles, point to the cloned controller and share the immutable card data.
+    """
+    game_state = _make_state()
+    new_state = game_state.clone()
+
+    for player_id, player in game_state.players.items():
+        new_player = new_state.get_player(player_id)
+        assert new_player is not player
+        for card, new_card in zip(player.hand + player.deck, new_player.hand + new_player.deck):
+            assert new_card is not card
+            assert new_card.handle == card.handle
+            assert new_card.controller_id == new_player.id
+            assert new_card.definition is card.definition
+
+if __name__ == "__main__":
+    test_clone_is_independent()
+    test_clone_shares_card_definitions()
+    print("--- Clone test PASSED! ---")
@@ -0,0 +1,60 @@
+import sys
+import os
+import pytest
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.core.game_engine import GameEngine
+from src.core.events import event_bus, Event, EventLevel, AbilityActivated, TurnEnded
+from src.agents.random_agent import RandomAgent
+
+def _play_games(n_games: int, seed: int) -> None:
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+    for game_index in range(n_games):
+        agents = {"player1": RandomAgent("player1"), "player2": RandomAgent("player2")}
+        GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents).play_game(seed=seed + game_index)
+
+def test_subscribers_receive_events():
+    """
+    Subscribers get typed events with their text, filtered by level.
+    """
+    info_events, debug_events = [], []
+    event_bus.subscribe(info_events.append)
+    event_bus.subscribe(debug_events.append, level=EventLevel.DEBUG)
+    try:
+        _play_games(20, seed=7)
+    finally:
+        event_bus.unsubscribe(info_events.append)
+        event_bus.unsubscribe(debug_events.append)
+    assert not event_bus.active
+
+    assert all(isinstance(event, Event) and event.message() for event in debug_events)
+    assert any(isinstance(event, TurnEnded) for event in info_events)
+    assert not any(isinstance(event, AbilityActivated) for event in info_events)
+    assert any(isinstance(event, AbilityActivated) for event in debug_events)
+    assert len(debug_events) > len(info_events)
+
+def test_silent_games_create_no_events(monkeypatch):
+    """
+    Without subscribers, no event is even created.
+    """
+    def fail(self, *args, **kwargs):
+        raise AssertionError(f"{type(self).__name__} created without subscribers")
+    for event_class in Event.__subclasses__():
+        monkeypatch.setattr(event_class, "__init__", fail, raising=False)
+    _play_games(5, seed=8)
+
+def test_every_event_has_a_message():
+    with pytest.raises(TypeError):
+        Event()
+    assert TurnEnded(1).message()
+
+if __name__ == "__main__":
+    test_subscribers_receive_events()
+    test_every_event_has_a_message()
+    print("--- Events test PASSED! ---")
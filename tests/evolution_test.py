@@ -0,0 +1,95 @@
+import sys
+import os
+import numpy as np
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.core.features import FeatureExtractor
+from src.core.evolution import FitnessEvaluator, SequentialFitnessEvaluator, GeneticAlgorithm, wilson_interval
+
+def test_genetic_operators():
+    evaluator = FitnessEvaluator(processes=1)
+    algorithm = GeneticAlgorithm(evaluator, population_size=10, elite_size=2, seed=0)
+    assert algorithm.population.shape == (10, evaluator.genome_size)
+
+    fitness = np.linspace(0, 1, 10)
+    next_population = algorithm.next_population(fitness)
+    assert next_population.shape == algorithm.population.shape
+    # The best genomes are carried over unchanged
+    assert np.array_equal(next_population[0], algorithm.population[9])
+    assert np.array_equal(next_population[1], algorithm.population[8])
+    # Tournament selection favours the fittest genomes
+    parents = algorithm.select_parents(fitness, 1000)
+    assert parents.mean() > 5
+
+def test_evaluation_does_not_depend_on_processes():
+    population = np.random.default_rng(0).normal(0, 0.5, (3, FitnessEvaluator(processes=1).genome_size))
+    win_rates = []
+    for processes, chunk_size in [(1, 8), (2, 3)]:
+        with FitnessEvaluator(processes=processes, chunk_size=chunk_size) as evaluator:
+            win_rates.append(evaluator.evaluate(population, seed=1, n_games=8))
+            assert evaluator.total_games == 24
+    assert np.array_equal(win_rates[0], win_rates[1])
+
+def test_resume_from_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.pkl")
+    evaluator = FitnessEvaluator(processes=1)
+    algorithm = GeneticAlgorithm(evaluator, population_size=4, n_games=4, elite_size=1, seed=2)
+    algorithm.run(1, checkpoint_path=path)
+    resumed = GeneticAlgorithm.load(path, evaluator)
+    assert resumed.generation == 1 and len(resumed.history) == 1
+
+    algorithm.run(2)
+    resumed.run(2)
+    assert np.array_equal(algorithm.population, resumed.population)
+    assert algorithm.history[-1]["mean_fitness"] == resumed.history[-1]["mean_fitness"]
+
+def test_wilson_interval():
+    lower, upper = wilson_interval(np.array([0, 5, 10]), np.array([10, 10, 10]), z=1.96)
+    assert abs(lower[0]) < 1e-9 and abs(upper[2] - 1) < 1e-9
+    assert lower[1] < 0.5 < upper[1]
+    assert abs(upper[1] - 0.7634) < 1e-3 # Wilson interval of 5 wins in 10 games at 95%
+
+def test_sequential_evaluation_stops_settled_genomes():
+    evaluator = FitnessEvaluator(processes=1)
+    genome = np.zeros(evaluator.genome_size, dtype=np.float32)
+    names = {name: index for index, name in enumerate(FeatureExtractor(load_cards_from_json()).names)}
+    good = genome.copy()
+    good[[names["won"], names["own_life_points"], names["opponent_life_points"]]] = [1000, 10, -10]
+    bad = -good
+    population = np.array([good, bad, bad, bad])
+
+    sequential = SequentialFitnessEvaluator(processes=1, batch_size=10, min_games=20)
+    fitness = sequential.evaluate(population, seed=0, n_games=60, n_selected=1)
+    assert np.argmax(fitness) == 0
+    assert sequential.last_games.min() >= 20 and sequential.last_games.max() <= 60
+    assert sequential.last_games.sum() < 4 * 60
+    # The genomes play the same games as in a plain evaluation
+    assert fitness[0] == evaluator.evaluate(population[:1], seed=0, n_games=int(sequential.last_games[0]))[0]
+
+def test_sequential_evaluation_accounts_for_every_comparison():
+    # Every comparison where a genome can stop widens the intervals, and those before min_games don't count
+    assert (SequentialFitnessEvaluator(processes=1, batch_size=10, min_games=0).z_value(50, 100)
+            > SequentialFitnessEvaluator(processes=1, batch_size=50, min_games=0).z_value(50, 100))
+    assert (SequentialFitnessEvaluator(processes=1, batch_size=10, min_games=80).z_value(50, 100)
+            == SequentialFitnessEvaluator(processes=1, batch_size=10, min_games=0).z_value(50, 30))
+
+    # Without a cutoff to settle, every genome still plays min_games games
+    evaluator = SequentialFitnessEvaluator(processes=1, batch_size=10, min_games=20)
+    population = np.zeros((3, evaluator.genome_size), dtype=np.float32)
+    evaluator.evaluate(population, seed=0, n_games=60, n_selected=3)
+    assert evaluator.last_games.tolist() == [20, 20, 20]
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_genetic_operators()
+    test_evaluation_does_not_depend_on_processes()
+    test_wilson_interval()
+    test_sequential_evaluation_stops_settled_genomes()
+    test_sequential_evaluation_accounts_for_every_comparison()
+    with tempfile.TemporaryDirectory() as directory:
+        test_resume_from_checkpoint(pathlib.Path(directory))
+    print("--- Evolution test PASSED! ---")
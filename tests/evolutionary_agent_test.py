@@ -0,0 +1,75 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.action import CardChoiceRequest
+from src.core.features import FeatureExtractor
+from src.core.simulator import Simulator
+from src.agents.evolutionary_agent import EvolutionaryAgent, genome_size
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def material_genome(extractor):
+    """A hand-made linear genome: life points, power and mindbugs, and winning above all."""
+    weights = {"own_life_points": 10, "opponent_life_points": -10, "own_power": 1, "opponent_power": -1,
+               "own_mindbugs": 3, "opponent_mindbugs": -3, "won": 1000, "lost": -1000}
+    return np.array([weights.get(name, 0) for name in extractor.names], dtype=np.float32)
+
+def test_genome_sizes():
+    cards = load_cards()
+    extractor = FeatureExtractor(cards)
+    EvolutionaryAgent("player1", np.zeros(genome_size(extractor.size, 4)), cards, hidden_size=4, extractor=extractor)
+    with pytest.raises(ValueError):
+        EvolutionaryAgent("player1", np.zeros(extractor.size), cards, hidden_size=4, extractor=extractor)
+
+def test_evolutionary_agent_beats_random_agent():
+    cards = load_cards()
+    extractor = FeatureExtractor(cards)
+    genome = material_genome(extractor)
+    simulator = Simulator(all_cards=cards)
+    results = simulator.run(20, {"evolutionary": lambda player_id: EvolutionaryAgent(player_id, genome, cards, extractor=extractor),
+                                 "random": RandomAgent}, seed=0)
+    assert sum(result.winner_id == "evolutionary" for result in results) >= 15
+
+    mlp_genome = np.random.default_rng(0).normal(0, 0.1, genome_size(extractor.size, 8))
+    results = simulator.run(2, {"evolutionary": lambda player_id: EvolutionaryAgent(player_id, mlp_genome, cards, hidden_size=8,
+                                                                                    extractor=extractor),
+                                "random": RandomAgent}, seed=0)
+    assert all(result.winner_id is not None for result in results)
+
+def test_choose_defeat_order():
+    cards = load_cards()
+    forced_cards = [card for card in cards if card.id in ("explosive_toad", "harpy_mother")][:2]
+    game_state = GameState.initial_state("player1", "player2", cards, p1_forced_cards=forced_cards, seed=1)
+    player = game_state.get_player("player1")
+    defeated = [game_state.get_card(card.handle) for card in forced_cards]
+    for card in defeated:
+        game_state.move_card(card, player, "discard_pile")
+    opponent = game_state.get_player("player2")
+    for card in list(opponent.hand[:2]):
+        game_state.move_card(card, opponent, "play_area")
+
+    agent = EvolutionaryAgent("player1", material_genome(FeatureExtractor(cards)), cards, seed=0)
+    request = CardChoiceRequest("player1", defeated, 2, 2, "defeat_order")
+    order = agent.choose_cards(game_state, request)
+    assert sorted(card.handle for card in order) == sorted(card.handle for card in defeated)
+    assert all(game_state.is_in_zone(card.handle, "player1", "discard_pile") for card in defeated)
+    with pytest.raises(ValueError):
+        agent.choose_cards(game_state, CardChoiceRequest("player1", defeated, 1, 1, "unknown"))
+
+if __name__ == "__main__":
+    test_genome_sizes()
+    test_evolutionary_agent_beats_random_agent()
+    test_choose_defeat_order()
+    print("--- Evolutionary agent test PASSED! ---")
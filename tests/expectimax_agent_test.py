@@ -0,0 +1,97 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.player import Player
+from src.models.action import PlayCardAction
+from src.core.game_engine import GameEngine
+from src.core.simulator import Simulator
+from src.agents.expectimax_agent import ExpectimaxAgent
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def test_draws_are_chance_nodes():
+    cards = load_cards()
+    game_state = GameState.initial_state("player1", "player2", cards, seed=3)
+    agent = ExpectimaxAgent("player1", cards, max_depth=1, seed=0)
+    player = game_state.get_player("player1")
+    action = PlayCardAction("player1", player.hand[0].handle)
+
+    outcomes = agent.draw_outcomes(game_state, action)
+    assert abs(sum(probability for probability, _ in outcomes) - 1) < 1e-9
+    assert len(outcomes) == len({card.id for card in player.deck})
+
+    # The outcome is searched in place, and both the draw and the action are undone
+    before = str(game_state), [card.handle for card in player.deck], game_state.zobrist_key()
+    drawn = outcomes[-1][1]
+    records = agent._apply(game_state, action, drawn)
+    assert all(game_state.is_in_zone(card.handle, "player1", "hand") for card in drawn)
+    assert game_state._zobrist == game_state._compute_zobrist()
+    agent._undo(game_state, records)
+    assert (str(game_state), [card.handle for card in player.deck], game_state.zobrist_key()) == before
+    assert all(game_state.is_in_zone(card.handle, "player1", "deck") for card in player.deck)
+
+def test_expectimax_agent_is_reproducible():
+    cards = load_cards()
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5)
+    game_state = GameState.initial_state("player1", "player2", cards, seed=5)
+    valid_actions = list(game_engine.iter_valid_actions(game_state))
+    choices = [repr(ExpectimaxAgent("player1", cards, max_depth=2, seed=4).choose_from_valid_actions(
+                   game_state, valid_actions, lambda action: {'action': action}))
+               for _ in range(2)]
+    assert choices[0] == choices[1]
+
+    simulator = Simulator(all_cards=cards)
+    results = simulator.run(2, {"expectimax": lambda player_id: ExpectimaxAgent(player_id, cards, max_depth=2, seed=1),
+                                "random": RandomAgent}, seed=0)
+    assert all(result.winner_id is not None for result in results)
+    assert simulator.game_engine.agents["expectimax"].last_depth >= 1
+
+def test_transposition_table_tells_copies_apart():
+    """
+    Positions that only differ by a pair of identical cards in the same zone don't share table entries.
+    """
+    cards = load_cards()
+    axolotls = [card for card in cards if card.id == "axolotl_healer"]
+    others = [card for card in cards if card.id != "axolotl_healer"]
+
+    def make_state(hand):
+        players = {
+            "player1": Player("player1", deck=[card.copy() for card in others[:3]], hand=[card.copy() for card in hand]),
+            "player2": Player("player2", deck=[card.copy() for card in others[3:6]],
+                              hand=[card.copy() for card in others[6:8]]),
+        }
+        return GameState("player1", "player2", players, turn_count=1, seed=0)
+
+    with_pair, without_pair = make_state(axolotls + others[8:9]), make_state(others[8:9])
+    assert with_pair.zobrist_key() != without_pair.zobrist_key()
+
+    agent = ExpectimaxAgent("player1", cards, max_depth=3, perfect_information=True, seed=0)
+    agent.search(with_pair)
+    assert without_pair.zobrist_key() not in agent.table
+    fresh_agent = ExpectimaxAgent("player1", cards, max_depth=3, perfect_information=True, seed=0)
+    assert agent.search(without_pair) == fresh_agent.search(without_pair)
+
+def test_table_size_is_a_bound():
+    cards = load_cards()
+    game_state = GameState.initial_state("player1", "player2", cards, seed=5)
+    agent = ExpectimaxAgent("player1", cards, max_depth=3, table_size=20, seed=0)
+    agent.search(game_state)
+    assert agent.last_nodes > 20
+    assert 0 < len(agent.table) <= 20
+
+if __name__ == "__main__":
+    test_draws_are_chance_nodes()
+    test_expectimax_agent_is_reproducible()
+    test_transposition_table_tells_copies_apart()
+    test_table_size_is_a_bound()
+    print("--- Expectimax agent test PASSED! ---")
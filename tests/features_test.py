@@ -0,0 +1,96 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.core.game_engine import GameEngine
+from src.core.features import FeatureExtractor
+import src.core.game_rules as GameRules
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def play_states(cards, seed, n_states):
+    """Returns the states met in a game between random agents."""
+    agents = {"player1": RandomAgent("player1"), "player2": RandomAgent("player2")}
+    game_engine = GameEngine(all_cards=cards, agents=agents)
+    game_state = GameState.initial_state("player1", "player2", cards, seed=game_engine.seed_game(seed))
+    states = [game_state.clone()]
+    while not game_state.game_over and len(states) < n_states:
+        action = game_engine.choose_next_action(game_state)
+        if action is not None:
+            game_engine._dispatch_action(game_state, action)
+            game_engine.resolve_automatic_steps(game_state)
+        states.append(game_state.clone())
+    return states
+
+def test_features_of_a_state():
+    cards = load_cards()
+    extractor = FeatureExtractor(cards)
+    assert len(extractor.names) == extractor.size
+    states = play_states(cards, seed=2, n_states=30)
+    game_state = next(state for state in reversed(states) if state.get_player("player2").play_area)
+    features = dict(zip(extractor.names, extractor.extract(game_state, "player1")))
+
+    player = game_state.get_player("player1")
+    opponent = game_state.get_player("player2")
+    assert features["own_life_points"] == player.life_points
+    assert features["opponent_mindbugs"] == opponent.mindbugs
+    assert features["opponent_hand_size"] == len(opponent.hand)
+    assert features["opponent_power"] == sum(GameRules.get_effective_power(game_state, card.handle)
+                                             for card in opponent.play_area)
+    for card in player.hand:
+        assert features[f"own_hand_{card.id}"] == sum(other.id == card.id for other in player.hand)
+    # The opponent's hand is hidden unless the extractor has perfect information
+    assert not any(value for name, value in features.items() if name.startswith("opponent_hand_") and name != "opponent_hand_size")
+    perfect_features = dict(zip(extractor.names, FeatureExtractor(cards, perfect_information=True).extract(game_state, "player1")))
+    assert sum(perfect_features[f"opponent_hand_{card_id}"] for card_id in extractor.card_ids) == len(opponent.hand)
+    assert features[f"pending_{game_state._pending_action}"] == 1
+    assert features["to_act"] == (game_state.active_player_id == "player1")
+
+def test_batch_matches_single_extraction():
+    cards = load_cards()
+    extractor = FeatureExtractor(cards)
+    states = play_states(cards, seed=5, n_states=50)
+    out = np.full((64, extractor.size), -1, dtype=np.float32)
+    rows = extractor.extract_batch(states, "player2", out)
+    assert rows.shape == (len(states), extractor.size)
+    for row, game_state in zip(rows, states):
+        assert np.array_equal(row, extractor.extract(game_state, "player2"))
+    with pytest.raises(ValueError):
+        extractor.extract_batch(states, "player2", np.zeros((2, extractor.size), dtype=np.float32))
+
+def test_successors_match_copies():
+    cards = load_cards()
+    extractor = FeatureExtractor(cards)
+    agents = {"player1": RandomAgent("player1"), "player2": RandomAgent("player2")}
+    game_engine = GameEngine(all_cards=cards, agents=agents)
+    for game_state in play_states(cards, seed=7, n_states=40)[::5]:
+        if game_state.game_over:
+            continue
+        actions = list(game_engine.iter_valid_actions(game_state))
+        key = game_state.zobrist_key()
+        successors = []
+        for action in actions:
+            successor = game_state.clone()
+            game_engine._dispatch_action(successor, action)
+            game_engine.resolve_automatic_steps(successor)
+            successors.append(successor)
+        rows = extractor.extract_successors(game_state, "player1", actions, game_engine)
+        assert np.array_equal(rows, extractor.extract_batch(successors, "player1"))
+        assert game_state.zobrist_key() == key
+
+if __name__ == "__main__":
+    test_features_of_a_state()
+    test_batch_matches_single_extraction()
+    test_successors_match_copies()
+    print("--- Features test PASSED! ---")
@@ -0,0 +1,56 @@
+import sys
+import os
+import queue
+import numpy as np
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.evolution import FitnessEvaluator, GeneticAlgorithm
+from src.core.islands import IslandModel, population_diversity, _take_in_migrants
+
+def test_population_diversity():
+    assert population_diversity(np.ones((4, 3))) == 0
+    assert population_diversity(np.array([[0.0, 0.0], [2.0, 0.0]])) == 1
+
+def test_islands_exchange_migrants():
+    model = IslandModel(n_islands=2, migration_interval=1, n_migrants=1, hall_of_fame_size=1,
+                        evaluator_options={"batch_size": 2},
+                        algorithm_options={"population_size": 4, "n_games": 4, "elite_size": 1})
+    best_genome = model.run(2)
+    assert best_genome is not None and np.isfinite(model.best_fitness)
+
+    stats = model.island_stats()
+    assert sorted(stats) == [0, 1]
+    for island in stats.values():
+        assert island["generations"] == 2
+        assert island["migrants_sent"] == 2
+        assert island["games"] > 0 and island["games_per_second"] > 0
+        assert island["diversity"] > 0
+    # Migrants that arrived in time were taken in, and no more than were sent
+    assert sum(island["migrants_received"] for island in stats.values()) <= 4
+
+def test_migrants_replace_the_last_children():
+    with FitnessEvaluator(processes=1) as evaluator:
+        algorithm = GeneticAlgorithm(evaluator, population_size=6, elite_size=2, seed=0)
+        population = algorithm.population.copy()
+        inbox = queue.Queue()
+        inbox.put(np.full((1, evaluator.genome_size), 7.0, dtype=np.float32))
+        inbox.put(np.full((2, evaluator.genome_size), 8.0, dtype=np.float32))
+
+        assert _take_in_migrants(algorithm, inbox) == 3
+        assert (algorithm.population[:3] == population[:3]).all()
+        assert (algorithm.population[3:4] == 7.0).all() and (algorithm.population[4:] == 8.0).all()
+        assert _take_in_migrants(algorithm, inbox) == 0
+
+        # More migrants than children: the elites are kept
+        inbox.put(np.full((10, evaluator.genome_size), 9.0, dtype=np.float32))
+        assert _take_in_migrants(algorithm, inbox) == 4
+        assert (algorithm.population[:2] == population[:2]).all() and (algorithm.population[2:] == 9.0).all()
+
+if __name__ == "__main__":
+    test_population_diversity()
+    test_islands_exchange_migrants()
+    test_migrants_replace_the_last_children()
+    print("--- Islands test PASSED! ---")
@@ -0,0 +1,98 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState, ZONES
+from src.models.player import Player
+from src.core.game_engine import GameEngine
+from src.core.simulator import Simulator
+from src.agents.ismcts_agent import ISMCTSAgent
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def zone_handles(game_state: GameState, player_id: str, zone: str):
+    return [card.handle for card in getattr(game_state.get_player(player_id), zone)]
+
+def test_determinize_keeps_what_is_visible():
+    cards = load_cards()
+    game_state = GameState.initial_state("player1", "player2", cards, seed=4)
+    opponent = game_state.get_player("player2")
+    game_state.move_card(opponent.hand[-1], opponent, "play_area")
+    agent = ISMCTSAgent("player1", cards, seed=0)
+
+    for _ in range(10):
+        determinization = agent.determinize(game_state)
+        assert zone_handles(determinization, "player1", "hand") == zone_handles(game_state, "player1", "hand")
+        assert zone_handles(determinization, "player2", "play_area") == zone_handles(game_state, "player2", "play_area")
+        for player_id in ("player1", "player2"):
+            for zone in ZONES:
+                assert len(zone_handles(determinization, player_id, zone)) == len(zone_handles(game_state, player_id, zone))
+        handles = [handle for player_id in ("player1", "player2") for zone in ZONES
+                   for handle in zone_handles(determinization, player_id, zone)]
+        assert len(handles) == len(set(handles))
+
+def test_ismcts_agent_plays_games():
+    cards = load_cards()
+    simulator = Simulator(all_cards=cards)
+    results = simulator.run(2, {"mcts": lambda player_id: ISMCTSAgent(player_id, cards, iterations=20, seed=1),
+                                "random": RandomAgent}, seed=0)
+    assert all(result.winner_id is not None for result in results)
+    agent = simulator.game_engine.agents["mcts"]
+    assert 0 < agent.last_iterations <= 20
+    assert agent.iterations_per_second() > 0
+
+def test_ismcts_time_limit():
+    cards = load_cards()
+    game_state = GameState.initial_state("player1", "player2", cards, seed=2)
+    agent = ISMCTSAgent("player1", cards, iterations=None, time_limit=0.05, seed=0)
+    root = agent.search(game_state)
+    assert agent.last_iterations > 0
+    assert sum(child.visits for child in root.children.values()) == agent.last_iterations
+
+def test_order_of_defeated_abilities_is_searched():
+    """
+    When an attack defeats a Harpy Mother and an Explosive Toad together, the order of their
+    Defeated abilities is chosen from playouts of the attack, which are run if the search didn't get there.
+    """
+    cards = load_cards()
+    harpy = next(card for card in cards if card.id == "harpy_mother")
+    toad = next(card for card in cards if card.id == "explosive_toad")
+    others = [card for card in cards if card.ability_type != "defeated"]
+    players = {
+        "player1": Player("player1", deck=[card.copy() for card in others[:3]], play_area=[harpy.copy()]),
+        "player2": Player("player2", deck=[card.copy() for card in others[3:6]],
+                          hand=[card.copy() for card in others[6:8]], play_area=[toad.copy()]),
+    }
+    game_state = GameState("player1", "player2", players, turn_count=1, seed=0)
+    agent = ISMCTSAgent("player1", cards, iterations=50, seed=0)
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5,
+                             agents={"player1": agent, "player2": RandomAgent("player2", seed=0)})
+
+    # The attack is the only action, so it isn't searched
+    attack, = game_engine.iter_valid_actions(game_state)
+    game_engine.apply_in_place(game_state, agent.choose_from_valid_actions(game_state, [attack], lambda action: {'action': action}))
+    assert agent.last_iterations == 0
+    block = next(action for action in game_engine.iter_valid_actions(game_state) if action.blocking_card_handle is not None)
+    game_engine.apply_in_place(game_state, block)
+    assert not game_state.players["player1"].play_area and not game_state.players["player2"].play_area
+
+    assert agent.last_iterations == 50
+    _, root, attack_key = agent._last_decision
+    orders = [key for key in root.children[attack_key].children[("block", ("explosive_toad", "player2", "play_area"))].children
+              if key[:2] == ("cards", "defeat_order")]
+    assert len(orders) == 2
+
+if __name__ == "__main__":
+    test_determinize_keeps_what_is_visible()
+    test_ismcts_agent_plays_games()
+    test_ismcts_time_limit()
+    test_order_of_defeated_abilities_is_searched()
+    print("--- ISMCTS agent test PASSED! ---")
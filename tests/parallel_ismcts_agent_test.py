@@ -0,0 +1,37 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.core.game_engine import GameEngine
+from src.agents.parallel_ismcts_agent import RootParallelISMCTSAgent
+
+def test_root_parallel_search_merges_trees():
+    """
+    The root statistics add up the playouts of all the workers, and the workers are kept between decisions.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+    game_state = GameState.initial_state("player1", "player2", cards, seed=1)
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5)
+
+    with RootParallelISMCTSAgent("player1", cards, iterations=15, time_limit=None, processes=2, seed=0) as agent:
+        root = agent.search(game_state)
+        assert agent.last_iterations == 30
+        assert sum(child.visits for child in root.children.values()) == 30
+        pool = agent._pool
+
+        valid_actions = list(game_engine.iter_valid_actions(game_state))
+        action = agent.choose_from_valid_actions(game_state, valid_actions, lambda action: {'action': action})
+        assert repr(action) in [repr(valid_action) for valid_action in valid_actions]
+        assert agent._pool is pool
+    assert agent._pool is None
+
+if __name__ == "__main__":
+    test_root_parallel_search_merges_trees()
+    print("--- Parallel ISMCTS agent test PASSED! ---")
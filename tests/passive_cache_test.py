@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.player import Player
+from src.models.card import Keyword
+from src.core.game_engine import GameEngine
+import src.core.game_rules as GameRules
+from src.agents.random_agent import RandomAgent
+
+def _effective_stats(game_state: GameState) -> dict:
+    """Effective power and keywords of every card in play or in hand."""
+    return {card.handle: (GameRules.get_effective_power(game_state, card.handle),
+                          GameRules.get_effective_keywords(game_state, card.handle))
+            for player in game_state.players.values()
+            for card in player.play_area + player.hand}
+
+def test_cached_passive_layer_matches_recomputation():
+    """
+    Plays random games in place and checks that, after every action and every undo, the cached
+    effective power and keywords are the same as the ones computed from scratch.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    json_filepath = os.path.join(project_root, 'data', 'cards.json')
+    cards = load_cards_from_json(json_filepath)
+
+    for game_index in range(30):
+        seed = 2000 + game_index
+        agents = {"player1": RandomAgent("player1", seed=seed), "player2": RandomAgent("player2", seed=seed + 1)}
+        game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+        game_state = GameState.initial_state(player1_id="player1", player2_id="player2", all_cards=cards,
+                                             deck_size=10, hand_size=5, seed=seed)
+
+        records = []
+        while not game_state.game_over:
+            valid_actions = game_engine.get_valid_actions(game_state)
+            if not valid_actions:
+                break
+            # Warm up the caches before the action, so that stale entries would be noticed
+            _effective_stats(game_state)
+            action = agents[game_state.active_player_id].choose_action(game_state, valid_actions)
+            records.append(game_engine.apply_in_place(game_state, action))
+
+            fresh_state = game_state.clone()
+            fresh_state._invalidate_passive_layer()
+            assert _effective_stats(game_state) == _effective_stats(fresh_state)
+
+        while records:
+            game_engine.undo(game_state, records.pop())
+            fresh_state = game_state.clone()
+            fresh_state._invalidate_passive_layer()
+            assert _effective_stats(game_state) == _effective_stats(fresh_state)
+
+def test_sharky_keywords_with_snail_thrower():
+    """
+    Snail Thrower's keywords go to Sharky Crab-Dog-Mummypus only if Sharky's own power is 4 or less,
+    whatever the power of the enemy creatures it copies keywords from.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = {card.id: card for card in load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))}
+    players = {
+        "player1": Player("player1", play_area=[cards["chameleon_sniper"].copy()]),
+        "player2": Player("player2", play_area=[cards["sharky_crab-dog-mummypus"].copy(), cards["snail_thrower"].copy()]),
+    }
+    game_state = GameState("player1", "player2", players, turn_count=1, seed=0)
+    sharky = cards["sharky_crab-dog-mummypus"].handle
+
+    # Sharky (power 5) copies Sneaky from Chameleon Sniper (power 1), but gets nothing from Snail Thrower
+    assert GameRules.get_effective_power(game_state, sharky) == 5
+    assert GameRules.get_effective_keywords(game_state, sharky) == Keyword.SNEAKY
+
+if __name__ == "__main__":
+    test_cached_passive_layer_matches_recomputation()
+    test_sharky_keywords_with_snail_thrower()
+    print("--- Passive cache test PASSED! ---")
@@ -12,7 +12,7 @@ import traceback
 def run_player_test():
     """
     Test the Player class by creating a player instance,
-    drawing cards, discarding a card, and checking life points.
+    drawing cards and checking life points.
     """
     print("--- Starting Player Class Test ---")
     try:
@@ -57,15 +57,6 @@ def run_player_test():
 
         print(f"Hand after drawing: {player.hand}")
         
-        # Test discarding a card
-        print("\n--- Testing discard_card method ---")
-        if player.hand:
-            card_to_discard = player.hand[-1]
-            print(f"Discarding card: {card_to_discard}")
-            player.discard_card(card_to_discard)
-            print(f"Hand size after discarding: {len(player.hand)}")
-            assert card_to_discard not in player.hand, "Discarded card should not be in hand"
-        
         # Test losing life points
         print("\n--- Testing lose_life method ---")
         initial_life = player.life_points
@@ -74,14 +65,6 @@ def run_player_test():
         print(f"Life points after losing {life_to_lose}: {player.life_points}")
         assert player.life_points == initial_life - life_to_lose, f"Life should be {initial_life - life_to_lose}"
         
-        # Test gaining life points
-        print("\n--- Testing gain_life method ---")
-        initial_life = player.life_points
-        life_to_gain = 1
-        player.gain_life(life_to_gain)
-        print(f"Life points after gaining {life_to_gain}: {player.life_points}")
-        assert player.life_points == initial_life + life_to_gain, f"Life should be {initial_life + life_to_gain}"
-        
         print("\n--- Player class test PASSED! ---")
         
     except Exception as e:
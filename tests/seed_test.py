@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.core.game_engine import GameEngine
+from src.agents.random_agent import RandomAgent, ZeroAgent
+
+def _play(cards, seed=None) -> dict:
+    agents = {"player1": RandomAgent("player1"), "player2": ZeroAgent("player2")}
+    return GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents).play_game(seed=seed)
+
+def test_games_replay_from_their_seed():
+    """
+    A game played again with the seed in its logs and the same agents is identical, card UUIDs included.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+    for seed in range(20):
+        assert _play(cards, seed) == _play(cards, seed)
+
+    unseeded_logs = _play(cards)
+    assert _play(cards, unseeded_logs['seed']) == unseeded_logs
+
+    histories = {str(_play(cards, seed)['history']) for seed in range(20)}
+    assert len(histories) > 1
+
+def test_clones_share_the_future_randomness():
+    """
+    A cloned state makes the same random choices as the original, without affecting it.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+    game_state = GameState.initial_state("player1", "player2", cards, deck_size=10, hand_size=5, seed=11)
+    new_state = game_state.clone()
+    hand = game_state.get_active_player().hand
+    assert [card.handle for card in new_state.random_sample(hand, 2)] == [card.handle for card in game_state.random_sample(hand, 2)]
+    assert new_state._random_draws == game_state._random_draws == 1
+
+if __name__ == "__main__":
+    test_games_replay_from_their_seed()
+    test_clones_share_the_future_randomness()
+    print("--- Seed test PASSED! ---")
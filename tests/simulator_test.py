@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.core.game_engine import GameEngine
+from src.core.simulator import Simulator
+from src.agents.random_agent import RandomAgent, ZeroAgent
+
+def test_simulator_matches_play_game():
+    """
+    The simulator gives the same games as play_game, and the same results for the same seed.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    cards = load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+    simulator = Simulator(all_cards=cards, deck_size=10, hand_size=5)
+    agent_factories = {"player1": RandomAgent, "player2": ZeroAgent}
+
+    results = simulator.run(30, agent_factories, seed=5)
+    assert len(results) == 30
+    assert [repr(result) for result in results] == [repr(result) for result in simulator.run(30, agent_factories, seed=5)]
+    assert len({result.winner_id for result in results}) == 2
+
+    game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5,
+                             agents={player_id: factory(player_id) for player_id, factory in agent_factories.items()})
+    for result in results[:10]:
+        logs = game_engine.play_game(seed=result.seed)
+        assert logs['final_state']['winner_id'] == result.winner_id
+        assert logs['final_state']['win_condition'] == result.win_condition
+        assert len(logs['history']) == result.n_actions
+
+if __name__ == "__main__":
+    test_simulator_matches_play_game()
+    print("--- Simulator test PASSED! ---")
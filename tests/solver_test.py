@@ -0,0 +1,75 @@
+import sys
+import os
+import pytest
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.core.solver import ExactSolver, Tablebase, canonical_key, cards_remaining
+from src.core.simulator import Simulator
+from src.agents.solver_agent import SolverAgent
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def test_solver_values_are_consistent():
+    """
+    A won position has a winning action, and every action of a lost position leads to a loss.
+    """
+    solver = ExactSolver(load_cards(), deck_size=4, hand_size=2)
+    for seed in (4, 5, 7):
+        game_state = solver.initial_state(seed)
+        value = solver.value(game_state)
+        child_values = []
+        for _, child in solver.children(game_state):
+            child_value = solver.value(child)
+            child_values.append(child_value if child.active_player_id == game_state.active_player_id else -child_value)
+        assert value == max(child_values)
+        assert solver.best_action(game_state)[1] == value
+        assert cards_remaining(canonical_key(game_state)) == 8
+
+def test_tablebase_round_trip(tmp_path):
+    cards = load_cards()
+    path = str(tmp_path / "tablebase.sqlite")
+    solver = ExactSolver(cards, deck_size=4, hand_size=2)
+    with Tablebase(path) as tablebase:
+        stored = solver.build_tablebase(tablebase, seeds=[7], max_cards=6)
+        assert stored == len(tablebase) > 0
+
+    with Tablebase(path) as tablebase:
+        lookup_solver = ExactSolver(cards, deck_size=4, hand_size=2, tablebase=tablebase)
+        game_state = lookup_solver.initial_state(7)
+        assert lookup_solver.value(game_state) == solver.value(game_state)
+        assert lookup_solver.nodes < solver.nodes
+        for key, value in solver.memo.items():
+            if cards_remaining(key) <= 6:
+                assert tablebase.lookup(key) == value
+
+    # The tablebase is only used for games of the size it was built for
+    with Tablebase(path) as tablebase:
+        with pytest.raises(ValueError):
+            ExactSolver(cards, deck_size=4, hand_size=3, tablebase=tablebase)
+        with pytest.raises(ValueError):
+            ExactSolver(cards, deck_size=5, hand_size=2).build_tablebase(tablebase, seeds=[7], max_cards=6)
+
+def test_solver_agent_plays_games():
+    cards = load_cards()
+    solver = ExactSolver(cards, deck_size=4, hand_size=2)
+    simulator = Simulator(all_cards=cards, deck_size=4, hand_size=2)
+    results = simulator.run(4, {"solver": lambda player_id: SolverAgent(player_id, solver, max_cards=4),
+                                "random": RandomAgent}, seed=0)
+    assert all(result.winner_id is not None for result in results)
+    assert solver.nodes > 0
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_solver_values_are_consistent()
+    test_solver_agent_plays_games()
+    with tempfile.TemporaryDirectory() as directory:
+        test_tablebase_round_trip(pathlib.Path(directory))
+    print("--- Solver test PASSED! ---")
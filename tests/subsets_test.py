@@ -0,0 +1,49 @@
+import sys
+import os
+import random
+from collections import Counter
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.game_engine import GameEngine
+from src.utils.subsets import count_subsets, subset_at, sample_subset
+
+def test_subset_indexing_matches_list_of_subsets():
+    """
+    Counting and indexing subsets gives the same subsets, in the same order, as list_of_subsets.
+    """
+    for n in range(0, 8):
+        items = [f"card{i}" for i in range(n)]
+        for min_size in range(0, n + 1):
+            for max_size in range(min_size, n + 1):
+                subsets = GameEngine.list_of_subsets(items, min_size, max_size)
+                assert count_subsets(n, min_size, max_size) == len(subsets)
+                assert [subset_at(items, i, min_size, max_size) for i in range(len(subsets))] == subsets
+
+    try:
+        subset_at(["a", "b"], 3, 1, 1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Out of range subset index should raise ValueError")
+
+def test_sample_subset_is_uniform():
+    """
+    Sampled subsets are uniformly distributed, and large target sets never need to be enumerated.
+    """
+    rng = random.Random(4)
+    items = ["a", "b", "c", "d"]
+    samples = Counter(tuple(sample_subset(items, 1, 2, rng)) for _ in range(10000))
+    assert len(samples) == count_subsets(4, 1, 2) == 10
+    assert all(800 < amount < 1200 for amount in samples.values())
+
+    many_items = list(range(60))
+    assert count_subsets(60, 0, 30) > 10**17
+    assert len(sample_subset(many_items, 30, 30, rng)) == 30
+
+if __name__ == "__main__":
+    test_subset_indexing_matches_list_of_subsets()
+    test_sample_subset_is_uniform()
+    print("--- Subsets test PASSED! ---")
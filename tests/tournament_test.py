@@ -0,0 +1,31 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.simulator import Simulator
+from src.core.tournament import Tournament, TournamentStats
+from src.agents.random_agent import RandomAgent, ZeroAgent
+
+def test_tournament_totals_do_not_depend_on_processes():
+    """
+    A tournament gives the same totals as the simulator, whatever the number of processes and chunk size.
+    """
+    agent_factories = {"AI1": RandomAgent, "AI2": ZeroAgent}
+    expected = TournamentStats()
+    for result in Simulator(deck_size=10, hand_size=5).run(50, agent_factories, seed=3):
+        expected.add(result)
+
+    for processes, chunk_size in [(1, 50), (2, 7)]:
+        stats = Tournament(agent_factories, deck_size=10, hand_size=5,
+                           processes=processes, chunk_size=chunk_size).run(50, seed=3)
+        assert stats.n_games == 50
+        assert stats.wins == expected.wins
+        assert stats.win_conditions == expected.win_conditions
+        assert stats.n_actions == expected.n_actions
+
+if __name__ == "__main__":
+    test_tournament_totals_do_not_depend_on_processes()
+    print("--- Tournament test PASSED! ---")
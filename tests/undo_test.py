@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState, ZONES
+from src.core.game_engine import GameEngine
+from src.agents.random_agent import RandomAgent
+
+def _snapshot(game_state: GameState) -> tuple:
+    """Summarizes everything an action can change in a GameState."""
+    fields = tuple(value for key, value in sorted(game_state.__dict__.items())
+                   if key not in ("players", "_valid_targets", "_undo_log"))
+    players = tuple(
+        (player.id, player.life_points, player.mindbugs,
+         tuple(tuple((card.handle, card.is_exhausted, card.controller_id)
+                     for card in zone)
+               for zone in (player.deck, player.hand, player.play_area, player.discard_pile)))
+        for player in game_state.players.values()
+    )
+    return fields, tuple(game_state._valid_targets or ()), players
+
+def _check_card_index(game_state: GameState) -> None:
+    """Checks that the card location index agrees with the contents of every zone."""
+    locations = {}
+    for player in game_state.players.values():
+        for zone in ZONES:
+            for position, card in enumerate(getattr(player, zone)):
+                assert game_state.get_card(card.handle) is card
+                assert card.controller_id == player.id
+                locations[card.handle] = (player.id, zone, position)
+    assert game_state._card_locations == locations
+
+def test_apply_in_place_and_undo():
+    """
+    Plays random games in place and checks that undoing every action restores each previous state,
+    and that the card location index is kept up to date all along.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    json_filepath = os.path.join(project_root, 'data', 'cards.json')
+    cards = load_cards_from_json(json_filepath)
+
+    for game_index in range(30):
+        seed = 1000 + game_index
+        agents = {"player1": RandomAgent("player1", seed=seed), "player2": RandomAgent("player2", seed=seed + 1)}
+        game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+        game_state = GameState.initial_state(player1_id="player1", player2_id="player2", all_cards=cards,
+                                             deck_size=10, hand_size=5, seed=seed)
+
+        snapshots, records = [], []
+        while not game_state.game_over:
+            valid_actions = game_engine.get_valid_actions(game_state)
+            if not valid_actions:
+                break
+            action = agents[game_state.active_player_id].choose_action(game_state, valid_actions)
+            snapshots.append(_snapshot(game_state))
+            records.append(game_engine.apply_in_place(game_state, action))
+            _check_card_index(game_state)
+        _check_card_index(game_state.clone())
+
+        while records:
+            game_engine.undo(game_state, records.pop())
+            assert _snapshot(game_state) == snapshots.pop()
+            _check_card_index(game_state)
+
+if __name__ == "__main__":
+    test_apply_in_place_and_undo()
+    print("--- Apply/undo test PASSED! ---")
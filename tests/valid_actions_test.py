@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.action import StealAction, DiscardAction, DefeatAction
+from src.core.game_engine import GameEngine, ValidActions
+from src.agents.random_agent import RandomAgent
+
+def test_iter_valid_actions_matches_get_valid_actions():
+    """
+    The lazily generated actions are the same, in the same order, as the ones in get_valid_actions,
+    and describe_action gives them the card names used by the CLI. ValidActions indexes them in the same order.
+    """
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    json_filepath = os.path.join(project_root, 'data', 'cards.json')
+    cards = load_cards_from_json(json_filepath)
+
+    for game_index in range(30):
+        seed = 3000 + game_index
+        agents = {"player1": RandomAgent("player1", seed=seed), "player2": RandomAgent("player2", seed=seed + 1)}
+        game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+        game_state = GameState.initial_state(player1_id="player1", player2_id="player2", all_cards=cards,
+                                             deck_size=10, hand_size=5, seed=seed)
+
+        while not game_state.game_over:
+            lazy_actions = list(game_engine.iter_valid_actions(game_state))
+            valid_actions = game_engine.get_valid_actions(game_state)
+            if not valid_actions:
+                break
+            assert [vars(action) for action in lazy_actions] == [vars(valid['action']) for valid in valid_actions]
+
+            for valid in valid_actions:
+                action = valid['action']
+                if isinstance(action, (StealAction, DiscardAction, DefeatAction)):
+                    assert valid['card_names'] == [game_state.get_card(handle).name for handle in action.card_handles]
+                elif getattr(action, 'card_handle', None) is not None:
+                    assert valid['card_name'] == game_state.get_card(action.card_handle).name
+
+            sequence = ValidActions(game_engine, game_state)
+            assert len(sequence) == len(lazy_actions)
+            assert [vars(sequence[i]) for i in range(len(sequence))] == [vars(action) for action in lazy_actions]
+            assert vars(sequence[-1]) == vars(lazy_actions[-1])
+
+            action = agents[game_state.active_player_id].choose_from_valid_actions(
+                game_state, sequence,
+                lambda valid_action: game_engine.describe_action(game_state, valid_action))
+            game_engine.apply_in_place(game_state, action)
+
+if __name__ == "__main__":
+    test_iter_valid_actions_matches_get_valid_actions()
+    print("--- Valid actions test PASSED! ---")
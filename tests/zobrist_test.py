@@ -0,0 +1,91 @@
+import sys
+import os
+
+# Add the main project directory to the Python path
+# Since we're in src/tests, we need to go one level up to access src/utils
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.data_loader import load_cards_from_json
+from src.models.game_state import GameState
+from src.models.player import Player
+from src.core.game_engine import GameEngine
+from src.agents.random_agent import RandomAgent
+
+def load_cards():
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return load_cards_from_json(os.path.join(project_root, 'data', 'cards.json'))
+
+def test_zobrist_key_is_kept_up_to_date():
+    """
+    The incremental hash always equals the hash computed from scratch, and undoing actions restores it.
+    """
+    cards = load_cards()
+    for game_index in range(20):
+        seed = 2000 + game_index
+        agents = {"player1": RandomAgent("player1"), "player2": RandomAgent("player2")}
+        game_engine = GameEngine(all_cards=cards, deck_size=10, hand_size=5, agents=agents)
+        game_state = GameState.initial_state("player1", "player2", cards, seed=game_engine.seed_game(seed))
+
+        keys, records = [], []
+        while not game_state.game_over:
+            action = game_engine.choose_next_action(game_state)
+            if action is None:
+                break
+            keys.append(game_state.zobrist_key())
+            records.append(game_engine.apply_in_place(game_state, action))
+            assert game_state._zobrist == game_state._compute_zobrist()
+            assert game_state.clone().zobrist_key() == game_state.zobrist_key()
+
+        for key, record in zip(reversed(keys), reversed(records)):
+            game_engine.undo(game_state, record)
+            assert game_state.zobrist_key() == key
+
+def test_copies_of_a_card_hash_identically():
+    cards = load_cards()
+    axolotls = [card for card in cards if card.id == "axolotl_healer"]
+    others = [card for card in cards if card.id not in ("axolotl_healer", "killer_bee")]
+
+    def make_state(axolotl_in_hand, axolotl_in_play, life_points=3):
+        players = {
+            "player1": Player("player1", deck=[others[0].copy()], hand=[axolotl_in_hand.copy()],
+                              play_area=[axolotl_in_play.copy()], life_points=life_points),
+            "player2": Player("player2", deck=[others[1].copy()], hand=[others[2].copy()]),
+        }
+        return GameState("player1", "player2", players, turn_count=1, seed=0)
+
+    key = make_state(axolotls[0], axolotls[1]).zobrist_key()
+    assert make_state(axolotls[1], axolotls[0]).zobrist_key() == key
+    assert make_state(axolotls[1], axolotls[0], life_points=2).zobrist_key() != key
+    killer_bee = next(card for card in cards if card.id == "killer_bee")
+    assert make_state(killer_bee, axolotls[0]).zobrist_key() != key
+
+def test_two_copies_in_the_same_zone_do_not_cancel_out():
+    cards = load_cards()
+    axolotls = [card for card in cards if card.id == "axolotl_healer"]
+    assert len(axolotls) == 2
+    others = [card for card in cards if card.id != "axolotl_healer"]
+
+    def make_state(hand, discard_pile):
+        players = {
+            "player1": Player("player1", deck=[others[0].copy()], hand=[card.copy() for card in hand],
+                              discard_pile=[card.copy() for card in discard_pile]),
+            "player2": Player("player2", deck=[others[1].copy()], hand=[others[2].copy()]),
+        }
+        return GameState("player1", "player2", players, turn_count=1, seed=0)
+
+    keys = {make_state(axolotls, []).zobrist_key(), make_state([], axolotls).zobrist_key(),
+            make_state([], []).zobrist_key(), make_state(axolotls[:1], axolotls[1:]).zobrist_key()}
+    assert len(keys) == 4
+
+    # Moving the second copy into the zone of the first keeps the incremental hash right
+    game_state = make_state(axolotls[:1], axolotls[1:])
+    game_state.move_card(game_state.get_player("player1").discard_pile[0], game_state.get_player("player1"), "hand")
+    assert game_state._zobrist == game_state._compute_zobrist()
+    assert game_state.zobrist_key() == make_state(axolotls, []).zobrist_key()
+
+if __name__ == "__main__":
+    test_zobrist_key_is_kept_up_to_date()
+    test_copies_of_a_card_hash_identically()
+    test_two_copies_in_the_same_zone_do_not_cancel_out()
+    print("--- Zobrist test PASSED! ---")